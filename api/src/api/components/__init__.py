@@ -1,4 +1,8 @@
 from .plugin import Plugin
 from .data_source_plugin import DataSourcePlugin
 from .data_source_plugin import DataSourceParameter
-from .visualizer_plugin import VisualizerPlugin
\ No newline at end of file
+from .data_source_plugin import LoadBatch
+from .data_source_plugin import expand_source_paths
+from .data_source_plugin import parse_shards
+from .visualizer_plugin import VisualizerPlugin
+from .templates import configure_templates, load_template, template_environment
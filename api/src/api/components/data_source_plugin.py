@@ -1,7 +1,15 @@
+import glob
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
 from . import Plugin
-from ..model import Graph
+from ..model import Graph, Node, Edge
 from abc import abstractmethod
-from typing import Type, List
+from typing import Any, Callable, Type, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
 
 
 class DataSourceParameter(object):
@@ -39,6 +47,78 @@ class DataSourceParameter(object):
         self._display_name = value
 
 
+class LoadBatch(object):
+    """
+    Part of a graph yielded by `DataSourcePlugin.load_iter`, with a hint of how far the load got.
+
+    Edge endpoints are matched to nodes by id, so they may be nodes of this batch, nodes of
+    earlier batches or placeholders for nodes of later batches. A node whose id was already
+    yielded adds its attributes to the data of that node.
+    """
+    __slots__ = ("nodes", "edges", "graph", "progress", "message")
+
+    def __init__(self, nodes: Iterable[Node] = (), edges: Iterable[Edge] = (), graph: Optional[Graph] = None,
+                 progress: Optional[float] = None, message: Optional[str] = None):
+        """
+        :param nodes: Nodes of the batch.
+        :param edges: Edges of the batch, endpoints missing from the graph are added without data.
+        :param graph: A graph loaded in one piece, for plugins that only implement `load`.
+        :param progress: Fraction of the load done after this batch, between 0 and 1, None if unknown.
+        :param message: Short description of the step the load is at.
+        """
+        self.nodes = nodes
+        self.edges = edges
+        self.graph = graph
+        self.progress = progress
+        self.message = message
+
+
+def expand_source_paths(path: str, extensions: Tuple[str, ...]) -> List[str]:
+    """
+    Resolves a datasource path to the files it names: a single file as is, the files
+    with one of the extensions in a directory, or the files matching a glob pattern.
+
+    :param path: File, directory or glob pattern.
+    :param extensions: Lower case file extensions, such as ".json", used for directories.
+    :return: Matching file paths in sorted order.
+    :raises FileNotFoundError: If a directory or pattern matches no files.
+    """
+    if os.path.isdir(path):
+        paths = [os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(extensions)]
+    elif glob.has_magic(path):
+        paths = [match for match in glob.glob(path) if os.path.isfile(match)]
+    else:
+        return [path]
+    if not paths:
+        raise FileNotFoundError(f"No source files found for '{path}'")
+    return sorted(paths)
+
+
+def parse_shards(parse: Callable[..., T], paths: List[str], *args: Any, workers: Optional[int] = None) -> Iterator[T]:
+    """
+    Parses shard files in worker processes and yields the results in path order.
+
+    Workers are spawned rather than forked, since loads run on threads of the web process.
+    Closing the iterator early, e.g. when a load is cancelled, drops the shards not started yet.
+
+    :param parse: Module level function called as `parse(path, *args)` in a worker.
+    :param paths: Shard files.
+    :param args: Further arguments passed to `parse` for every shard.
+    :param workers: Number of worker processes, one per CPU if None. With 1 the shards
+        are parsed in this process.
+    """
+    if workers == 1:
+        for path in paths:
+            yield parse(path, *args)
+        return
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        yield from executor.map(parse, paths, *(repeat(arg) for arg in args))
+    finally:
+        # Only the shards already running are waited for
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 class DataSourcePlugin(Plugin):
     """
     An abstraction representing a plugin for loading data from a specific data source.
@@ -65,3 +145,32 @@ class DataSourcePlugin(Plugin):
         :rtype: List[DataSourceParameter]
         """
         pass
+
+    def load_iter(self, **kwargs) -> Iterator[LoadBatch]:
+        """
+        Loads data from the data source in batches of nodes and edges, so the graph can be
+        shown and the progress reported while it loads. Assembling all batches gives the
+        same graph as `load`.
+
+        The default adapts plugins that only implement `load`: it yields the whole graph in
+        one batch once it is loaded.
+
+        :param kwargs: The same keyword arguments as passed to `load`.
+        :type kwargs: dict
+        :return: Iterator of the batches, in the order they must be assembled.
+        :rtype: Iterator[LoadBatch]
+        """
+        yield LoadBatch(graph=self.load(**kwargs), progress=1.0)
+
+    def source_files(self, **kwargs) -> Optional[List[str]]:
+        """
+        Returns the files the graph is loaded from for the given parameters. Plugins that
+        return them opt into the datasource cache, which reuses a previously loaded graph
+        while the parameters and the content of these files are unchanged.
+
+        :param kwargs: The same keyword arguments as passed to `load`.
+        :type kwargs: dict
+        :return: Paths of the source files, or None if loads must not be cached.
+        :rtype: Optional[List[str]]
+        """
+        return None
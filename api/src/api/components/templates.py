@@ -0,0 +1,81 @@
+import json
+import os
+import threading
+from collections.abc import Mapping
+from datetime import date, datetime
+from typing import Any, Optional
+
+_environment = None
+_bytecode_cache_dir: Optional[str] = None
+_lock = threading.Lock()
+
+
+class _TemplateJSONEncoder(json.JSONEncoder):
+    """Encodes dates as ISO strings and dict-like node data as objects."""
+
+    def default(self, obj: Any) -> Any:
+        if isinstance(obj, (datetime, date)):
+            return obj.isoformat()
+        if isinstance(obj, Mapping):
+            return dict(obj)
+        return super().default(obj)
+
+
+def _tojson(obj: Any, **kwargs) -> str:
+    return json.dumps(obj, cls=_TemplateJSONEncoder, **kwargs)
+
+
+def configure_templates(bytecode_cache_dir: Optional[str]) -> None:
+    """
+    Sets the directory compiled templates are cached in across processes.
+    Only applies if called before the first template is loaded.
+
+    :param bytecode_cache_dir: Cache directory, None for Jinja's default in the temporary directory.
+    """
+    global _bytecode_cache_dir
+    _bytecode_cache_dir = bytecode_cache_dir
+
+
+def template_environment():
+    """
+    Jinja environment shared by all visualizer plugins. Templates are loaded with
+    `load_template`, compiled once per process and cached as bytecode between processes.
+
+    :return: The `jinja2.Environment`, created on first use.
+    """
+    global _environment
+    with _lock:
+        if _environment is None:
+            # Imported here, so nothing pulls Jinja in before a visualizer renders
+            from jinja2 import Environment, FileSystemBytecodeCache, PrefixLoader
+
+            if _bytecode_cache_dir is not None:
+                os.makedirs(_bytecode_cache_dir, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(_bytecode_cache_dir)
+            else:
+                bytecode_cache = FileSystemBytecodeCache()
+            environment = Environment(loader=PrefixLoader({}), bytecode_cache=bytecode_cache)
+            environment.filters['tojson'] = _tojson
+            _environment = environment
+        return _environment
+
+
+def load_template(namespace: str, template_dir: str, name: str):
+    """
+    Loads a template of a plugin through the shared environment.
+
+    :param namespace: Prefix that keeps the templates of the plugin apart from others, such as its identifier.
+    :param template_dir: Folder of the plugin's templates.
+    :param name: File name of the template in the folder.
+    :return: The `jinja2.Template`.
+    :raises FileNotFoundError: If the template folder doesn't exist.
+    """
+    if not os.path.isdir(template_dir):
+        raise FileNotFoundError(f"Template folder not found: {template_dir}")
+    environment = template_environment()
+    from jinja2 import FileSystemLoader
+
+    with _lock:
+        if namespace not in environment.loader.mapping:
+            environment.loader.mapping[namespace] = FileSystemLoader(str(template_dir))
+    return environment.get_template(f"{namespace}/{name}")
@@ -1,7 +1,19 @@
-from .node import Node
+from .node import Node, intern_attributes
 from .edge import Edge
+from .attribute_index import AttributeIndex
+from .graph_statistics import GraphStatistics
 from .graph import Graph
+from .graph_view import GraphView
+from .attribute_store import (AttributeStore, NodeData, Column, NumericColumn, DatetimeColumn, CategoryColumn,
+                              ObjectColumn)
+from .csr_graph import CSRGraph, CSRGraphBuilder
+from .snapshot import save_snapshot, open_snapshot, write_snapshot, read_snapshot
+from .search_index import SearchIndex
+from .trigram_index import TrigramIndex
 from .workspace import Workspace
 from .filter import Filter
 from .filter_operator import FilterOperator
-from .search import Search
\ No newline at end of file
+from .search_mode import SearchMode
+from .search import Search
+from .filter_expression import FilterExpression
+from .query_planner import QueryPlanner
\ No newline at end of file
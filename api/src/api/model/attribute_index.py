@@ -0,0 +1,129 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from . import FilterOperator
+
+
+def value_type_key(value: Any) -> Any:
+    """
+    Type of a value as seen by filter comparisons, with the timezone for datetimes.
+    Timezones are keyed by repr because some of them (e.g. dateutil's tzutc) aren't hashable.
+    """
+    if isinstance(value, datetime):
+        return type(value), None if value.tzinfo is None else repr(value.tzinfo)
+    return type(value)
+
+
+class _ValueBucket(object):
+    """
+    Node ids grouped by the values of one type: a hash map from value to ids,
+    plus a lazily sorted list of distinct values for range lookups.
+    """
+
+    def __init__(self):
+        self._ids_by_value: Dict[Any, Set[str]] = {}
+        self._sorted_values: Optional[List[Any]] = None
+
+    def __len__(self):
+        return len(self._ids_by_value)
+
+    @property
+    def sample(self) -> Any:
+        return next(iter(self._ids_by_value))
+
+    def add(self, node_id: str, value: Any):
+        ids = self._ids_by_value.get(value)
+        if ids is None:
+            ids = self._ids_by_value[value] = set()
+            if self._sorted_values is not None:
+                self._sorted_values.insert(bisect_left(self._sorted_values, value), value)
+        ids.add(node_id)
+
+    def remove(self, node_id: str, value: Any):
+        ids = self._ids_by_value.get(value)
+        if ids is None:
+            return
+        ids.discard(node_id)
+        if not ids:
+            del self._ids_by_value[value]
+            if self._sorted_values is not None:
+                del self._sorted_values[bisect_left(self._sorted_values, value)]
+
+    def _sorted(self) -> List[Any]:
+        if self._sorted_values is None:
+            self._sorted_values = sorted(self._ids_by_value)
+        return self._sorted_values
+
+    def _union(self, values) -> Set[str]:
+        result = set()
+        for value in values:
+            result |= self._ids_by_value[value]
+        return result
+
+    def select(self, operator: 'FilterOperator', compare_value: Any) -> Set[str]:
+        from . import FilterOperator
+
+        if operator == FilterOperator.EQUAL:
+            return set(self._ids_by_value.get(compare_value, ()))
+        if operator == FilterOperator.NOT_EQUAL:
+            return self._union(value for value in self._ids_by_value if value != compare_value)
+
+        values = self._sorted()
+        if operator == FilterOperator.GREATER_THAN:
+            return self._union(values[bisect_right(values, compare_value):])
+        if operator == FilterOperator.GREATER_THAN_OR_EQUAL:
+            return self._union(values[bisect_left(values, compare_value):])
+        if operator == FilterOperator.LESS_THAN:
+            return self._union(values[:bisect_left(values, compare_value)])
+        if operator == FilterOperator.LESS_THAN_OR_EQUAL:
+            return self._union(values[:bisect_right(values, compare_value)])
+        raise ValueError(f"Unsupported operator: {operator}")
+
+
+class AttributeIndex(object):
+    """
+    Index of node ids by the value of a single attribute.
+
+    Values are kept in separate buckets per type (and timezone for datetimes),
+    mirroring how `Filter` converts its comparison value to the type of each
+    attribute value. Equality is answered from a hash map and range
+    comparisons by bisecting the sorted distinct values.
+    """
+
+    def __init__(self, attribute: str):
+        self._attribute = attribute
+        self._buckets: Dict[Any, _ValueBucket] = {}
+
+    @property
+    def attribute(self) -> str:
+        return self._attribute
+
+    def add(self, node_id: str, value: Any):
+        key = value_type_key(value)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _ValueBucket()
+        bucket.add(node_id, value)
+
+    def remove(self, node_id: str, value: Any):
+        key = value_type_key(value)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return
+        bucket.remove(node_id, value)
+        if not len(bucket):
+            del self._buckets[key]
+
+    def select(self, operator: 'FilterOperator', convert: Callable[[Any], Any]) -> Set[str]:
+        """
+        Returns ids of nodes whose attribute value satisfies the comparison.
+
+        :param operator: Comparison operator.
+        :param convert: Converts the comparison value to the type of a sample attribute value.
+        """
+        result = set()
+        for bucket in self._buckets.values():
+            result |= bucket.select(operator, convert(bucket.sample))
+        return result
@@ -0,0 +1,476 @@
+from abc import ABC, abstractmethod
+from collections.abc import MutableMapping, MutableSequence
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from .attribute_index import value_type_key
+
+if TYPE_CHECKING:
+    from . import FilterOperator, SearchMode
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Strings are dictionary encoded when at most this share of the values is distinct
+CATEGORY_RATIO = 0.5
+
+
+class Column(ABC):
+    """Values of one attribute for every node position, with a presence mask for missing values."""
+
+    def __init__(self, size: int):
+        self.present = np.zeros(size, dtype=bool)
+
+    @abstractmethod
+    def accepts(self, value) -> bool:
+        """Whether the column can store the value."""
+        pass
+
+    @abstractmethod
+    def get(self, position: int) -> Any:
+        pass
+
+    @abstractmethod
+    def set(self, position: int, value):
+        pass
+
+    @abstractmethod
+    def _resize(self, size: int):
+        """Grows the values to `size` positions, the new last one holding no value."""
+        pass
+
+    @abstractmethod
+    def _delete(self, position: int):
+        """Removes the value at a position, shifting the ones after it."""
+        pass
+
+    def append(self):
+        self.present = np.append(self.present, False)
+        self._resize(len(self.present))
+
+    def delete(self, position: int):
+        self.present = np.delete(self.present, position)
+        self._delete(position)
+
+    def sample(self) -> Any:
+        return self.get(int(np.argmax(self.present)))
+
+    def positions(self) -> np.ndarray:
+        return np.flatnonzero(self.present)
+
+    @abstractmethod
+    def compare(self, operator: 'FilterOperator', convert: Callable[[Any], Any]) -> np.ndarray:
+        """Mask of the positions whose value satisfies the comparison, converting the filter value once."""
+        pass
+
+    def text(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions of the present values and their lowercase string forms."""
+        positions = self.positions()
+        strings = np.array([str(self.get(position)).lower() for position in positions.tolist()], dtype=str)
+        return positions, strings
+
+    def text_mask(self, match: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        mask = np.zeros(len(self.present), dtype=bool)
+        positions, strings = self.text()
+        if len(positions):
+            mask[positions] = match(strings)
+        return mask
+
+
+class NumericColumn(Column):
+    def __init__(self, size: int, value_type: type):
+        super().__init__(size)
+        self.value_type = value_type
+        self.values = np.zeros(size, dtype=np.int64 if value_type is int else np.float64)
+
+    @classmethod
+    def from_arrays(cls, present: np.ndarray, values: np.ndarray) -> 'NumericColumn':
+        """Column over existing int64 or float64 values, without copying them."""
+        column = cls.__new__(cls)
+        column.present = present
+        column.value_type = int if values.dtype.kind == "i" else float
+        column.values = values
+        return column
+
+    def accepts(self, value) -> bool:
+        if type(value) is not self.value_type:
+            return False
+        return self.value_type is float or -2 ** 63 <= value < 2 ** 63
+
+    def get(self, position: int) -> Any:
+        return self.values[position].item()
+
+    def set(self, position: int, value):
+        self.values[position] = value
+        self.present[position] = True
+
+    def _resize(self, size: int):
+        self.values = np.resize(self.values, size)
+        self.values[-1] = 0
+
+    def _delete(self, position: int):
+        self.values = np.delete(self.values, position)
+
+    def compare(self, operator: 'FilterOperator', convert: Callable[[Any], Any]) -> np.ndarray:
+        compare_value = convert(self.sample())
+        return self.present & operator.function(self.values, compare_value)
+
+    def text(self) -> Tuple[np.ndarray, np.ndarray]:
+        positions = self.positions()
+        # numpy prints int64 and float64 the same way as str() does
+        return positions, self.values[positions].astype(str)
+
+
+class DatetimeColumn(Column):
+    """Datetimes with one timezone (or none), stored as int64 microseconds since the epoch."""
+
+    def __init__(self, size: int, tzinfo):
+        super().__init__(size)
+        self.tzinfo = tzinfo
+        self.values = np.zeros(size, dtype=np.int64)
+
+    @classmethod
+    def from_arrays(cls, present: np.ndarray, values: np.ndarray, tzinfo) -> 'DatetimeColumn':
+        """Column over existing int64 microseconds since the epoch, without copying them."""
+        column = cls.__new__(cls)
+        column.present = present
+        column.tzinfo = tzinfo
+        column.values = values
+        return column
+
+    def accepts(self, value) -> bool:
+        return type(value) is datetime and value.tzinfo == self.tzinfo
+
+    def _encode(self, value: datetime) -> int:
+        return (value - (_EPOCH if value.tzinfo is None else _EPOCH_UTC)) // _MICROSECOND
+
+    def get(self, position: int) -> Any:
+        offset = timedelta(microseconds=int(self.values[position]))
+        if self.tzinfo is None:
+            return _EPOCH + offset
+        return (_EPOCH_UTC + offset).astimezone(self.tzinfo)
+
+    def set(self, position: int, value):
+        self.values[position] = self._encode(value)
+        self.present[position] = True
+
+    def _resize(self, size: int):
+        self.values = np.resize(self.values, size)
+        self.values[-1] = 0
+
+    def _delete(self, position: int):
+        self.values = np.delete(self.values, position)
+
+    def compare(self, operator: 'FilterOperator', convert: Callable[[Any], Any]) -> np.ndarray:
+        compare_value = convert(self.sample())
+        if (compare_value.tzinfo is None) != (self.tzinfo is None):
+            raise ValueError("Cannot compare offset-naive and offset-aware datetimes")
+        return self.present & operator.function(self.values, self._encode(compare_value))
+
+
+class CategoryColumn(Column):
+    """Dictionary encoded strings, an int32 code per position pointing into the list of distinct values."""
+
+    def __init__(self, size: int):
+        super().__init__(size)
+        self.codes = np.full(size, -1, dtype=np.int32)
+        self.categories: MutableSequence[str] = []
+        # Built on first use, categories of a snapshot are only decoded when needed
+        self._code_of: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def from_arrays(cls, present: np.ndarray, codes: np.ndarray,
+                    categories: MutableSequence[str]) -> 'CategoryColumn':
+        """Column over existing int32 codes and their categories, without copying them."""
+        column = cls.__new__(cls)
+        column.present = present
+        column.codes = codes
+        column.categories = categories
+        column._code_of = None
+        return column
+
+    def accepts(self, value) -> bool:
+        return type(value) is str
+
+    def get(self, position: int) -> Any:
+        return self.categories[self.codes[position]]
+
+    def set(self, position: int, value):
+        if self._code_of is None:
+            self._code_of = {category: code for code, category in enumerate(self.categories)}
+        code = self._code_of.get(value)
+        if code is None:
+            code = self._code_of[value] = len(self.categories)
+            self.categories.append(value)
+        self.codes[position] = code
+        self.present[position] = True
+
+    def _resize(self, size: int):
+        self.codes = np.append(self.codes, np.int32(-1))
+
+    def _delete(self, position: int):
+        self.codes = np.delete(self.codes, position)
+
+    def _expand(self, hits: np.ndarray) -> np.ndarray:
+        # Code -1 of missing values picks the trailing False
+        return self.present & np.append(hits, False)[self.codes]
+
+    def compare(self, operator: 'FilterOperator', convert: Callable[[Any], Any]) -> np.ndarray:
+        compare = operator.function
+        compare_value = convert(self.sample())
+        hits = np.fromiter((compare(category, compare_value) for category in self.categories),
+                           dtype=bool, count=len(self.categories))
+        return self._expand(hits)
+
+    def text_mask(self, match: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        if not self.categories:
+            return np.zeros(len(self.present), dtype=bool)
+        return self._expand(match(np.char.lower(np.array(self.categories, dtype=str))))
+
+
+class ObjectColumn(Column):
+    """Fallback for values of mixed or unsupported types and for high cardinality strings."""
+
+    def __init__(self, size: int):
+        super().__init__(size)
+        self.values = np.empty(size, dtype=object)
+
+    @classmethod
+    def from_arrays(cls, present: np.ndarray, values: Sequence[Any]) -> 'ObjectColumn':
+        """Column over existing values, any sequence that can be indexed by position."""
+        column = cls.__new__(cls)
+        column.present = present
+        column.values = values
+        return column
+
+    def accepts(self, value) -> bool:
+        return True
+
+    def get(self, position: int) -> Any:
+        return self.values[position]
+
+    def set(self, position: int, value):
+        self.values[position] = value
+        self.present[position] = True
+
+    def _resize(self, size: int):
+        self.values = np.append(self.values, np.empty(1, dtype=object))
+
+    def _delete(self, position: int):
+        self.values = np.delete(self.values, position)
+
+    def compare(self, operator: 'FilterOperator', convert: Callable[[Any], Any]) -> np.ndarray:
+        compare = operator.function
+        compare_values = {}
+        mask = np.zeros(len(self.present), dtype=bool)
+        for position in self.positions().tolist():
+            value = self.values[position]
+            key = value_type_key(value)
+            if key not in compare_values:
+                compare_values[key] = convert(value)
+            mask[position] = compare(value, compare_values[key])
+        return mask
+
+    @classmethod
+    def from_column(cls, column: Column) -> 'ObjectColumn':
+        converted = cls(len(column.present))
+        for position in column.positions().tolist():
+            converted.set(position, column.get(position))
+        return converted
+
+
+def _new_column(values: Sequence[Any], size: int) -> Column:
+    """Picks the most compact column type that can hold all the values."""
+    types = {value_type_key(value) for value in values}
+    if len(types) == 1:
+        value_type = next(iter(types))
+        if value_type in (int, float):
+            column = NumericColumn(size, value_type)
+            if all(column.accepts(value) for value in values):
+                return column
+        elif isinstance(value_type, tuple) and value_type[0] is datetime:
+            return DatetimeColumn(size, values[0].tzinfo)
+        elif value_type is str and len(set(values)) <= len(values) * CATEGORY_RATIO:
+            return CategoryColumn(size)
+    return ObjectColumn(size)
+
+
+class AttributeStore(object):
+    """
+    Columnar storage of node attributes, one column per attribute indexed by node position.
+
+    Integers and floats are kept in typed arrays, datetimes as int64 microseconds
+    since the epoch, low cardinality strings dictionary encoded and everything else
+    in object arrays. A presence mask per column tells missing values apart.
+    Filters and searches are evaluated as one mask computation per column.
+    """
+
+    def __init__(self, records: Sequence[Dict[str, Any]] = ()):
+        self._size = len(records)
+        by_attribute: Dict[str, Tuple[List[int], List[Any]]] = {}
+        for position, record in enumerate(records):
+            for attribute, value in record.items():
+                entry = by_attribute.get(attribute)
+                if entry is None:
+                    entry = by_attribute[attribute] = ([], [])
+                entry[0].append(position)
+                entry[1].append(value)
+        self._columns: Dict[str, Column] = {}
+        for attribute, (positions, values) in by_attribute.items():
+            column = self._columns[attribute] = _new_column(values, self._size)
+            for position, value in zip(positions, values):
+                column.set(position, value)
+
+    @classmethod
+    def from_columns(cls, size: int, columns: Dict[str, Column]) -> 'AttributeStore':
+        store = cls()
+        store._size = size
+        store._columns = dict(columns)
+        return store
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def columns(self) -> Dict[str, Column]:
+        return self._columns
+
+    @property
+    def attributes(self) -> List[str]:
+        return list(self._columns)
+
+    def has(self, position: int, attribute: str) -> bool:
+        column = self._columns.get(attribute)
+        return column is not None and bool(column.present[position])
+
+    def get(self, position: int, attribute: str) -> Any:
+        """
+        :raises KeyError: If the node has no value for the attribute.
+        """
+        column = self._columns.get(attribute)
+        if column is None or not column.present[position]:
+            raise KeyError(attribute)
+        return column.get(position)
+
+    def keys(self, position: int) -> Iterator[str]:
+        return (attribute for attribute, column in self._columns.items() if column.present[position])
+
+    def set(self, position: int, attribute: str, value):
+        column = self._columns.get(attribute)
+        if column is None:
+            column = self._columns[attribute] = _new_column([value], self._size)
+        elif not column.accepts(value):
+            column = self._columns[attribute] = ObjectColumn.from_column(column)
+        column.set(position, value)
+
+    def remove(self, position: int, attribute: str):
+        column = self._columns.get(attribute)
+        if column is None or not column.present[position]:
+            raise KeyError(attribute)
+        column.present[position] = False
+        if not column.present.any():
+            del self._columns[attribute]
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Adds a row for a new node and returns its position."""
+        position = self._size
+        self._size += 1
+        for column in self._columns.values():
+            column.append()
+        for attribute, value in record.items():
+            self.set(position, attribute, value)
+        return position
+
+    def delete(self, position: int):
+        """Removes the row of a node, shifting the rows after it."""
+        self._size -= 1
+        for attribute, column in list(self._columns.items()):
+            column.delete(position)
+            if not column.present.any():
+                del self._columns[attribute]
+
+    def compare(self, attribute: str, operator: 'FilterOperator', convert: Callable[[Any], Any]) -> np.ndarray:
+        """
+        Mask of the node positions whose attribute value satisfies the comparison.
+
+        :param convert: Converts the comparison value to the type of a sample attribute value.
+        :raises ValueError: If the comparison value can't be converted.
+        """
+        column = self._columns.get(attribute)
+        if column is None:
+            return np.zeros(self._size, dtype=bool)
+        return column.compare(operator, convert)
+
+    def search(self, query: str, mode: 'SearchMode') -> np.ndarray:
+        """
+        Mask of the node positions with a value matching the query in exact, substring
+        or prefix mode, with the same semantics as `Search`.
+        """
+        from . import SearchMode
+
+        query = query.lower()
+        if mode == SearchMode.EXACT:
+            match = lambda strings: strings == query
+        elif mode == SearchMode.SUBSTRING:
+            match = lambda strings: np.char.find(strings, query) >= 0
+        elif mode == SearchMode.PREFIX:
+            match = lambda strings: np.char.startswith(strings, query)
+        else:
+            raise ValueError(f"Unsupported search mode for columnar search: {mode.value}")
+
+        mask = np.zeros(self._size, dtype=bool)
+        for attribute, column in self._columns.items():
+            if mode == SearchMode.EXACT and attribute == query:
+                mask |= column.present
+            else:
+                mask |= column.text_mask(match)
+        return mask
+
+
+class NodeData(MutableMapping):
+    """
+    Dict-like view of one node's row in an `AttributeStore`, used as `node.data`
+    of nodes whose attributes are stored in columns. Values are read on access.
+    """
+
+    __slots__ = ("_store", "_positions", "_node_id")
+
+    def __init__(self, store: AttributeStore, positions: Dict[str, int], node_id: str):
+        self._store = store
+        self._positions = positions
+        self._node_id = node_id
+
+    def _position(self) -> int:
+        position = self._positions.get(self._node_id)
+        if position is None:
+            raise KeyError(f"Node {self._node_id} was removed from the graph")
+        return position
+
+    def __getitem__(self, attribute: str) -> Any:
+        return self._store.get(self._position(), attribute)
+
+    def __setitem__(self, attribute: str, value):
+        self._store.set(self._position(), attribute, value)
+
+    def __delitem__(self, attribute: str):
+        self._store.remove(self._position(), attribute)
+
+    def __contains__(self, attribute) -> bool:
+        position = self._positions.get(self._node_id)
+        return position is not None and self._store.has(position, attribute)
+
+    def __iter__(self) -> Iterator[str]:
+        position = self._positions.get(self._node_id)
+        return iter(()) if position is None else self._store.keys(position)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __repr__(self):
+        return repr(self.copy())
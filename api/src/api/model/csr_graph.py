@@ -0,0 +1,441 @@
+import sys
+from array import array
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, MutableMapping, MutableSequence, Optional, Sequence,
+                    Set, Tuple, TYPE_CHECKING)
+
+import numpy as np
+
+from . import Node, Edge, Graph
+from .attribute_store import AttributeStore, NodeData
+from .graph_statistics import GraphStatistics
+
+if TYPE_CHECKING:
+    from . import FilterOperator, Search
+
+
+def _offsets(rows: np.ndarray, row_count: int) -> np.ndarray:
+    """Row offsets of a compressed sparse matrix whose entries are sorted by row."""
+    offsets = np.zeros(row_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=row_count), out=offsets[1:])
+    return offsets.astype(np.int32)
+
+
+def _expand(offsets: np.ndarray) -> np.ndarray:
+    """Row number of every entry of a compressed sparse matrix."""
+    return np.repeat(np.arange(len(offsets) - 1, dtype=np.int32), np.diff(offsets))
+
+
+class CSRGraph(Graph):
+    """
+    Graph stored as arrays instead of `Node` and `Edge` objects, for graphs with
+    millions of edges.
+
+    Node ids are kept in one list of interned strings, and edges as `int32`
+    compressed sparse row (outgoing) and column (incoming) offset and index arrays,
+    sorted by position within every row. Node attributes live in a columnar
+    `AttributeStore`. `Node` and `Edge` objects are only created when they are
+    asked for; materialized nodes are kept so they stay identical across calls,
+    and their `data` is a `NodeData` proxy reading from the columns.
+
+    Reads are array lookups and degree, neighbor and subgraph mask operations are
+    vectorized, and so are filters and searches, one mask computation per column.
+    Mutations rewrite the arrays in O(V + E), so this storage is meant for large
+    graphs that are mostly read.
+    """
+
+    def __init__(self, nodes: Iterable[Node] = (), edges: Iterable[Edge] = (), directed: bool = True):
+        super().__init__(nodes, edges, directed)
+
+    @classmethod
+    def from_arrays(cls, node_ids: Sequence[str], node_data: Sequence[Dict[str, Any]],
+                    sources: Sequence[int], targets: Sequence[int], directed: bool) -> 'CSRGraph':
+        """
+        Creates the graph directly from node and edge arrays, without `Node` or `Edge` objects.
+
+        :param node_ids: Unique node ids.
+        :param node_data: Data of every node, in the order of `node_ids`.
+        :param sources: Position of the source node of every edge in `node_ids`.
+        :param targets: Position of the destination node of every edge in `node_ids`.
+        :param directed: Whether the graph is directed.
+        """
+        graph = cls.__new__(cls)
+        graph._directed = directed
+        graph._version = 0
+        graph._load(node_ids, node_data, np.asarray(sources, dtype=np.int32), np.asarray(targets, dtype=np.int32))
+        return graph
+
+    @classmethod
+    def _from_storage(cls, ids: MutableSequence[str], positions: MutableMapping[str, int],
+                      attributes: AttributeStore, out_offsets: np.ndarray, out_targets: np.ndarray,
+                      in_offsets: np.ndarray, in_sources: np.ndarray, directed: bool,
+                      statistics: Optional[GraphStatistics] = None) -> 'CSRGraph':
+        """Wraps already built storage, e.g. arrays mapped from a snapshot, without copying it."""
+        graph = cls.__new__(cls)
+        graph._directed = directed
+        graph._version = 0
+        graph._ids, graph._positions, graph._attributes = ids, positions, attributes
+        graph._materialized = {}
+        graph._out_offsets, graph._out_targets = out_offsets, out_targets
+        graph._in_offsets, graph._in_sources = in_offsets, in_sources
+        graph._edge_count = len(out_targets)
+        graph._nodes_list = None
+        graph._edges_list = None
+        graph._attribute_indexes = {}
+        graph._invalidate()
+        graph._statistics = statistics
+        if statistics is not None:
+            statistics.version = graph._version
+        return graph
+
+    def _reset(self, nodes: Iterable[Node], edges: Iterable[Edge]):
+        node_ids, node_data, positions = [], [], {}
+        for node in nodes:
+            if node.id not in positions:
+                positions[node.id] = len(node_ids)
+                node_ids.append(node.id)
+                node_data.append(node.data)
+        sources, targets = array("i"), array("i")
+        for edge in edges:
+            # Edges may point to nodes that were not passed in `nodes`, register them as well
+            for endpoint in (edge.src, edge.dest):
+                if endpoint.id not in positions:
+                    positions[endpoint.id] = len(node_ids)
+                    node_ids.append(endpoint.id)
+                    node_data.append(endpoint.data)
+            sources.append(positions[edge.src.id])
+            targets.append(positions[edge.dest.id])
+        self._load(node_ids, node_data, np.frombuffer(sources, dtype=np.int32), np.frombuffer(targets, dtype=np.int32))
+
+    def _load(self, node_ids: Sequence[str], node_data: Sequence[Dict[str, Any]],
+              sources: np.ndarray, targets: np.ndarray):
+        ids: List[str] = [sys.intern(node_id) for node_id in node_ids]
+        positions: Dict[str, int] = {node_id: position for position, node_id in enumerate(ids)}
+        if len(positions) != len(ids):
+            raise ValueError("Node ids must be unique")
+        # Node data may be proxies of this graph's current store, so read it before replacing the store
+        self._attributes = AttributeStore(node_data)
+        self._ids, self._positions = ids, positions
+        self._materialized: Dict[str, Node] = {}
+
+        count = len(self._ids)
+        order = np.lexsort((targets, sources))
+        sources, targets = sources[order], targets[order]
+        if len(sources):
+            # Drop parallel edges, the same pair is stored once like in `Graph`
+            unique = np.ones(len(sources), dtype=bool)
+            unique[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+            sources, targets = sources[unique], targets[unique]
+        self._out_offsets = _offsets(sources, count)
+        self._out_targets = np.ascontiguousarray(targets, dtype=np.int32)
+        order = np.lexsort((sources, targets))
+        self._in_offsets = _offsets(targets[order], count)
+        self._in_sources = np.ascontiguousarray(sources[order], dtype=np.int32)
+
+        self._edge_count = len(self._out_targets)
+        self._nodes_list = None
+        self._edges_list = None
+        self._attribute_indexes = {}
+        self._statistics = None
+        self._invalidate()
+
+    def _node_at(self, position: int) -> Node:
+        node_id = self._ids[position]
+        node = self._materialized.get(node_id)
+        if node is None:
+            node = self._materialized[node_id] = Node(node_id, NodeData(self._attributes, self._positions, node_id))
+        return node
+
+    def _iter_nodes(self) -> Iterator[Node]:
+        # Transient objects for scans, so a full scan doesn't materialize every node
+        for node_id in self._ids:
+            node = self._materialized.get(node_id)
+            yield node if node is not None else Node(node_id, NodeData(self._attributes, self._positions, node_id))
+
+    @property
+    def attributes(self) -> AttributeStore:
+        return self._attributes
+
+    @property
+    def nodes(self) -> List[Node]:
+        if self._nodes_list is None:
+            self._nodes_list = [self._node_at(position) for position in range(len(self._ids))]
+        return self._nodes_list
+
+    @nodes.setter
+    def nodes(self, value: List[Node]):
+        Graph.nodes.fset(self, value)
+
+    @property
+    def edges(self) -> List[Edge]:
+        if self._edges_list is None:
+            self._edges_list = [
+                Edge(self._node_at(src), self._node_at(dest))
+                for src, dest in zip(_expand(self._out_offsets).tolist(), self._out_targets.tolist())
+            ]
+        return self._edges_list
+
+    @edges.setter
+    def edges(self, value: List[Edge]):
+        Graph.edges.fset(self, value)
+
+    @property
+    def node_count(self) -> int:
+        return len(self._ids)
+
+    @property
+    def node_ids(self) -> Iterable[str]:
+        return self._positions.keys()
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._positions
+
+    def position(self, node_id: str) -> Optional[int]:
+        """Index of the node in the graph's arrays."""
+        return self._positions.get(node_id)
+
+    def get_node(self, node_id: str) -> Optional[Node]:
+        position = self._positions.get(node_id)
+        return self._node_at(position) if position is not None else None
+
+    def _find(self, offsets: np.ndarray, indices: np.ndarray, row: int, column: int) -> int:
+        """Index of `column` in the row of a compressed sparse matrix, -1 if it is not there."""
+        start, end = offsets[row], offsets[row + 1]
+        index = start + int(np.searchsorted(indices[start:end], column))
+        return index if index < end and indices[index] == column else -1
+
+    def _has_pair(self, src: int, dest: int) -> bool:
+        return self._find(self._out_offsets, self._out_targets, src, dest) >= 0
+
+    def get_edge(self, src_id: str, dest_id: str) -> Optional[Edge]:
+        src, dest = self._positions.get(src_id), self._positions.get(dest_id)
+        if src is None or dest is None:
+            return None
+        if self._has_pair(src, dest):
+            return Edge(self._node_at(src), self._node_at(dest))
+        if not self._directed and self._has_pair(dest, src):
+            return Edge(self._node_at(dest), self._node_at(src))
+        return None
+
+    def has_edge(self, src_id: str, dest_id: str) -> bool:
+        src, dest = self._positions.get(src_id), self._positions.get(dest_id)
+        if src is None or dest is None:
+            return False
+        return self._has_pair(src, dest) or (not self._directed and self._has_pair(dest, src))
+
+    def add_node(self, node: Node) -> bool:
+        if node.id in self._positions:
+            return False
+        node_id = sys.intern(node.id)
+        # The node's data is copied into the columns, the graph hands out its own node object
+        self._attributes.append(node.data)
+        self._positions[node_id] = len(self._ids)
+        self._ids.append(node_id)
+        self._out_offsets = np.append(self._out_offsets, self._out_offsets[-1])
+        self._in_offsets = np.append(self._in_offsets, self._in_offsets[-1])
+        for attribute, index in self._attribute_indexes.items():
+            if attribute in node.data:
+                index.add(node_id, node.data[attribute])
+        self._invalidate()
+        return True
+
+    def remove_node(self, node_id: str) -> bool:
+        position = self._positions.get(node_id)
+        if position is None:
+            return False
+        count = len(self._ids) - 1
+
+        sources, targets = _expand(self._out_offsets), self._out_targets
+        keep = (sources != position) & (targets != position)
+        sources, targets = sources[keep], targets[keep]
+        sources -= sources > position
+        targets -= targets > position
+        self._out_offsets, self._out_targets = _offsets(sources, count), targets
+
+        targets, sources = _expand(self._in_offsets), self._in_sources
+        keep = (sources != position) & (targets != position)
+        sources, targets = sources[keep], targets[keep]
+        sources -= sources > position
+        targets -= targets > position
+        self._in_offsets, self._in_sources = _offsets(targets, count), sources
+        self._edge_count = len(self._out_targets)
+
+        data = {attribute: self._attributes.get(position, attribute)
+                for attribute in self._attribute_indexes if self._attributes.has(position, attribute)}
+        self._attributes.delete(position)
+        del self._ids[position]
+        del self._positions[node_id]
+        for moved in range(position, count):
+            self._positions[self._ids[moved]] = moved
+        self._materialized.pop(node_id, None)
+        for attribute, index in self._attribute_indexes.items():
+            if attribute in data:
+                index.remove(node_id, data[attribute])
+        self._invalidate()
+        return True
+
+    def add_edge(self, edge: Edge) -> bool:
+        src, dest = self._positions.get(edge.src.id), self._positions.get(edge.dest.id)
+        if src is None or dest is None or self._has_pair(src, dest):
+            return False
+        self._out_targets = self._insert(self._out_offsets, self._out_targets, src, dest)
+        self._in_sources = self._insert(self._in_offsets, self._in_sources, dest, src)
+        self._edge_count += 1
+        self._invalidate()
+        return True
+
+    @staticmethod
+    def _insert(offsets: np.ndarray, indices: np.ndarray, row: int, column: int) -> np.ndarray:
+        start, end = offsets[row], offsets[row + 1]
+        index = start + int(np.searchsorted(indices[start:end], column))
+        offsets[row + 1:] += 1
+        return np.insert(indices, index, column)
+
+    def remove_edge(self, src_id: str, dest_id: str) -> bool:
+        src, dest = self._positions.get(src_id), self._positions.get(dest_id)
+        if src is None or dest is None:
+            return False
+        index = self._find(self._out_offsets, self._out_targets, src, dest)
+        if index < 0:
+            return False
+        self._out_targets = np.delete(self._out_targets, index)
+        self._out_offsets[src + 1:] -= 1
+        index = self._find(self._in_offsets, self._in_sources, dest, src)
+        self._in_sources = np.delete(self._in_sources, index)
+        self._in_offsets[dest + 1:] -= 1
+        self._edge_count -= 1
+        self._invalidate()
+        return True
+
+    def successors(self, position: int) -> np.ndarray:
+        return self._out_targets[self._out_offsets[position]:self._out_offsets[position + 1]]
+
+    def predecessors(self, position: int) -> np.ndarray:
+        return self._in_sources[self._in_offsets[position]:self._in_offsets[position + 1]]
+
+    def neighbor_positions(self, position: int) -> np.ndarray:
+        """Positions of the successors, or of all adjacent nodes if the graph is undirected."""
+        successors = self.successors(position)
+        if self._directed:
+            return successors
+        return np.concatenate((successors, np.setdiff1d(self.predecessors(position), successors, assume_unique=True)))
+
+    def neighbors(self, node_id: str) -> List[Node]:
+        position = self._positions.get(node_id)
+        if position is None:
+            return []
+        return [self._node_at(neighbor) for neighbor in self.neighbor_positions(position).tolist()]
+
+    def out_edges(self, node_id: str) -> List[Edge]:
+        position = self._positions.get(node_id)
+        if position is None:
+            return []
+        node = self._node_at(position)
+        return [Edge(node, self._node_at(dest)) for dest in self.successors(position).tolist()]
+
+    def in_edges(self, node_id: str) -> List[Edge]:
+        position = self._positions.get(node_id)
+        if position is None:
+            return []
+        node = self._node_at(position)
+        return [Edge(self._node_at(src), node) for src in self.predecessors(position).tolist()]
+
+    def out_degrees(self) -> np.ndarray:
+        return np.diff(self._out_offsets)
+
+    def in_degrees(self) -> np.ndarray:
+        return np.diff(self._in_offsets)
+
+    def degrees(self) -> np.ndarray:
+        """Number of incident edges of every node, in node position order."""
+        return self.out_degrees() + self.in_degrees()
+
+    def degree(self, node_id: str) -> int:
+        position = self._positions.get(node_id)
+        if position is None:
+            return 0
+        return int(self._out_offsets[position + 1] - self._out_offsets[position]
+                   + self._in_offsets[position + 1] - self._in_offsets[position])
+
+    def node_mask(self, node_ids: Iterable[str]) -> np.ndarray:
+        """Boolean mask over node positions, set for the given node ids that belong to the graph."""
+        mask = np.zeros(len(self._ids), dtype=bool)
+        positions = [self._positions[node_id] for node_id in node_ids if node_id in self._positions]
+        mask[np.asarray(positions, dtype=np.int64)] = True
+        return mask
+
+    def edge_mask(self, node_mask: np.ndarray) -> np.ndarray:
+        """Boolean mask over edges in CSR order, set for edges with both endpoints in the node mask."""
+        return node_mask[_expand(self._out_offsets)] & node_mask[self._out_targets]
+
+    def select_nodes(self, attribute: str, operator: 'FilterOperator', convert: Callable[[Any], Any]) -> Set[str]:
+        return self._ids_of(self._attributes.compare(attribute, operator, convert))
+
+    def search_nodes(self, search: 'Search') -> Optional[Set[str]]:
+        from . import SearchMode
+
+        if search.limit is not None or search.mode == SearchMode.FUZZY:
+            return None
+        return self._ids_of(self._attributes.search(search.query, search.mode))
+
+    def _ids_of(self, mask: np.ndarray) -> Set[str]:
+        ids = self._ids
+        return {ids[position] for position in np.flatnonzero(mask).tolist()}
+
+    def induced_edge_keys(self, node_ids: Set[str]) -> Set[Tuple[str, str]]:
+        mask = self.edge_mask(self.node_mask(node_ids))
+        sources = _expand(self._out_offsets)[mask].tolist()
+        targets = self._out_targets[mask].tolist()
+        ids = self._ids
+        return {(ids[src], ids[dest]) for src, dest in zip(sources, targets)}
+
+
+class CSRGraphBuilder(object):
+    """
+    Collects nodes and edges by id for datasources that build a `CSRGraph` directly,
+    without creating `Node` and `Edge` objects.
+    """
+
+    def __init__(self, directed: bool = True):
+        self._directed = directed
+        self._ids: List[str] = []
+        self._data: List[Dict[str, Any]] = []
+        self._positions: Dict[str, int] = {}
+        self._sources = array("i")
+        self._targets = array("i")
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._positions
+
+    def _position(self, node_id: str, data: Optional[Dict[str, Any]] = None) -> int:
+        position = self._positions.get(node_id)
+        if position is None:
+            position = self._positions[node_id] = len(self._ids)
+            self._ids.append(node_id)
+            self._data.append(data if data is not None else {})
+        return position
+
+    def add_node(self, node_id: str, data: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Adds a node with the given data.
+
+        :return: False if a node with the same id was already added.
+        """
+        if node_id in self._positions:
+            return False
+        self._position(node_id, data)
+        return True
+
+    def node_data(self, node_id: str) -> Dict[str, Any]:
+        """Returns the data dict of the node, adding the node with empty data if it is missing."""
+        return self._data[self._position(node_id)]
+
+    def add_edge(self, src_id: str, dest_id: str):
+        """Adds the edge src -> dest, adding missing endpoints with empty data."""
+        self._sources.append(self._position(src_id))
+        self._targets.append(self._position(dest_id))
+
+    def build(self) -> CSRGraph:
+        return CSRGraph.from_arrays(self._ids, self._data,
+                                    np.frombuffer(self._sources, dtype=np.int32),
+                                    np.frombuffer(self._targets, dtype=np.int32),
+                                    self._directed)
@@ -3,6 +3,8 @@ from typing import Dict, Any
 from . import Node
 
 class Edge(object):
+    __slots__ = ("_src", "_dest")
+
     def __init__(self, src: Node, dest: Node):
         self._src = src
         self._dest = dest
@@ -1,10 +1,11 @@
 from datetime import datetime
-from typing import Union, TYPE_CHECKING
+from typing import Any, Callable, Dict, Iterable, List, Set, Union, TYPE_CHECKING
 
 from . import Node
+from .attribute_index import value_type_key
 
 if TYPE_CHECKING:
-    from . import FilterOperator
+    from . import FilterOperator, Graph
 
 class Filter:
     _current_id = 0
@@ -14,21 +15,38 @@ class Filter:
         self._attribute = attribute
         self._operator = operator
         self._value = value
+        # Compiled predicates per attribute value type (and timezone for datetimes)
+        self._predicates: Dict[Any, Callable[[Any], bool]] = {}
 
     @property
     def id(self):
         return self._id
 
-    def __call__(self, node: Node) -> bool:
-        from . import FilterOperator
+    @property
+    def attribute(self) -> str:
+        return self._attribute
 
-        if self._attribute not in node.data:
-            return False
-        attr_value = node.data[self._attribute]
+    @property
+    def operator(self) -> 'FilterOperator':
+        return self._operator
+
+    @property
+    def value(self) -> Union[str, int, float, datetime]:
+        return self._value
+
+    @property
+    def key(self) -> tuple:
+        """Canonical identity of the filter condition, independent of the filter id."""
+        return self._attribute, self._operator.value, self._value
 
+    def _parse_value(self, attr_value):
+        """Convert the filter value to the type of the attribute value it is compared with."""
         try:
             if isinstance(attr_value, datetime):
-                compare_value = datetime.strptime(self._value, "%Y-%m-%d")
+                if isinstance(self._value, datetime):
+                    compare_value = self._value
+                else:
+                    compare_value = datetime.strptime(self._value, "%Y-%m-%d")
                 if attr_value.tzinfo is not None and compare_value.tzinfo is None:
                     compare_value = compare_value.replace(tzinfo=attr_value.tzinfo)
             else:
@@ -38,21 +56,45 @@ class Filter:
                     compare_value = type(attr_value)(self._value)
         except (ValueError, TypeError):
             raise ValueError(f"Cannot compare values of types: {type(attr_value)} and {type(self._value)}")
+        return compare_value
+
+    def _predicate(self, attr_value) -> Callable[[Any], bool]:
+        """Returns the predicate compiled for the type of the given attribute value."""
+        key = value_type_key(attr_value)
+        predicate = self._predicates.get(key)
+        if predicate is None:
+            compare = self._operator.function
+            compare_value = self._parse_value(attr_value)
+            predicate = lambda value: compare(value, compare_value)
+            self._predicates[key] = predicate
+        return predicate
+
+    def __call__(self, node: Node) -> bool:
+        if self._attribute not in node.data:
+            return False
+        attr_value = node.data[self._attribute]
+        return self._predicate(attr_value)(attr_value)
+
+    def apply(self, nodes: Iterable[Node]) -> List[Node]:
+        """Returns the nodes that satisfy the filter."""
+        attribute = self._attribute
+        predicates = self._predicates
+        result = []
+        for node in nodes:
+            data = node.data
+            if attribute not in data:
+                continue
+            attr_value = data[attribute]
+            predicate = predicates.get(value_type_key(attr_value))
+            if predicate is None:
+                predicate = self._predicate(attr_value)
+            if predicate(attr_value):
+                result.append(node)
+        return result
 
-        if self._operator == FilterOperator.EQUAL:
-            return attr_value == compare_value
-        elif self._operator == FilterOperator.NOT_EQUAL:
-            return attr_value != compare_value
-        elif self._operator == FilterOperator.GREATER_THAN:
-            return attr_value > compare_value
-        elif self._operator == FilterOperator.GREATER_THAN_OR_EQUAL:
-            return attr_value >= compare_value
-        elif self._operator == FilterOperator.LESS_THAN:
-            return attr_value < compare_value
-        elif self._operator == FilterOperator.LESS_THAN_OR_EQUAL:
-            return attr_value <= compare_value
-        else:
-            raise ValueError(f"Unsupported operator: {self._operator}")
+    def lookup(self, graph: 'Graph') -> Set[str]:
+        """Returns ids of the graph nodes that satisfy the filter, using the graph's attribute index or columns."""
+        return graph.select_nodes(self._attribute, self._operator, self._parse_value)
 
     def __str__(self):
         return f"{self._attribute} {self._operator.name} {self._value}"
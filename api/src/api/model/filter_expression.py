@@ -0,0 +1,222 @@
+import re
+from typing import Iterable, List, Set, Tuple, TYPE_CHECKING
+
+from . import Node, Filter, FilterOperator
+
+if TYPE_CHECKING:
+    from . import Graph
+
+_TOKEN_PATTERN = re.compile(r'''
+    \s*(?:
+        (?P<lparen>\() |
+        (?P<rparen>\)) |
+        (?P<operator>>=|<=|!=|=|>|<) |
+        "(?P<double_quoted>(?:[^"\\]|\\.)*)" |
+        '(?P<single_quoted>(?:[^'\\]|\\.)*)' |
+        (?P<word>[^\s()<>=!"']+)
+    )''', re.VERBOSE)
+
+_KEYWORDS = ("AND", "OR", "NOT")
+
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN_PATTERN.match(expression, position)
+        if not match or match.end() == position:
+            raise ValueError(f"Unexpected character at position {position} in filter expression: {expression[position:]}")
+        position = match.end()
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind in ("double_quoted", "single_quoted"):
+            tokens.append(("string", re.sub(r"\\(.)", r"\1", text)))
+        elif kind == "word" and text.upper() in _KEYWORDS:
+            tokens.append((text.upper(), text))
+        else:
+            tokens.append((kind, text))
+    return tokens
+
+
+def _quote(value) -> str:
+    text = str(value)
+    if re.fullmatch(r'[^\s()<>=!"\']+', text) and text.upper() not in _KEYWORDS:
+        return text
+    return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+class Comparison(object):
+    """Leaf of a filter expression, a single `attribute operator value` condition."""
+
+    def __init__(self, filter_obj: Filter):
+        self.filter = filter_obj
+        self.children = ()
+
+    def __call__(self, node: Node) -> bool:
+        return self.filter(node)
+
+    def __str__(self):
+        return f"{_quote(self.filter.attribute)} {self.filter.operator.value} {_quote(self.filter.value)}"
+
+
+class And(object):
+    def __init__(self, children: List):
+        self.children = children
+
+    def __call__(self, node: Node) -> bool:
+        return all(child(node) for child in self.children)
+
+    def __str__(self):
+        return "(" + " AND ".join(str(child) for child in self.children) + ")"
+
+
+class Or(object):
+    def __init__(self, children: List):
+        self.children = children
+
+    def __call__(self, node: Node) -> bool:
+        return any(child(node) for child in self.children)
+
+    def __str__(self):
+        return "(" + " OR ".join(str(child) for child in self.children) + ")"
+
+
+class Not(object):
+    def __init__(self, child):
+        self.child = child
+        self.children = (child,)
+
+    def __call__(self, node: Node) -> bool:
+        return not self.child(node)
+
+    def __str__(self):
+        return f"NOT {self.child}"
+
+
+class _Parser(object):
+    """
+    Recursive descent parser for filter expressions:
+
+        expression := and_expr (OR and_expr)*
+        and_expr   := not_expr (AND not_expr)*
+        not_expr   := NOT not_expr | '(' expression ')' | attribute operator value
+    """
+
+    def __init__(self, expression: str):
+        self._tokens = _tokenize(expression)
+        self._position = 0
+
+    def _peek(self) -> str:
+        return self._tokens[self._position][0] if self._position < len(self._tokens) else None
+
+    def _next(self, description: str, *expected: str) -> str:
+        if self._position >= len(self._tokens):
+            raise ValueError(f"Unexpected end of filter expression, expected {description}")
+        kind, text = self._tokens[self._position]
+        if kind not in expected:
+            raise ValueError(f"Unexpected '{text}' in filter expression, expected {description}")
+        self._position += 1
+        return text
+
+    def parse(self):
+        root = self._expression()
+        if self._position < len(self._tokens):
+            raise ValueError(f"Unexpected '{self._tokens[self._position][1]}' in filter expression")
+        return root
+
+    def _expression(self):
+        children = [self._and_expression()]
+        while self._peek() == "OR":
+            self._next("OR", "OR")
+            children.append(self._and_expression())
+        return children[0] if len(children) == 1 else Or(children)
+
+    def _and_expression(self):
+        children = [self._not_expression()]
+        while self._peek() == "AND":
+            self._next("AND", "AND")
+            children.append(self._not_expression())
+        return children[0] if len(children) == 1 else And(children)
+
+    def _not_expression(self):
+        if self._peek() == "NOT":
+            self._next("NOT", "NOT")
+            return Not(self._not_expression())
+        if self._peek() == "lparen":
+            self._next("(", "lparen")
+            inner = self._expression()
+            self._next(")", "rparen")
+            return inner
+        attribute = self._next("attribute", "word", "string")
+        operator = FilterOperator(self._next("comparison operator", "operator"))
+        value = self._next("value", "word", "string")
+        return Comparison(Filter(attribute, operator, value))
+
+
+def parse_expression(expression: str):
+    """
+    Parses a boolean filter expression, e.g. `(age > 20 AND city = "Novi Sad") OR NOT type = Person`.
+
+    :raises ValueError: If the expression is not valid.
+    """
+    if not expression or not expression.strip():
+        raise ValueError("Filter expression cannot be empty")
+    return _Parser(expression).parse()
+
+
+class FilterExpression(object):
+    """
+    A boolean combination of filter conditions. It can be used in a workspace
+    wherever a `Filter` can, and is evaluated by the `QueryPlanner`.
+    """
+
+    def __init__(self, expression: str):
+        self._root = parse_expression(expression)
+        # Shares the id sequence with Filter so workspace filters have unique ids
+        Filter._current_id += 1
+        self._id = Filter._current_id
+        self._expression = expression
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def expression(self) -> str:
+        return self._expression
+
+    @property
+    def root(self):
+        return self._root
+
+    @property
+    def key(self) -> tuple:
+        """Canonical identity of the expression, independent of the filter id and formatting."""
+        return "expression", str(self._root)
+
+    def __call__(self, node: Node) -> bool:
+        return self._root(node)
+
+    def apply(self, nodes: Iterable[Node]) -> List[Node]:
+        """Returns the nodes that satisfy the expression."""
+        return [node for node in nodes if self._root(node)]
+
+    def lookup(self, graph: 'Graph') -> Set[str]:
+        """Returns ids of the graph nodes that satisfy the expression."""
+        from .query_planner import QueryPlanner
+        return QueryPlanner(graph).execute(self._root)
+
+    def explain(self, graph: 'Graph') -> str:
+        """Executes the expression against the graph and describes the chosen plan."""
+        from .query_planner import QueryPlanner
+        return QueryPlanner(graph).explain(self._root)
+
+    def __str__(self):
+        return str(self._root)
+
+    def to_dict(self):
+        return {
+            "id": self._id,
+            "expression": self._expression
+        }
@@ -1,3 +1,4 @@
+import operator
 from enum import Enum
 
 class FilterOperator(Enum):
@@ -11,3 +12,18 @@ class FilterOperator(Enum):
     @classmethod
     def choices(cls):
         return [(operator.name, operator.value) for operator in cls]
+
+    @property
+    def function(self):
+        """Binary function from the `operator` module implementing this comparison."""
+        return _OPERATOR_FUNCTIONS[self]
+
+
+_OPERATOR_FUNCTIONS = {
+    FilterOperator.EQUAL: operator.eq,
+    FilterOperator.NOT_EQUAL: operator.ne,
+    FilterOperator.GREATER_THAN: operator.gt,
+    FilterOperator.GREATER_THAN_OR_EQUAL: operator.ge,
+    FilterOperator.LESS_THAN: operator.lt,
+    FilterOperator.LESS_THAN_OR_EQUAL: operator.le,
+}
@@ -1,16 +1,57 @@
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Set, Tuple, TYPE_CHECKING
 from . import Node, Edge
+from .attribute_index import AttributeIndex
+from .graph_statistics import GraphStatistics
+
+if TYPE_CHECKING:
+    from . import FilterOperator, Search
 
 class Graph(object):
-    def __init__(self, nodes: List[Node], edges: List[Edge], directed: bool):
-        self._nodes = nodes
-        self._edges = edges
+    """
+    Graph keeps an id -> Node index and out/in adjacency maps so lookups and
+    mutations don't need to scan the node and edge lists.
+
+    `nodes` and `edges` return list snapshots for read-only use by plugins;
+    mutations must go through `add_node`, `update_node`, `remove_node`, `add_edge`
+    and `remove_edge` so that adjacency and attribute indexes stay in sync.
+    """
+
+    def __init__(self, nodes: Iterable[Node], edges: Iterable[Edge], directed: bool):
         self._directed = directed
+        self._version = 0
+        self._reset(nodes, edges)
+
+    def _reset(self, nodes: Iterable[Node], edges: Iterable[Edge]):
+        self._nodes: Dict[str, Node] = {}
+        self._out: Dict[str, Dict[str, Edge]] = {}
+        self._in: Dict[str, Dict[str, Edge]] = {}
+        self._edge_count = 0
+        self._nodes_list: Optional[List[Node]] = None
+        self._edges_list: Optional[List[Edge]] = None
+        self._attribute_indexes: Dict[str, AttributeIndex] = {}
+        self._statistics: Optional[GraphStatistics] = None
+        self._invalidate()
+        for node in nodes:
+            self.add_node(node)
+        for edge in edges:
+            # Edges may point to nodes that were not passed in `nodes`, register them as well
+            for endpoint in (edge.src, edge.dest):
+                if endpoint.id not in self._nodes:
+                    self.add_node(endpoint)
+            self.add_edge(edge)
+
+    def _invalidate(self):
+        self._version += 1
+        self._nodes_list = None
+        self._edges_list = None
+        self._node_positions: Optional[Dict[str, int]] = None
 
     @property
     def nodes(self) -> List[Node]:
-        return self._nodes
+        if self._nodes_list is None:
+            self._nodes_list = list(self._nodes.values())
+        return self._nodes_list
 
     @nodes.setter
     def nodes(self, value: List[Node]):
@@ -19,11 +60,14 @@ class Graph(object):
         for node in value:
             if not isinstance(node, Node):
                 raise TypeError('All items in the list must be of type Node')
-        self._nodes = value
+        node_ids = {node.id for node in value}
+        self._reset(value, [edge for edge in self.edges if edge.src.id in node_ids and edge.dest.id in node_ids])
 
     @property
     def edges(self) -> List[Edge]:
-        return self._edges
+        if self._edges_list is None:
+            self._edges_list = [edge for targets in self._out.values() for edge in targets.values()]
+        return self._edges_list
 
     @edges.setter
     def edges(self, value: List[Edge]):
@@ -32,7 +76,7 @@ class Graph(object):
         for edge in value:
             if not isinstance(edge, Edge):
                 raise TypeError('All items in the list must be of type Edge')
-        self._edges = value
+        self._reset(list(self.nodes), value)
 
     @property
     def directed(self):
@@ -43,12 +87,218 @@ class Graph(object):
         if not isinstance(value, bool):
             raise TypeError('Directed must be a boolean')
         self._directed = value
+        self._invalidate()
+
+    @property
+    def version(self) -> int:
+        """Mutation counter, incremented on every change of nodes, edges or node data."""
+        return self._version
+
+    @property
+    def node_count(self) -> int:
+        return len(self._nodes)
+
+    @property
+    def edge_count(self) -> int:
+        return self._edge_count
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._nodes
+
+    @property
+    def node_ids(self) -> Iterable[str]:
+        return self._nodes.keys()
+
+    def get_node(self, node_id: str) -> Optional[Node]:
+        return self._nodes.get(node_id)
+
+    def position(self, node_id: str) -> Optional[int]:
+        """Index of the node in `nodes`, None if it doesn't belong to the graph."""
+        if self._node_positions is None:
+            self._node_positions = {node_id: position for position, node_id in enumerate(self._nodes)}
+        return self._node_positions.get(node_id)
+
+    def get_edge(self, src_id: str, dest_id: str) -> Optional[Edge]:
+        edge = self._out.get(src_id, {}).get(dest_id)
+        if edge is None and not self._directed:
+            edge = self._out.get(dest_id, {}).get(src_id)
+        return edge
+
+    def add_node(self, node: Node) -> bool:
+        """
+        Adds a node to the graph.
+
+        :return: False if a node with the same id already exists.
+        """
+        if node.id in self._nodes:
+            return False
+        self._nodes[node.id] = node
+        self._out[node.id] = {}
+        self._in[node.id] = {}
+        for attribute, index in self._attribute_indexes.items():
+            if attribute in node.data:
+                index.add(node.id, node.data[attribute])
+        self._invalidate()
+        return True
+
+    def update_node(self, node_id: str, **attributes) -> bool:
+        """
+        Updates attributes of an existing node.
+
+        :return: False if the node does not exist.
+        """
+        node = self.get_node(node_id)
+        if node is None:
+            return False
+        for attribute, value in attributes.items():
+            index = self._attribute_indexes.get(attribute)
+            if index is not None:
+                if attribute in node.data:
+                    index.remove(node_id, node.data[attribute])
+                index.add(node_id, value)
+        node.data.update(attributes)
+        self._invalidate()
+        return True
+
+    def remove_node(self, node_id: str) -> bool:
+        """
+        Removes a node together with all of its incident edges in O(degree).
+
+        :return: False if the node does not exist.
+        """
+        if node_id not in self._nodes:
+            return False
+        for dest_id in list(self._out[node_id]):
+            self.remove_edge(node_id, dest_id)
+        for src_id in list(self._in[node_id]):
+            self.remove_edge(src_id, node_id)
+        node = self._nodes.pop(node_id)
+        for attribute, index in self._attribute_indexes.items():
+            if attribute in node.data:
+                index.remove(node_id, node.data[attribute])
+        del self._out[node_id]
+        del self._in[node_id]
+        self._invalidate()
+        return True
+
+    def add_edge(self, edge: Edge) -> bool:
+        """
+        Adds an edge between two nodes that already belong to the graph.
+
+        :return: False if an endpoint is missing or the edge already exists.
+        """
+        src_id, dest_id = edge.src.id, edge.dest.id
+        if src_id not in self._nodes or dest_id not in self._nodes:
+            return False
+        if dest_id in self._out[src_id]:
+            return False
+        self._out[src_id][dest_id] = edge
+        self._in[dest_id][src_id] = edge
+        self._edge_count += 1
+        self._invalidate()
+        return True
+
+    def remove_edge(self, src_id: str, dest_id: str) -> bool:
+        """
+        Removes the edge src -> dest.
+
+        :return: False if the edge does not exist.
+        """
+        if dest_id not in self._out.get(src_id, {}):
+            return False
+        del self._out[src_id][dest_id]
+        del self._in[dest_id][src_id]
+        self._edge_count -= 1
+        self._invalidate()
+        return True
+
+    def has_edge(self, src_id: str, dest_id: str) -> bool:
+        return self.get_edge(src_id, dest_id) is not None
+
+    def neighbors(self, node_id: str) -> List[Node]:
+        """
+        Returns successors of the node, or all adjacent nodes if the graph is undirected.
+        """
+        if node_id not in self._nodes:
+            return []
+        neighbor_ids = list(self._out[node_id])
+        if not self._directed:
+            neighbor_ids.extend(src_id for src_id in self._in[node_id] if src_id not in self._out[node_id])
+        return [self._nodes[neighbor_id] for neighbor_id in neighbor_ids]
+
+    def out_edges(self, node_id: str) -> List[Edge]:
+        return list(self._out.get(node_id, {}).values())
+
+    def in_edges(self, node_id: str) -> List[Edge]:
+        return list(self._in.get(node_id, {}).values())
+
+    def incident_edges(self, node_id: str) -> List[Edge]:
+        """Returns all outgoing and incoming edges of the node."""
+        return self.out_edges(node_id) + [edge for edge in self.in_edges(node_id) if edge.src.id != node_id]
+
+    def attribute_index(self, attribute: str) -> AttributeIndex:
+        """
+        Returns the index of node ids by value of the attribute, building it on first use.
+        Built indexes are kept up to date by `add_node`, `update_node` and `remove_node`.
+        """
+        index = self._attribute_indexes.get(attribute)
+        if index is None:
+            index = AttributeIndex(attribute)
+            for node in self._iter_nodes():
+                if attribute in node.data:
+                    index.add(node.id, node.data[attribute])
+            self._attribute_indexes[attribute] = index
+        return index
+
+    def statistics(self) -> GraphStatistics:
+        """
+        Returns per-attribute statistics for query planning. They are estimates, so they
+        are only recollected once enough mutations happened since the last collection.
+        """
+        statistics = self._statistics
+        if statistics is None or self._version - statistics.version > max(100, self.node_count // 10):
+            statistics = self._statistics = GraphStatistics(self._iter_nodes(), self._version)
+        return statistics
+
+    def select_nodes(self, attribute: str, operator: 'FilterOperator', convert: Callable[[Any], Any]) -> Set[str]:
+        """
+        Returns ids of nodes whose attribute value satisfies the comparison.
+
+        :param convert: Converts the comparison value to the type of a sample attribute value.
+        :raises ValueError: If the comparison value can't be converted.
+        """
+        return self.attribute_index(attribute).select(operator, convert)
+
+    def search_nodes(self, search: 'Search') -> Optional[Set[str]]:
+        """
+        Returns ids of nodes matching the search if the storage can answer it directly,
+        None if it has to be answered from a search index.
+        """
+        return None
+
+    def _iter_nodes(self) -> Iterator[Node]:
+        """Iterates over the nodes for full scans, without building the `nodes` list."""
+        return iter(self._nodes.values())
+
+    def induced_edge_keys(self, node_ids: Set[str]) -> Set[Tuple[str, str]]:
+        """Returns (source id, destination id) pairs of the edges between the given nodes."""
+        return {
+            (node_id, dest_id) for node_id in node_ids if node_id in self._out
+            for dest_id in self._out[node_id] if dest_id in node_ids
+        }
+
+    def drop_attribute_indexes(self):
+        self._attribute_indexes.clear()
+
+    def clear(self):
+        """Remove all nodes and edges from the graph"""
+        self._reset([], [])
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert Graph to dictionary for JSON serialization"""
         return {
-            "nodes": [node.to_dict() for node in self._nodes],
-            "edges": [edge.to_dict() for edge in self._edges],
+            "nodes": [node.to_dict() for node in self.nodes],
+            "edges": [edge.to_dict() for edge in self.edges],
             "directed": self._directed
         }
 
@@ -80,4 +330,3 @@ class Graph(object):
         nodes_str = "\n".join(str(node) for node in self.nodes)
         edges_str = "\n".join(str(edge) for edge in self.edges)
         return f"Nodes:\n{nodes_str}\nEdges:\n{edges_str}"
-
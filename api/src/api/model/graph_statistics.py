@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from . import Node
+
+
+class AttributeStatistics(object):
+    """Number of nodes, distinct values and value range of a single attribute."""
+
+    def __init__(self):
+        self.count = 0
+        self._values = set()
+        self._distinct: Optional[int] = None
+        self.minimum: Optional[Any] = None
+        self.maximum: Optional[Any] = None
+
+    @property
+    def distinct(self) -> int:
+        return len(self._values) if self._distinct is None else self._distinct
+
+    @classmethod
+    def restore(cls, count: int, distinct: int, minimum: Any = None, maximum: Any = None) -> 'AttributeStatistics':
+        """Creates statistics from previously collected numbers, e.g. stored in a snapshot."""
+        statistics = cls()
+        statistics.count = count
+        statistics._distinct = distinct
+        statistics.minimum = minimum
+        statistics.maximum = maximum
+        return statistics
+
+    def add(self, value: Any):
+        self.count += 1
+        self._values.add(value)
+        if isinstance(value, (int, float, datetime)) and not isinstance(value, bool):
+            try:
+                if self.minimum is None or value < self.minimum:
+                    self.minimum = value
+                if self.maximum is None or value > self.maximum:
+                    self.maximum = value
+            except TypeError:
+                # Mixed numbers and datetimes, keep the range of the first kind seen
+                pass
+
+
+class GraphStatistics(object):
+    """
+    Per-attribute statistics of a graph, used by the query planner to estimate
+    how many nodes a filter selects.
+    """
+
+    def __init__(self, nodes: Iterable[Node], version: Optional[int] = None):
+        self.version = version
+        self.node_count = 0
+        self._attributes: Dict[str, AttributeStatistics] = {}
+        for node in nodes:
+            self.node_count += 1
+            for attribute, value in node.data.items():
+                statistics = self._attributes.get(attribute)
+                if statistics is None:
+                    statistics = self._attributes[attribute] = AttributeStatistics()
+                statistics.add(value)
+
+    def attribute(self, attribute: str) -> Optional[AttributeStatistics]:
+        return self._attributes.get(attribute)
+
+    @property
+    def attributes(self) -> Dict[str, AttributeStatistics]:
+        return self._attributes
+
+    @classmethod
+    def restore(cls, node_count: int, attributes: Dict[str, AttributeStatistics],
+                version: Optional[int] = None) -> 'GraphStatistics':
+        statistics = cls((), version)
+        statistics.node_count = node_count
+        statistics._attributes = dict(attributes)
+        return statistics
@@ -0,0 +1,141 @@
+import json
+from typing import AbstractSet, Any, Callable, Dict, Iterator, Optional, Tuple, TypeVar, Generic
+
+from . import Node, Edge, Graph
+
+T = TypeVar("T")
+
+# Below this share of the base graph, iterate the id masks instead of scanning the base graph
+_SPARSE_MASK_RATIO = 1 / 8
+
+
+class _LazySequence(Generic[T]):
+    """Sized, re-iterable sequence whose items are produced on every iteration."""
+
+    def __init__(self, iterate: Callable[[], Iterator[T]], length: Callable[[], int]):
+        self._iterate = iterate
+        self._length = length
+
+    def __iter__(self) -> Iterator[T]:
+        return self._iterate()
+
+    def __len__(self) -> int:
+        return self._length()
+
+    def __bool__(self) -> bool:
+        return self._length() > 0
+
+
+class GraphView(object):
+    """
+    Read-only view of a graph restricted to a set of node ids.
+
+    It offers the same `nodes`/`edges`/`directed`/`to_dict` interface as `Graph`
+    but keeps only a reference to the base graph and the id masks. Nodes and edges
+    are looked up lazily on each iteration, so no node or edge lists are copied.
+    Nodes and edges keep the order they have in the base graph.
+    """
+
+    def __init__(self, graph: Graph, node_ids: Optional[AbstractSet[str]] = None,
+                 edge_keys: Optional[AbstractSet[Tuple[str, str]]] = None):
+        """
+        :param graph: The base graph.
+        :param node_ids: Ids of the visible nodes, None for all nodes of the base graph.
+        :param edge_keys: (source id, destination id) pairs of the visible edges, None for
+            all base graph edges between visible nodes.
+        """
+        self._graph = graph
+        self._node_ids = node_ids
+        self._edge_keys = edge_keys
+
+    @property
+    def base(self) -> Graph:
+        return self._graph
+
+    @property
+    def directed(self) -> bool:
+        return self._graph.directed
+
+    @property
+    def nodes(self) -> _LazySequence[Node]:
+        if self._node_ids is None:
+            return self._graph.nodes
+        return _LazySequence(self._iter_nodes, lambda: len(self._node_ids))
+
+    @property
+    def edges(self) -> _LazySequence[Edge]:
+        if self._node_ids is None:
+            return self._graph.edges
+        if self._edge_keys is not None:
+            return _LazySequence(self._iter_edge_keys, lambda: len(self._edge_keys))
+        return _LazySequence(self._iter_edges, lambda: sum(1 for _ in self._iter_edges()))
+
+    @property
+    def node_count(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.edges)
+
+    def _iter_nodes(self) -> Iterator[Node]:
+        graph = self._graph
+        if len(self._node_ids) < graph.node_count * _SPARSE_MASK_RATIO:
+            # Sorted by position, so the order doesn't depend on how the id set hashes
+            for node_id in sorted((node_id for node_id in self._node_ids if node_id in graph), key=graph.position):
+                yield graph.get_node(node_id)
+        else:
+            node_ids = self._node_ids
+            for node in self._graph.nodes:
+                if node.id in node_ids:
+                    yield node
+
+    def _iter_edge_keys(self) -> Iterator[Edge]:
+        edge_keys = self._edge_keys
+        for node in self._iter_nodes():
+            for edge in self._graph.out_edges(node.id):
+                if (edge.src.id, edge.dest.id) in edge_keys:
+                    yield edge
+
+    def _iter_edges(self) -> Iterator[Edge]:
+        node_ids = self._node_ids
+        for node in self._iter_nodes():
+            for edge in self._graph.out_edges(node.id):
+                if edge.dest.id in node_ids:
+                    yield edge
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._graph and (self._node_ids is None or node_id in self._node_ids)
+
+    def get_node(self, node_id: str) -> Optional[Node]:
+        return self._graph.get_node(node_id) if node_id in self else None
+
+    def has_edge(self, src_id: str, dest_id: str) -> bool:
+        if src_id not in self or dest_id not in self:
+            return False
+        if self._edge_keys is None:
+            return self._graph.has_edge(src_id, dest_id)
+        return (src_id, dest_id) in self._edge_keys or (
+            not self.directed and (dest_id, src_id) in self._edge_keys
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the view to dictionary for JSON serialization, in the same format as `Graph`"""
+        return {
+            "nodes": [node.to_dict() for node in self.nodes],
+            "edges": [edge.to_dict() for edge in self.edges],
+            "directed": self.directed
+        }
+
+    def to_json(self, indent: int = None) -> str:
+        """Convert the view to JSON string"""
+        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+
+    def to_graph(self) -> Graph:
+        """Copies the visible nodes and edges into an independent `Graph`."""
+        return Graph(list(self.nodes), list(self.edges), self.directed)
+
+    def __str__(self):
+        nodes_str = "\n".join(str(node) for node in self.nodes)
+        edges_str = "\n".join(str(edge) for edge in self.edges)
+        return f"Nodes:\n{nodes_str}\nEdges:\n{edges_str}"
@@ -1,9 +1,29 @@
 import json
-from typing import List, Dict, Union, Any
+import sys
+from typing import List, Dict, Optional, Union, Any
 from datetime import datetime, date
 
 
+def intern_attributes(data: Dict[str, Any], pool: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Returns a copy of node data with interned attribute keys, so nodes loaded from the
+    same source share one string object per key instead of holding their own copies.
+
+    :param data: Node data.
+    :param pool: Optional string pool shared during a load. When given, equal string
+        values are deduplicated through it as well.
+    """
+    if pool is None:
+        return {sys.intern(key): value for key, value in data.items()}
+    return {
+        sys.intern(key): pool.setdefault(value, value) if isinstance(value, str) else value
+        for key, value in data.items()
+    }
+
+
 class Node(object):
+    __slots__ = ("_id", "_data")
+
     def __init__(self, id: str, data: Dict[str, Union[str, int, float, datetime]]):
         self._id = id
         self._data = data
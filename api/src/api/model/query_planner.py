@@ -0,0 +1,157 @@
+import time
+from typing import Dict, List, Optional, Set, TYPE_CHECKING
+
+from . import FilterOperator
+from .filter_expression import And, Comparison, Not, Or
+
+if TYPE_CHECKING:
+    from . import Graph
+
+# Fraction of an attribute's nodes assumed to match a range comparison that can't be interpolated
+_DEFAULT_RANGE_SELECTIVITY = 1 / 3
+
+
+class QueryPlanner(object):
+    """
+    Evaluates filter expressions against a graph.
+
+    Children of AND are executed from the most to the least selective, each one
+    only on the nodes that survived so far, and evaluation stops as soon as
+    nothing is left. Children of OR run from the least selective and stop once
+    every candidate matched. A condition is answered from the attribute index,
+    unless it is cheaper to check it on the few remaining candidates directly.
+    Selectivity is estimated from the graph's attribute statistics.
+    """
+
+    def __init__(self, graph: 'Graph'):
+        self._graph = graph
+        self._statistics = graph.statistics()
+        self._estimates: Dict[int, float] = {}
+
+    def estimate(self, expression) -> float:
+        """Estimated number of nodes selected by the expression."""
+        key = id(expression)
+        if key not in self._estimates:
+            self._estimates[key] = self._estimate(expression)
+        return self._estimates[key]
+
+    def _estimate(self, expression) -> float:
+        total = self._statistics.node_count
+        if isinstance(expression, Comparison):
+            return self._estimate_comparison(expression)
+        if not total:
+            return 0.0
+        if isinstance(expression, Not):
+            return total - self.estimate(expression.child)
+        if isinstance(expression, And):
+            fraction = 1.0
+            for child in expression.children:
+                fraction *= self.estimate(child) / total
+            return total * fraction
+        if isinstance(expression, Or):
+            fraction = 1.0
+            for child in expression.children:
+                fraction *= 1 - self.estimate(child) / total
+            return total * (1 - fraction)
+        raise TypeError(f"Unsupported filter expression: {expression}")
+
+    def _estimate_comparison(self, comparison: Comparison) -> float:
+        filter_obj = comparison.filter
+        statistics = self._statistics.attribute(filter_obj.attribute)
+        if statistics is None:
+            return 0.0
+        equal = statistics.count / max(statistics.distinct, 1)
+        operator = filter_obj.operator
+        if operator == FilterOperator.EQUAL:
+            return equal
+        if operator == FilterOperator.NOT_EQUAL:
+            return statistics.count - equal
+
+        low, high = statistics.minimum, statistics.maximum
+        try:
+            value = filter_obj._parse_value(low)
+            if operator in (FilterOperator.GREATER_THAN, FilterOperator.GREATER_THAN_OR_EQUAL):
+                fraction = (high - value) / (high - low)
+            else:
+                fraction = (value - low) / (high - low)
+        except (ArithmeticError, TypeError, ValueError):
+            return statistics.count * _DEFAULT_RANGE_SELECTIVITY
+        return statistics.count * min(max(fraction, 0.0), 1.0)
+
+    def execute(self, expression) -> Set[str]:
+        """Returns ids of the nodes that satisfy the expression."""
+        return self._execute(expression, None, None, 0)
+
+    def explain(self, expression) -> str:
+        """
+        Executes the expression and describes the plan: the execution order, how each
+        condition was evaluated, and the estimated and actual number of nodes per step.
+        """
+        trace: List[dict] = []
+        start = time.perf_counter()
+        result = self._execute(expression, None, trace, 0)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        lines = [f"{len(result)} of {self._statistics.node_count} nodes selected in {elapsed:.2f} ms"]
+        for step in trace:
+            line = f"{'  ' * step['depth']}{step['label']}  [{step['strategy']}] estimated={step['estimate']:.0f}"
+            if "rows" in step:
+                line += f" actual={step['rows']} time={step['time']:.2f} ms"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def _execute(self, expression, candidates: Optional[Set[str]], trace: Optional[List[dict]], depth: int) -> Set[str]:
+        step = None
+        if trace is not None:
+            label = str(expression) if isinstance(expression, Comparison) else type(expression).__name__.upper()
+            step = {"label": label, "depth": depth, "estimate": self.estimate(expression), "strategy": ""}
+            trace.append(step)
+        start = time.perf_counter()
+
+        if isinstance(expression, Comparison):
+            if candidates is not None and len(candidates) < self.estimate(expression):
+                result = {node_id for node_id in candidates if expression(self._graph.get_node(node_id))}
+                strategy = f"check {len(candidates)} candidates"
+            else:
+                result = expression.filter.lookup(self._graph)
+                if candidates is not None:
+                    result &= candidates
+                strategy = "attribute index"
+        elif isinstance(expression, And):
+            result = candidates
+            ordered = sorted(expression.children, key=self.estimate)
+            for position, child in enumerate(ordered):
+                result = self._execute(child, result, trace, depth + 1)
+                if not result:
+                    self._skip(ordered[position + 1:], trace, depth + 1)
+                    break
+            strategy = "most selective first"
+        elif isinstance(expression, Or):
+            result = set()
+            ordered = sorted(expression.children, key=self.estimate, reverse=True)
+            limit = len(candidates) if candidates is not None else self._graph.node_count
+            for position, child in enumerate(ordered):
+                result |= self._execute(child, candidates, trace, depth + 1)
+                if len(result) >= limit:
+                    self._skip(ordered[position + 1:], trace, depth + 1)
+                    break
+            strategy = "least selective first"
+        elif isinstance(expression, Not):
+            excluded = self._execute(expression.child, candidates, trace, depth + 1)
+            universe = candidates if candidates is not None else self._graph.node_ids
+            result = {node_id for node_id in universe if node_id not in excluded}
+            strategy = "complement"
+        else:
+            raise TypeError(f"Unsupported filter expression: {expression}")
+
+        if step is not None:
+            step.update(strategy=strategy, rows=len(result), time=(time.perf_counter() - start) * 1000)
+        return result
+
+    def _skip(self, expressions: list, trace: Optional[List[dict]], depth: int):
+        if trace is None:
+            return
+        for expression in expressions:
+            label = str(expression) if isinstance(expression, Comparison) else type(expression).__name__.upper()
+            trace.append({"label": label, "depth": depth, "estimate": self.estimate(expression),
+                          "strategy": "skipped, short-circuit"})
@@ -1,11 +1,20 @@
+from typing import List, Optional, Set, Tuple, Union, TYPE_CHECKING
+
 from . import Node
+from .search_mode import SearchMode
+from .trigram_index import FUZZY_THRESHOLD, similarity
+
+if TYPE_CHECKING:
+    from . import SearchIndex, TrigramIndex
 
 class Search:
     _id = 0
-    def __init__(self, query: str):
+    def __init__(self, query: str, mode: SearchMode = SearchMode.EXACT, limit: Optional[int] = None):
         Search._id += 1
         self._id = Search._id
         self._query = query
+        self._mode = mode
+        self._limit = limit
 
     @property
     def id(self):
@@ -15,12 +24,53 @@ class Search:
     def query(self) -> str:
         return self._query
 
+    @property
+    def mode(self) -> SearchMode:
+        return self._mode
+
+    @property
+    def limit(self) -> Optional[int]:
+        return self._limit
+
+    @property
+    def key(self) -> tuple:
+        """Canonical identity of the search condition, independent of the search id."""
+        return self._mode.value, self._query.lower(), self._limit
+
     def __call__(self, node: Node) -> bool:
-        return self._query.lower() in [str(value).lower() for value in node.data.values()] \
-                or self._query.lower() in [str(key) for key in node.data.keys()]
+        query = self._query.lower()
+        if self._mode == SearchMode.EXACT:
+            return query in [str(value).lower() for value in node.data.values()] \
+                    or query in [str(key) for key in node.data.keys()]
+        values = [str(value).lower() for value in node.data.values()]
+        if self._mode == SearchMode.SUBSTRING:
+            return any(query in value for value in values)
+        if self._mode == SearchMode.PREFIX:
+            return any(value.startswith(query) for value in values)
+        return any(similarity(query, value) >= FUZZY_THRESHOLD for value in values)
+
+    def rank(self, index: 'TrigramIndex') -> List[Tuple[str, float]]:
+        """Returns (node id, score) pairs of the matching nodes, best match first."""
+        return index.search(self._query, self._mode, self._limit)
+
+    def lookup(self, index: Union['SearchIndex', 'TrigramIndex']) -> Set[str]:
+        """
+        Returns ids of the matching nodes using the workspace's search index,
+        `SearchIndex` for exact searches and `TrigramIndex` for the other modes.
+        """
+        if self._mode == SearchMode.EXACT:
+            return index.lookup(self._query)
+        return {node_id for node_id, _ in self.rank(index)}
+
+    def __str__(self):
+        if self._mode == SearchMode.EXACT:
+            return self._query
+        return f"{self._query} ({self._mode.value})"
 
     def to_dict(self):
         return {
             "id": self._id,
-            "query": self._query
-        }
+            "query": self._query,
+            "mode": self._mode.value,
+            "limit": self._limit
+        }
\ No newline at end of file
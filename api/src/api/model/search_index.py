@@ -0,0 +1,56 @@
+from typing import Any, Dict, Iterable, Mapping, Optional, Set
+
+from . import Node
+
+
+class SearchIndex(object):
+    """
+    Inverted index from normalized attribute values and attribute keys to node ids.
+
+    Values are normalized the same way `Search` compares them: lowercased string
+    form for values and the plain string form for keys.
+    """
+
+    def __init__(self, nodes: Iterable[Node] = (), version: Optional[int] = None):
+        self._by_value: Dict[str, Set[str]] = {}
+        self._by_key: Dict[str, Set[str]] = {}
+        self.version = version
+        for node in nodes:
+            self.add(node.id, node.data)
+
+    @staticmethod
+    def _insert(postings: Dict[str, Set[str]], term: str, node_id: str):
+        ids = postings.get(term)
+        if ids is None:
+            ids = postings[term] = set()
+        ids.add(node_id)
+
+    @staticmethod
+    def _discard(postings: Dict[str, Set[str]], term: str, node_id: str):
+        ids = postings.get(term)
+        if ids is not None:
+            ids.discard(node_id)
+            if not ids:
+                del postings[term]
+
+    def add(self, node_id: str, data: Mapping[str, Any]):
+        for key, value in data.items():
+            self._insert(self._by_value, str(value).lower(), node_id)
+            self._insert(self._by_key, str(key), node_id)
+
+    def remove(self, node_id: str, data: Mapping[str, Any]):
+        for key, value in data.items():
+            self._discard(self._by_value, str(value).lower(), node_id)
+            self._discard(self._by_key, str(key), node_id)
+
+    def update(self, node_id: str, old_data: Optional[Mapping[str, Any]], new_data: Optional[Mapping[str, Any]]):
+        """Re-indexes a node whose data changed; None stands for a node that does not exist."""
+        if old_data:
+            self.remove(node_id, old_data)
+        if new_data:
+            self.add(node_id, new_data)
+
+    def lookup(self, query: str) -> Set[str]:
+        """Returns ids of nodes having an attribute value or key equal to the query."""
+        term = query.lower()
+        return self._by_value.get(term, set()) | self._by_key.get(term, set())
@@ -0,0 +1,11 @@
+from enum import Enum
+
+class SearchMode(Enum):
+    EXACT = "exact"
+    SUBSTRING = "substring"
+    PREFIX = "prefix"
+    FUZZY = "fuzzy"
+
+    @classmethod
+    def choices(cls):
+        return [(mode.name, mode.value) for mode in cls]
\ No newline at end of file
@@ -0,0 +1,410 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import MutableMapping, MutableSequence
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import Graph, CSRGraph
+from .attribute_store import AttributeStore, CategoryColumn, Column, DatetimeColumn, NumericColumn, ObjectColumn
+from .graph_statistics import AttributeStatistics, GraphStatistics
+
+MAGIC = b"GVSNAP01"
+_PREAMBLE = struct.Struct("<8sQ")
+# Arrays start at multiples of this, so every mapped array is aligned for its dtype
+_ALIGNMENT = 64
+
+
+def _encode_strings(strings: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Encodes strings as one UTF-8 blob and int64 offsets of each string in it."""
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+class _StringTable(MutableSequence):
+    """
+    Strings decoded one at a time from a mapped blob. The first change copies them
+    into a list, so the mapped snapshot itself is never modified.
+    """
+
+    def __init__(self, offsets: np.ndarray, blob: np.ndarray):
+        self._offsets = offsets
+        self._blob = blob
+        self._strings: Optional[List[str]] = None
+
+    def _decode(self, index: int) -> str:
+        return self._blob[self._offsets[index]:self._offsets[index + 1]].tobytes().decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1 if self._strings is None else len(self._strings)
+
+    def __getitem__(self, index):
+        if self._strings is not None:
+            return self._strings[index]
+        if isinstance(index, slice):
+            return [self._decode(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("string table index out of range")
+        return self._decode(index)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._strings is not None:
+            return iter(self._strings)
+        return (self._decode(index) for index in range(len(self)))
+
+    def _thaw(self) -> List[str]:
+        if self._strings is None:
+            self._strings = list(self)
+        return self._strings
+
+    def __setitem__(self, index, value):
+        self._thaw()[index] = value
+
+    def __delitem__(self, index):
+        del self._thaw()[index]
+
+    def insert(self, index: int, value: str):
+        self._thaw().insert(index, value)
+
+
+class _IdIndex(MutableMapping):
+    """
+    Node id -> position lookup answered by binary search over the ids sorted at save
+    time, so opening a snapshot doesn't build a dict of all ids. The dict is built on
+    the first change.
+    """
+
+    def __init__(self, ids: _StringTable, order: np.ndarray):
+        self._ids = ids
+        self._order = order
+        self._positions: Optional[Dict[str, int]] = None
+
+    def _search(self, node_id: str) -> Optional[int]:
+        low, high = 0, len(self._order)
+        while low < high:
+            middle = (low + high) // 2
+            if self._ids[int(self._order[middle])] < node_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self._order):
+            position = int(self._order[low])
+            if self._ids[position] == node_id:
+                return position
+        return None
+
+    def __getitem__(self, node_id: str) -> int:
+        if self._positions is not None:
+            return self._positions[node_id]
+        position = self._search(node_id) if isinstance(node_id, str) else None
+        if position is None:
+            raise KeyError(node_id)
+        return position
+
+    def __contains__(self, node_id) -> bool:
+        if self._positions is not None:
+            return node_id in self._positions
+        return isinstance(node_id, str) and self._search(node_id) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._positions if self._positions is not None else self._ids)
+
+    def __len__(self) -> int:
+        return len(self._positions) if self._positions is not None else len(self._ids)
+
+    def _thaw(self) -> Dict[str, int]:
+        if self._positions is None:
+            self._positions = {node_id: position for position, node_id in enumerate(self._ids)}
+        return self._positions
+
+    def __setitem__(self, node_id: str, position: int):
+        self._thaw()[node_id] = position
+
+    def __delitem__(self, node_id: str):
+        del self._thaw()[node_id]
+
+
+def _encode_value(value: Any) -> str:
+    """Tagged text form of an attribute value, preserving its type without pickling."""
+    if value is None:
+        return "n"
+    if isinstance(value, bool):
+        return "b" + ("1" if value else "0")
+    if isinstance(value, int):
+        return "i" + str(value)
+    if isinstance(value, float):
+        return "f" + repr(value)
+    if isinstance(value, datetime):
+        return "d" + value.isoformat()
+    if isinstance(value, date):
+        return "D" + value.isoformat()
+    return "s" + str(value)
+
+
+def _decode_value(text: str) -> Any:
+    tag, body = text[0], text[1:]
+    if tag == "n":
+        return None
+    if tag == "b":
+        return body == "1"
+    if tag == "i":
+        return int(body)
+    if tag == "f":
+        return float(body)
+    if tag == "d":
+        return datetime.fromisoformat(body)
+    if tag == "D":
+        return date.fromisoformat(body)
+    return body
+
+
+class _ValueTable(object):
+    """Read-only sequence of tagged values decoded on access."""
+
+    def __init__(self, strings: _StringTable):
+        self._strings = strings
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def __getitem__(self, index: int) -> Any:
+        return _decode_value(self._strings[index])
+
+
+class _MappedObjectColumn(ObjectColumn):
+    """Object column of a snapshot, values are decoded on access until the first change."""
+
+    def _thaw(self):
+        if isinstance(self.values, _ValueTable):
+            values = np.empty(len(self.values), dtype=object)
+            for position in self.positions().tolist():
+                values[position] = self.values[position]
+            self.values = values
+
+    def set(self, position: int, value):
+        self._thaw()
+        super().set(position, value)
+
+    def _resize(self, size: int):
+        self._thaw()
+        super()._resize(size)
+
+    def _delete(self, position: int):
+        self._thaw()
+        super()._delete(position)
+
+
+def _fixed_offset(tzinfo) -> Optional[timedelta]:
+    """UTC offset of a timezone that doesn't depend on the date, None for other timezones."""
+    offset = tzinfo.utcoffset(None)
+    if offset is None or tzinfo.utcoffset(datetime(2000, 1, 1)) != offset \
+            or tzinfo.utcoffset(datetime(2000, 7, 1)) != offset:
+        return None
+    return offset
+
+
+class _Writer(object):
+    def __init__(self):
+        self.arrays: List[Tuple[Dict[str, Any], np.ndarray]] = []
+        self._size = 0
+
+    def add(self, array: np.ndarray) -> Dict[str, Any]:
+        array = np.ascontiguousarray(array)
+        self._size += -self._size % _ALIGNMENT
+        entry = {"offset": self._size, "dtype": array.dtype.str, "length": len(array)}
+        self.arrays.append((entry, array))
+        self._size += array.nbytes
+        return entry
+
+    def add_strings(self, strings: Sequence[str]) -> Dict[str, Any]:
+        offsets, blob = _encode_strings(strings)
+        return {"offsets": self.add(offsets), "blob": self.add(blob)}
+
+
+def _column_header(writer: _Writer, column: Column) -> Dict[str, Any]:
+    header = {"present": writer.add(column.present)}
+    if isinstance(column, NumericColumn):
+        header.update(kind=column.value_type.__name__, values=writer.add(column.values))
+    elif isinstance(column, DatetimeColumn) and (column.tzinfo is None or _fixed_offset(column.tzinfo) is not None):
+        offset = None if column.tzinfo is None else _fixed_offset(column.tzinfo).total_seconds()
+        header.update(kind="datetime", utc_offset=offset, values=writer.add(column.values))
+    elif isinstance(column, CategoryColumn):
+        header.update(kind="category", codes=writer.add(column.codes), categories=writer.add_strings(column.categories))
+    else:
+        values = [_encode_value(column.get(position)) if column.present[position] else ""
+                  for position in range(len(column.present))]
+        header.update(kind="object", values=writer.add_strings(values))
+    return header
+
+
+def _statistics_header(statistics: GraphStatistics) -> Dict[str, Any]:
+    def encode(value):
+        return None if value is None else _encode_value(value)
+
+    return {
+        "node_count": statistics.node_count,
+        "attributes": {
+            name: [attribute.count, attribute.distinct, encode(attribute.minimum), encode(attribute.maximum)]
+            for name, attribute in statistics.attributes.items()
+        }
+    }
+
+
+def _layout(graph: Graph) -> Tuple[bytes, _Writer, int]:
+    """Encoded header, arrays and offset of the array data of the snapshot of a graph."""
+    if not isinstance(graph, CSRGraph):
+        graph = CSRGraph(graph.nodes, graph.edges, graph.directed)
+    ids = graph._ids
+    writer = _Writer()
+    header = {
+        "directed": graph.directed,
+        "node_count": graph.node_count,
+        "ids": writer.add_strings(ids),
+        "id_order": writer.add(np.array(sorted(range(len(ids)), key=ids.__getitem__), dtype=np.int32)),
+        "out_offsets": writer.add(graph._out_offsets),
+        "out_targets": writer.add(graph._out_targets),
+        "in_offsets": writer.add(graph._in_offsets),
+        "in_sources": writer.add(graph._in_sources),
+        "columns": {name: _column_header(writer, column) for name, column in graph.attributes.columns.items()},
+        "statistics": _statistics_header(graph.statistics()),
+    }
+    encoded_header = json.dumps(header).encode("utf-8")
+    data_start = _PREAMBLE.size + len(encoded_header)
+    data_start += -data_start % _ALIGNMENT
+    return encoded_header, writer, data_start
+
+
+def save_snapshot(graph: Graph, path: str):
+    """
+    Saves the graph as a snapshot file: node ids and string values in string tables,
+    topology as CSR/CSC arrays and attributes as typed columns, behind a small JSON
+    header. The file is written to a temporary name first and then moved into place.
+
+    :param graph: Graph to save. Graphs that aren't a `CSRGraph` are converted first.
+    :param path: Path of the snapshot file.
+    """
+    encoded_header, writer, data_start = _layout(graph)
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            f.write(_PREAMBLE.pack(MAGIC, len(encoded_header)))
+            f.write(encoded_header)
+            for entry, array in writer.arrays:
+                f.write(b"\0" * (data_start + entry["offset"] - f.tell()))
+                f.write(array.tobytes())
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def write_snapshot(graph: Graph, allocate: Callable[[int], Any]) -> int:
+    """
+    Writes the snapshot of a graph into memory instead of a file, for handing a graph to
+    another process as flat arrays, for example in a `multiprocessing.shared_memory` block.
+
+    :param graph: Graph to write. Graphs that aren't a `CSRGraph` are converted first.
+    :param allocate: Called with the size of the snapshot, returns a writable buffer of
+        at least that size.
+    :return: The size of the snapshot.
+    """
+    encoded_header, writer, data_start = _layout(graph)
+    size = data_start + (writer.arrays[-1][0]["offset"] + writer.arrays[-1][1].nbytes if writer.arrays else 0)
+    buffer = memoryview(allocate(size)).cast("B")
+    try:
+        buffer[:_PREAMBLE.size] = _PREAMBLE.pack(MAGIC, len(encoded_header))
+        buffer[_PREAMBLE.size:_PREAMBLE.size + len(encoded_header)] = encoded_header
+        for entry, array in writer.arrays:
+            start = data_start + entry["offset"]
+            buffer[start:start + array.nbytes] = array.view(np.uint8).reshape(-1)
+    finally:
+        buffer.release()
+    return size
+
+
+def open_snapshot(path: str) -> CSRGraph:
+    """
+    Opens a snapshot saved by `save_snapshot` without deserializing it. The file is
+    memory mapped copy-on-write and the graph's arrays are views into the mapping, so
+    opening takes about the same time for any graph size and pages are read on demand.
+    Changes to the graph stay in memory and never modify the file.
+
+    :raises ValueError: If the file is not a graph snapshot.
+    """
+    with open(path, "rb") as f:
+        preamble = f.read(_PREAMBLE.size)
+        magic = _PREAMBLE.unpack(preamble)[0] if len(preamble) == _PREAMBLE.size else None
+        if magic != MAGIC:
+            raise ValueError(f"Not a graph snapshot: {path}")
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    return read_snapshot(mapping)
+
+
+def read_snapshot(buffer) -> CSRGraph:
+    """
+    Opens a snapshot from memory, such as one written by `write_snapshot`. The graph's
+    arrays are views into the buffer, which must stay unchanged while the graph is used.
+
+    :raises ValueError: If the buffer doesn't hold a graph snapshot.
+    """
+    view = memoryview(buffer)
+    preamble = view[:_PREAMBLE.size].tobytes()
+    magic, header_length = _PREAMBLE.unpack(preamble) if len(preamble) == _PREAMBLE.size else (None, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a graph snapshot")
+    header = json.loads(view[_PREAMBLE.size:_PREAMBLE.size + header_length].tobytes().decode("utf-8"))
+    view.release()
+    data_start = _PREAMBLE.size + header_length
+    data_start += -data_start % _ALIGNMENT
+
+    def array(entry: Dict[str, Any]) -> np.ndarray:
+        dtype = np.dtype(entry["dtype"])
+        if not entry["length"]:
+            return np.zeros(0, dtype=dtype)
+        return np.frombuffer(buffer, dtype=dtype, count=entry["length"], offset=data_start + entry["offset"])
+
+    def strings(entry: Dict[str, Any]) -> _StringTable:
+        return _StringTable(array(entry["offsets"]), array(entry["blob"]))
+
+    node_count = header["node_count"]
+    columns = {}
+    for name, entry in header["columns"].items():
+        kind = entry["kind"]
+        present = array(entry["present"])
+        if kind in ("int", "float"):
+            columns[name] = NumericColumn.from_arrays(present, array(entry["values"]))
+        elif kind == "datetime":
+            offset = entry["utc_offset"]
+            tzinfo = None if offset is None else timezone(timedelta(seconds=offset))
+            columns[name] = DatetimeColumn.from_arrays(present, array(entry["values"]), tzinfo)
+        elif kind == "category":
+            columns[name] = CategoryColumn.from_arrays(present, array(entry["codes"]), strings(entry["categories"]))
+        else:
+            columns[name] = _MappedObjectColumn.from_arrays(present, _ValueTable(strings(entry["values"])))
+
+    attributes = {
+        name: AttributeStatistics.restore(count, distinct,
+                                          None if minimum is None else _decode_value(minimum),
+                                          None if maximum is None else _decode_value(maximum))
+        for name, (count, distinct, minimum, maximum) in header["statistics"]["attributes"].items()
+    }
+    statistics = GraphStatistics.restore(header["statistics"]["node_count"], attributes)
+
+    ids = strings(header["ids"])
+    return CSRGraph._from_storage(
+        ids, _IdIndex(strings(header["ids"]), array(header["id_order"])),
+        AttributeStore.from_columns(node_count, columns),
+        array(header["out_offsets"]), array(header["out_targets"]),
+        array(header["in_offsets"]), array(header["in_sources"]),
+        header["directed"], statistics
+    )
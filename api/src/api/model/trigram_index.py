@@ -0,0 +1,165 @@
+import heapq
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple, TYPE_CHECKING
+
+from . import Node
+
+if TYPE_CHECKING:
+    from . import SearchMode
+
+# Marks the start and end of a value so prefix queries and short values get trigrams too
+_PAD = "\x00"
+
+# Minimal trigram similarity for a value to count as a fuzzy match
+FUZZY_THRESHOLD = 0.3
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+
+def padded_trigrams(text: str) -> FrozenSet[str]:
+    return trigrams(_PAD * 2 + text + _PAD)
+
+
+def similarity(first: str, second: str) -> float:
+    """Jaccard similarity of the padded trigram sets of two strings."""
+    first_grams, second_grams = padded_trigrams(first), padded_trigrams(second)
+    shared = len(first_grams & second_grams)
+    return shared / (len(first_grams) + len(second_grams) - shared)
+
+
+class TrigramIndex(object):
+    """
+    Trigram index over the lowercased string form of attribute values.
+
+    Distinct values are stored once and mapped to the nodes holding them, while
+    each trigram maps to the distinct values containing it. Substring and prefix
+    queries intersect the posting lists of the query trigrams and verify the
+    candidates; fuzzy queries rank values by trigram similarity.
+    """
+
+    def __init__(self, nodes: Iterable[Node] = (), version: Optional[int] = None):
+        self._value_ids: Dict[str, int] = {}
+        self._values: List[Optional[str]] = []
+        self._value_nodes: List[Dict[str, int]] = []
+        self._gram_counts: List[int] = []
+        self._free_ids: List[int] = []
+        self._postings: Dict[str, Set[int]] = {}
+        self.version = version
+        for node in nodes:
+            self.add(node.id, node.data)
+
+    def __len__(self):
+        return len(self._value_ids)
+
+    def _add_value(self, value: str, node_id: str):
+        value_id = self._value_ids.get(value)
+        if value_id is None:
+            grams = padded_trigrams(value)
+            if self._free_ids:
+                value_id = self._free_ids.pop()
+                self._values[value_id] = value
+                self._value_nodes[value_id] = {}
+                self._gram_counts[value_id] = len(grams)
+            else:
+                value_id = len(self._values)
+                self._values.append(value)
+                self._value_nodes.append({})
+                self._gram_counts.append(len(grams))
+            self._value_ids[value] = value_id
+            for gram in grams:
+                postings = self._postings.get(gram)
+                if postings is None:
+                    postings = self._postings[gram] = set()
+                postings.add(value_id)
+        # Count occurrences so a node holding the same value under two keys stays indexed until both are gone
+        holders = self._value_nodes[value_id]
+        holders[node_id] = holders.get(node_id, 0) + 1
+
+    def _remove_value(self, value: str, node_id: str):
+        value_id = self._value_ids.get(value)
+        if value_id is None:
+            return
+        holders = self._value_nodes[value_id]
+        count = holders.get(node_id, 0) - 1
+        if count > 0:
+            holders[node_id] = count
+            return
+        holders.pop(node_id, None)
+        if holders:
+            return
+        for gram in padded_trigrams(value):
+            postings = self._postings[gram]
+            postings.discard(value_id)
+            if not postings:
+                del self._postings[gram]
+        del self._value_ids[value]
+        self._values[value_id] = None
+        self._free_ids.append(value_id)
+
+    def add(self, node_id: str, data: Mapping[str, Any]):
+        for value in data.values():
+            self._add_value(str(value).lower(), node_id)
+
+    def remove(self, node_id: str, data: Mapping[str, Any]):
+        for value in data.values():
+            self._remove_value(str(value).lower(), node_id)
+
+    def update(self, node_id: str, old_data: Optional[Mapping[str, Any]], new_data: Optional[Mapping[str, Any]]):
+        """Re-indexes a node whose data changed; None stands for a node that does not exist."""
+        if old_data:
+            self.remove(node_id, old_data)
+        if new_data:
+            self.add(node_id, new_data)
+
+    def _candidates(self, grams: FrozenSet[str]) -> Iterable[int]:
+        """Ids of values containing all the given trigrams, or all values if there are none."""
+        if not grams:
+            return self._value_ids.values()
+        postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+        result = set(postings[0])
+        for other in postings[1:]:
+            if not result:
+                break
+            result &= other
+        return result
+
+    def _matching_values(self, query: str, mode: 'SearchMode') -> Iterable[Tuple[int, float]]:
+        from . import SearchMode
+
+        if mode == SearchMode.FUZZY:
+            query_grams = padded_trigrams(query)
+            shared: Dict[int, int] = {}
+            for gram in query_grams:
+                for value_id in self._postings.get(gram, ()):
+                    shared[value_id] = shared.get(value_id, 0) + 1
+            for value_id, count in shared.items():
+                score = count / (len(query_grams) + self._gram_counts[value_id] - count)
+                if score >= FUZZY_THRESHOLD:
+                    yield value_id, score
+            return
+
+        if mode == SearchMode.PREFIX:
+            grams, matches = trigrams(_PAD * 2 + query), str.startswith
+        elif mode == SearchMode.SUBSTRING:
+            grams, matches = trigrams(query), str.__contains__
+        else:
+            raise ValueError(f"Unsupported search mode: {mode}")
+        for value_id in self._candidates(grams):
+            value = self._values[value_id]
+            if matches(value, query):
+                yield value_id, len(query) / len(value) if value else 1.0
+
+    def search(self, query: str, mode: 'SearchMode', limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Returns (node id, score) pairs of nodes having a value matching the query,
+        ranked by similarity and truncated to `limit` if given.
+        """
+        scores: Dict[str, float] = {}
+        for value_id, score in self._matching_values(query.lower(), mode):
+            for node_id in self._value_nodes[value_id]:
+                if scores.get(node_id, 0.0) < score:
+                    scores[node_id] = score
+        if limit is not None:
+            return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -1,12 +1,51 @@
-from typing import List, Union, TYPE_CHECKING
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union, TYPE_CHECKING
 from datetime import datetime
 
-from . import Graph, Node, Edge
+from . import Graph, GraphView, Node, Edge, SearchIndex, TrigramIndex
 
 if TYPE_CHECKING:
     from . import Filter, Search
 
+
+class _FilteredSubgraph(object):
+    """Materialized ids of the nodes and edges of a graph that pass a workspace's filters and searches."""
+
+    def __init__(self, graph: Graph, node_ids: Set[str], query: tuple):
+        self.node_ids = set(node_ids)
+        self.edge_keys: Set[Tuple[str, str]] = graph.induced_edge_keys(self.node_ids)
+        self.graph_version = graph.version
+        self.query = query
+
+    def show(self, graph: Graph, node_ids: Iterable[str]):
+        shown = [node_id for node_id in node_ids if node_id not in self.node_ids]
+        self.node_ids.update(shown)
+        for node_id in shown:
+            self.add_edges((edge.src.id, edge.dest.id) for edge in graph.incident_edges(node_id))
+
+    def hide(self, graph: Graph, node_ids: Iterable[str], removed_edges=()):
+        for node_id in node_ids:
+            self.node_ids.discard(node_id)
+            self.remove_edges((edge.src.id, edge.dest.id) for edge in graph.incident_edges(node_id))
+        self.remove_edges(removed_edges)
+
+    def add_edges(self, edge_keys: Iterable[Tuple[str, str]]):
+        for src_id, dest_id in edge_keys:
+            if src_id in self.node_ids and dest_id in self.node_ids:
+                self.edge_keys.add((src_id, dest_id))
+
+    def remove_edges(self, edge_keys: Iterable[Tuple[str, str]]):
+        for edge_key in edge_keys:
+            self.edge_keys.discard(edge_key)
+
+    def to_view(self, graph: Graph) -> GraphView:
+        # Views are cached, so they get a snapshot of the ids that later mutations don't change
+        return GraphView(graph, frozenset(self.node_ids), frozenset(self.edge_keys))
+
 class Workspace(object):
+    # Number of filtered subgraphs kept per workspace, so toggling filters back is a cache hit
+    VIEW_CACHE_SIZE = 8
+
     def __init__(self, id, graph: Graph, name: str, filters: List['Filter'], searches: List['Search']):
         self._graph = graph
         self._filters = filters
@@ -14,45 +53,196 @@ class Workspace(object):
         self._name = name
         self._id = id
         self._cli_history=[] #always initialize
+        self._version = 0
+        self._view_cache: OrderedDict = OrderedDict()
+        self._search_index: Optional[SearchIndex] = None
+        self._trigram_index: Optional[TrigramIndex] = None
+        # Node ids and edges passing the filters and searches, maintained incrementally
+        self._subgraph: Optional[_FilteredSubgraph] = None
 
     @property
     def id(self) -> int:
         return self._id
 
     @property
-    def graph(self) -> Graph:
-        """
-        Returns a subgraph of the current graph filtered by the workspace's filters and searches.
-        """
-        if not self._graph:
-            return None
+    def version(self) -> int:
+        """Mutation counter, incremented whenever the graph, filters or searches change."""
+        return self._version
+
+    def _touch(self):
+        self._version += 1
 
-        nodes = self._graph.nodes
+    def _query_key(self) -> tuple:
+        return frozenset(f.key for f in self._filters), frozenset(s.key for s in self._searches)
 
+    def _view_key(self) -> tuple:
+        return (self._graph.version,) + self._query_key()
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """Inverted index used to answer exact searches, rebuilt when the graph changed outside the workspace."""
+        if self._search_index is None or self._search_index.version != self._graph.version:
+            self._search_index = SearchIndex(self._graph.nodes, self._graph.version)
+        return self._search_index
+
+    @property
+    def trigram_index(self) -> TrigramIndex:
+        """Trigram index shared by substring, prefix and fuzzy searches, built on first use."""
+        if self._trigram_index is None or self._trigram_index.version != self._graph.version:
+            self._trigram_index = TrigramIndex(self._graph.nodes, self._graph.version)
+        return self._trigram_index
+
+    def _sync_indexes(self, graph_version: int, node_id: str = None, old_data: Optional[Dict[str, Any]] = None):
+        """
+        Brings the search indexes up to date after a workspace mutation, provided they
+        were current at `graph_version`, the graph version before the mutation.
+        """
+        node = self._graph.get_node(node_id) if node_id is not None else None
+        for index in (self._search_index, self._trigram_index):
+            if index is None or index.version != graph_version:
+                continue
+            if node_id is not None:
+                index.update(node_id, old_data, node.data if node else None)
+            index.version = self._graph.version
+
+    def _search_index_for(self, search_obj: 'Search'):
+        from . import SearchMode
+        return self.search_index if search_obj.mode == SearchMode.EXACT else self.trigram_index
+
+    def _select_node_ids(self) -> Optional[Set[str]]:
+        """
+        Returns ids of the nodes passing all filters and at least one search, answered
+        from the indexes, or None if there are no filters and searches.
+        """
+        node_ids = None
         if self._filters:
-            nodes = [
-                node for node in nodes
-                if all(filter_obj(node) for filter_obj in self._filters)
-            ]
+            # Answer each filter from the attribute indexes and intersect, smallest candidate set first
+            candidates = sorted((filter_obj.lookup(self._graph) for filter_obj in self._filters), key=len)
+            node_ids = candidates[0]
+            for other in candidates[1:]:
+                if not node_ids:
+                    break
+                node_ids &= other
 
         if self._searches:
-            nodes = [
-                node for node in nodes
-                if any(search_obj(node) for search_obj in self._searches)
-            ]
+            matched = set()
+            for search_obj in self._searches:
+                found = self._graph.search_nodes(search_obj)
+                matched |= found if found is not None else search_obj.lookup(self._search_index_for(search_obj))
+            node_ids = matched if node_ids is None else node_ids & matched
+        return node_ids
+
+    def _passes_filters(self, node: Node) -> bool:
+        return all(filter_obj(node) for filter_obj in self._filters)
+
+    def _is_visible(self, node: Node) -> bool:
+        return self._passes_filters(node) and (
+            not self._searches or any(search_obj(node) for search_obj in self._searches)
+        )
+
+    def _subgraph_current(self, graph_version: int) -> bool:
+        subgraph = self._subgraph
+        return subgraph is not None and subgraph.graph_version == graph_version and subgraph.query == self._query_key()
+
+    def _sync_subgraph(self, graph_version: int, node_id: str = None, removed_edges=(), added_edges=()):
+        """
+        Updates the materialized filtered subgraph after a graph mutation by re-checking
+        only the affected node and edges, provided it was current at `graph_version`.
+        """
+        subgraph = self._subgraph
+        if not self._subgraph_current(graph_version) or any(s.limit for s in self._searches):
+            # Ranked top-k searches can't be decided for a single node
+            self._subgraph = None
+            return
+        try:
+            if node_id is not None:
+                node = self._graph.get_node(node_id)
+                if node is not None and self._is_visible(node):
+                    subgraph.show(self._graph, [node_id])
+                else:
+                    subgraph.hide(self._graph, [node_id], removed_edges)
+            subgraph.remove_edges(removed_edges)
+            subgraph.add_edges(added_edges)
+        except ValueError:
+            self._subgraph = None
+            return
+        subgraph.graph_version = self._graph.version
+
+    def _narrow_subgraph(self, keep) -> None:
+        """Hides visible nodes failing the predicate after a filter or search was added."""
+        subgraph = self._subgraph
+        hidden = [node_id for node_id in subgraph.node_ids if not keep(node_id)]
+        subgraph.hide(self._graph, hidden)
+
+    def _widen_subgraph(self, candidates: Iterable[str]) -> None:
+        """Shows the not yet visible candidates passing all filters and searches."""
+        subgraph = self._subgraph
+        shown = [
+            node_id for node_id in candidates
+            if node_id not in subgraph.node_ids and self._is_visible(self._graph.get_node(node_id))
+        ]
+        subgraph.show(self._graph, shown)
 
-        filtered_node_ids = {node.id for node in nodes}
+    def _update_query(self, change, update_subgraph) -> None:
+        """
+        Applies a change of the filters or searches and, if the materialized subgraph
+        was current, narrows or widens it instead of recomputing it.
+        """
+        current = self._graph is not None and self._subgraph_current(self._graph.version)
+        had_predicates = bool(self._filters or self._searches)
+        change()
+        self._touch()
+        if not current or not had_predicates or not (self._filters or self._searches):
+            self._subgraph = None
+            return
+        try:
+            update_subgraph()
+            self._subgraph.query = self._query_key()
+        except ValueError:
+            self._subgraph = None
 
-        filtered_edges = [
-            edge for edge in self._graph.edges
-            if edge.src.id in filtered_node_ids and edge.dest.id in filtered_node_ids
-        ]
+    @property
+    def graph(self) -> GraphView:
+        """
+        Returns a read-only view of the current graph filtered by the workspace's filters and searches.
+        Views are memoized per graph version and filter/search set.
+        """
+        if not self._graph:
+            return None
 
-        return Graph(nodes, filtered_edges, self._graph.directed)
+        key = self._view_key()
+        if key in self._view_cache:
+            self._view_cache.move_to_end(key)
+            return self._view_cache[key]
+
+        if not self._subgraph_current(self._graph.version):
+            node_ids = self._select_node_ids()
+            if node_ids is None:
+                self._subgraph = None
+                view = GraphView(self._graph)
+                self._cache_view(key, view)
+                return view
+            self._subgraph = _FilteredSubgraph(self._graph, node_ids, self._query_key())
+
+        view = self._subgraph.to_view(self._graph)
+        self._cache_view(key, view)
+        return view
+
+    def _cache_view(self, key: tuple, view: GraphView):
+        self._view_cache[key] = view
+        if len(self._view_cache) > self.VIEW_CACHE_SIZE:
+            self._view_cache.popitem(last=False)
 
     @graph.setter
     def graph(self, value: Graph):
+        if value:
+            # Collect attribute statistics for the query planner while loading
+            value.statistics()
+        # The graph is published last, readers see either the old graph or the new one with fresh caches
+        self._view_cache = OrderedDict()
+        self._subgraph = None
         self._graph = value
+        self._touch()
 
     @property
     def name(self) -> str:
@@ -69,6 +259,8 @@ class Workspace(object):
     @filters.setter
     def filters(self, value: List['Filter']):
         self._filters = value
+        self._subgraph = None
+        self._touch()
 
     @property
     def searches(self) -> List['Search']:
@@ -77,108 +269,221 @@ class Workspace(object):
     @searches.setter
     def searches(self, value: List['Search']):
         self._searches = value
+        self._subgraph = None
+        self._touch()
 
     @property
     def cli_history(self) -> List[str]:
         return self._cli_history
 
+    def has_node(self, node_id: str) -> bool:
+        return self._graph is not None and node_id in self._graph
+
+    def has_edge(self, parent_id: str, child_id: str) -> bool:
+        return self._graph is not None and self._graph.has_edge(parent_id, child_id)
+
+    def _track(self, changed: bool, graph_version: int, node_id: str = None, old_data: Optional[Dict[str, Any]] = None,
+               removed_edges=(), added_edges=()) -> bool:
+        if changed:
+            self._touch()
+            self._sync_indexes(graph_version, node_id, old_data)
+            self._sync_subgraph(graph_version, node_id, removed_edges, added_edges)
+        return changed
+
     def add_node(self,node:Node):
-        if any(n.id == node.id for n in self._graph.nodes):
-            return False
-        self._graph.nodes.append(node)
-        return True
+        version = self._graph.version
+        return self._track(self._graph.add_node(node), version, node.id)
 
     def edit_node(self,node_id:str,**attributes):
-        node = next((n for n in self._graph.nodes if n.id == node_id), None)
-        if not node:
-            return False
-        node.data.update(attributes)
-        return True
+        node = self._graph.get_node(node_id)
+        old_data = dict(node.data) if node else None
+        version = self._graph.version
+        return self._track(self._graph.update_node(node_id, **attributes), version, node_id, old_data)
 
     def delete_node(self,node_id: str):
-        node = next((n for n in self._graph.nodes if n.id == node_id), None)
-        if not node:
-            return False
-        self._graph.nodes = [n for n in self._graph.nodes if n.id != node_id]
-        self._graph.edges = [e for e in self._graph.edges if e.src.id != node_id and e.dest.id != node_id]
-        return True
+        node = self._graph.get_node(node_id)
+        old_data = dict(node.data) if node else None
+        removed_edges = [(e.src.id, e.dest.id) for e in self._graph.incident_edges(node_id)]
+        version = self._graph.version
+        return self._track(self._graph.remove_node(node_id), version, node_id, old_data, removed_edges)
 
     def add_edge(self,parent_id: str, child_id: str):
-        src = next((n for n in self._graph.nodes if n.id == parent_id), None)
-        dest = next((n for n in self._graph.nodes if n.id == child_id), None)
+        src = self._graph.get_node(parent_id)
+        dest = self._graph.get_node(child_id)
         if not src or not dest:
             return False
-        if any(e.src.id == parent_id and e.dest.id == child_id for e in self._graph.edges):
-            return False
-        self._graph.edges.append(Edge(src, dest))
-        return True
+        version = self._graph.version
+        return self._track(self._graph.add_edge(Edge(src, dest)), version, added_edges=[(parent_id, child_id)])
 
     def edit_edge(self,old_parent: str, old_child: str, new_parent: str, new_child:str):
-        edge = next((e for e in self._graph.edges if e.src.id == old_parent and e.dest.id == old_child), None)
+        edge = self._graph.get_edge(old_parent, old_child)
         if not edge:
             return False
-        src = next((n for n in self._graph.nodes if n.id == new_parent), None)
-        dest = next((n for n in self._graph.nodes if n.id == new_child), None)
+        src = self._graph.get_node(new_parent)
+        dest = self._graph.get_node(new_child)
         if not src or not dest:
             return False
+        if (new_parent, new_child) == (edge.src.id, edge.dest.id):
+            return True
+        if self._graph.has_edge(new_parent, new_child):
+            return False
+        version = self._graph.version
+        removed_edges = [(edge.src.id, edge.dest.id)]
+        self._graph.remove_edge(edge.src.id, edge.dest.id)
         edge.src = src
         edge.dest = dest
-        return True
+        return self._track(self._graph.add_edge(edge), version,
+                           removed_edges=removed_edges, added_edges=[(new_parent, new_child)])
 
     def delete_edge(self,parent_id: str, child_id: str):
-        initial_len = len(self._graph.edges)
-        self._graph.edges = [e for e in self._graph.edges if
-                                          not (e.src.id == parent_id and e.dest.id == child_id)]
-        if len(self._graph.edges) == initial_len:
+        edge = self._graph.get_edge(parent_id, child_id)
+        if not edge:
             return False
-        return True
+        version = self._graph.version
+        key = (edge.src.id, edge.dest.id)
+        return self._track(self._graph.remove_edge(*key), version, removed_edges=[key])
+
+    def save_snapshot(self, path: str):
+        """Saves the workspace's whole graph, without filters and searches, as a snapshot file."""
+        from . import save_snapshot
+        if self._graph is None:
+            raise ValueError("Workspace has no graph to save")
+        save_snapshot(self._graph, path)
+
+    def open_snapshot(self, path: str):
+        """
+        Replaces the workspace's graph with a memory mapped snapshot.
+
+        :raises ValueError: If the file is not a graph snapshot.
+        """
+        from . import open_snapshot
+        self.graph = open_snapshot(path)
 
     def clean_start(self):
         """Remove all nodes and edges from the graph"""
-        self._graph.nodes=[]
-        self._graph.edges=[]
+        self._graph.clear()
+        self._subgraph = None
+        self._touch()
+
+    def _add_filter(self, filter_obj) -> None:
+        def narrow():
+            if len(self._subgraph.node_ids) * 4 < self._graph.node_count:
+                # Few visible nodes, check them directly
+                self._narrow_subgraph(lambda node_id: filter_obj(self._graph.get_node(node_id)))
+            else:
+                matched = filter_obj.lookup(self._graph)
+                self._narrow_subgraph(matched.__contains__)
+
+        self._update_query(lambda: self._filters.append(filter_obj), narrow)
+
+    def _remove_filters(self, to_remove: list) -> None:
+        def widen():
+            node_ids = self._select_node_ids()
+            self._widen_subgraph(node_ids if node_ids is not None else self._graph.node_ids)
+
+        def change():
+            self._filters = [f for f in self._filters if f not in to_remove]
+
+        self._update_query(change, widen)
 
     def add_filter(self, attribute: str, operator: str, value: Union[str, int, float, datetime]):
         from . import Filter, FilterOperator
-        self._filters.append(Filter(attribute, FilterOperator(operator), value))
+        self._add_filter(Filter(attribute, FilterOperator(operator), value))
+
+    def add_filter_expression(self, expression: str):
+        """
+        Adds a boolean filter expression, e.g. `(age > 20 AND city = "Novi Sad") OR NOT type = Person`.
+
+        :raises ValueError: If the expression cannot be parsed.
+        """
+        from . import FilterExpression
+        self._add_filter(FilterExpression(expression))
+
+    def explain_filter(self, expression: str) -> str:
+        """Describes how the query planner evaluates the expression against the workspace graph."""
+        from . import FilterExpression
+        if not self._graph:
+            raise ValueError("Workspace has no graph loaded")
+        return FilterExpression(expression).explain(self._graph)
 
     def remove_filter(self, filter_id):
-        self._filters = [f for f in self._filters if f.id != filter_id]
+        self._remove_filters([f for f in self._filters if f.id == filter_id])
 
     def remove_filter_by_values(self, attribute: str, operator: str, value) -> bool:
-        from . import FilterOperator
+        from . import Filter, FilterOperator
 
         to_remove = [
             f for f in self.filters
-            if f._attribute == attribute and f._operator == FilterOperator(operator) and str(f._value) == str(value)
+            if isinstance(f, Filter) and f.attribute == attribute and f.operator == FilterOperator(operator)
+            and str(f.value) == str(value)
         ]
 
         if not to_remove:
             return False
 
-        for f in to_remove:
-            self.filters.remove(f)
+        self._remove_filters(to_remove)
+        return True
+
+    def remove_filter_by_expression(self, expression: str) -> bool:
+        from . import FilterExpression
+
+        key = FilterExpression(expression).key
+        to_remove = [f for f in self.filters if f.key == key]
+        if not to_remove:
+            return False
+
+        self._remove_filters(to_remove)
         return True
 
-    def add_search(self, query: str):
-        from . import Search
-        self._searches.append(Search(query))
+    def add_search(self, query: str, mode: str = "exact", limit: Optional[int] = None):
+        from . import Search, SearchMode
+        if limit is not None and limit <= 0:
+            raise ValueError("Search limit must be a positive number")
+        search_obj = Search(query, SearchMode(mode), limit)
+        had_searches = bool(self._searches)
+
+        def update_subgraph():
+            matched = search_obj.lookup(self._search_index_for(search_obj))
+            if had_searches:
+                # Searches are alternatives, matches of the new one can only add nodes
+                self._widen_subgraph(node_id for node_id in matched if self._passes_filters(self._graph.get_node(node_id)))
+            else:
+                self._narrow_subgraph(matched.__contains__)
+
+        self._update_query(lambda: self._searches.append(search_obj), update_subgraph)
+
+    def _remove_searches(self, to_remove: list) -> None:
+        def update_subgraph():
+            if self._searches:
+                matched = set()
+                for search_obj in self._searches:
+                    matched |= search_obj.lookup(self._search_index_for(search_obj))
+                self._narrow_subgraph(matched.__contains__)
+            else:
+                node_ids = self._select_node_ids()
+                self._widen_subgraph(node_ids if node_ids is not None else self._graph.node_ids)
+
+        def change():
+            self._searches = [s for s in self._searches if s not in to_remove]
+
+        self._update_query(change, update_subgraph)
 
     def remove_search(self, search_id):
-        self._searches = [s for s in self._searches if s.id != search_id]
+        self._remove_searches([s for s in self._searches if s.id == search_id])
 
     def remove_search_by_query(self, query):
-        self._searches = [s for s in self._searches if s.query != query]
+        self._remove_searches([s for s in self._searches if s.query == query])
         return True
 
     def to_dict(self):
+        graph = self.graph
         return {
             "id": self.id,
             "name": self.name,
             "graph": {
-                "nodes": [n.to_dict() for n in self.graph.nodes],
-                "edges": [e.to_dict() for e in self.graph.edges],
-            } if self.graph else None,
+                "nodes": [n.to_dict() for n in graph.nodes],
+                "edges": [e.to_dict() for e in graph.edges],
+            } if graph else None,
             "searches": [s.to_dict() for s in self.searches],
             "filters": [f.to_dict() for f in self.filters],
         }
\ No newline at end of file
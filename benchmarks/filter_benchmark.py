@@ -0,0 +1,62 @@
+"""
+Micro-benchmark comparing the per-node Filter evaluation that re-parses the
+comparison value for every node with compiled predicates and Filter.apply.
+
+Usage: python benchmarks/filter_benchmark.py [node_count]
+"""
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+from api.model import Node, Filter, FilterOperator
+
+
+def _legacy_call(filter_obj: Filter, node: Node) -> bool:
+    """Filter.__call__ as it was before predicates were compiled."""
+    attribute, operator, value = filter_obj.key
+    if attribute not in node.data:
+        return False
+    attr_value = node.data[attribute]
+    if isinstance(attr_value, datetime):
+        compare_value = datetime.strptime(value, "%Y-%m-%d")
+    elif isinstance(value, str):
+        compare_value = type(attr_value)(value.strip())
+    else:
+        compare_value = type(attr_value)(value)
+
+    op = FilterOperator(operator)
+    if op == FilterOperator.EQUAL:
+        return attr_value == compare_value
+    elif op == FilterOperator.NOT_EQUAL:
+        return attr_value != compare_value
+    elif op == FilterOperator.GREATER_THAN:
+        return attr_value > compare_value
+    elif op == FilterOperator.GREATER_THAN_OR_EQUAL:
+        return attr_value >= compare_value
+    elif op == FilterOperator.LESS_THAN:
+        return attr_value < compare_value
+    return attr_value <= compare_value
+
+
+def main(node_count: int):
+    start = datetime(2000, 1, 1)
+    nodes = [
+        Node(str(i), {"age": i % 90, "born": start + timedelta(days=i % 10000)})
+        for i in range(node_count)
+    ]
+    filters = {
+        "int": Filter("age", FilterOperator.GREATER_THAN, "30"),
+        "date": Filter("born", FilterOperator.LESS_THAN_OR_EQUAL, "2010-06-01"),
+    }
+
+    print(f"{node_count} nodes")
+    for label, filter_obj in filters.items():
+        legacy = min(timeit.repeat(lambda: [n for n in nodes if _legacy_call(filter_obj, n)], number=1, repeat=3))
+        compiled = min(timeit.repeat(lambda: filter_obj.apply(nodes), number=1, repeat=3))
+        assert len(filter_obj.apply(nodes)) == sum(1 for n in nodes if _legacy_call(filter_obj, n))
+        print(f"{label:>5}: legacy {legacy * 1000:8.1f} ms   compiled {compiled * 1000:8.1f} ms   "
+              f"speedup {legacy / compiled:5.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,78 @@
+"""
+Peak RSS and load time of the loading process when a large JSON file is loaded in
+process, against loading it in an isolated worker process that hands the graph back
+through shared memory.
+
+Each mode runs in a fresh interpreter, so its peak RSS isn't inflated by the other.
+
+Usage: python benchmarks/isolated_load_benchmark.py [object_count]
+"""
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _write_json(path: str, object_count: int):
+    rng = random.Random(0)
+    items = [{
+        "id": f"n{i}",
+        "name": f"Object {i}",
+        "group": f"group{i % 50}",
+        "created": f"20{i % 24:02d}-0{i % 9 + 1}-1{i % 10}",
+        "score": rng.random(),
+        "links": [f"n{rng.randrange(object_count)}" for _ in range(3)],
+    } for i in range(object_count)]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"items": items}, f)
+
+
+def _peak_rss() -> float:
+    """Peak RSS of this process in MiB. ru_maxrss would include the parent's from before exec."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run(mode: str, path: str):
+    """Loads the file in this process and prints timing and peak RSS as JSON."""
+    from datasource_json.datasource import JsonDataSource
+    from core.use_cases import PluginService
+
+    plugin_service = PluginService()
+    if mode == "isolated":
+        plugin_service.enable_isolated_loads(1)
+    baseline = _peak_rss()
+    start = time.perf_counter()
+    graph = plugin_service.load(JsonDataSource(), file_path=path)
+    elapsed = time.perf_counter() - start
+    peak = _peak_rss()
+    print(json.dumps({"elapsed": elapsed, "baseline": baseline, "peak": peak,
+                      "nodes": graph.node_count, "edges": graph.edge_count}))
+    plugin_service.disable_isolated_loads()
+
+
+def main(object_count: int):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "large.json")
+        _write_json(path, object_count)
+        print(f"{object_count} objects, {os.path.getsize(path) / 2 ** 20:.1f} MiB")
+        for mode in ("in-process", "isolated"):
+            output = subprocess.run([sys.executable, __file__, "--run", mode, path],
+                                    check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"  {mode:>10}: {result['elapsed']:6.2f} s   peak RSS {result['peak']:7.1f} MiB "
+                  f"(+{result['peak'] - result['baseline']:.1f} MiB)   {result['nodes']} nodes   {result['edges']} edges")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        _run(sys.argv[2], sys.argv[3])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 300000)
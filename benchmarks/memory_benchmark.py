@@ -0,0 +1,121 @@
+"""
+Memory used per node and per edge by plain `__dict__` based model objects with
+per-node attribute key strings (before) and by the slotted `Node`/`Edge` with
+interned keys and pooled string values (after).
+
+Measured for the bundled JSON datasource files and for a generated graph whose
+attribute keys are long predicate URIs, as produced by the RDF datasource.
+Only the node and edge objects are counted, not the graph's adjacency indexes.
+
+Usage: python benchmarks/memory_benchmark.py [edge_count]
+"""
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+from api.model import Edge, Node, intern_attributes
+from datasource_json.datasource import convert_json_value
+
+JSON_FILES = [
+    os.path.join(os.path.dirname(__file__), "..", "datasource_json", "src", "datasource_json", "data", name)
+    for name in ("test.json", "test2.json")
+]
+
+
+class PlainNode(object):
+    """The model node before slots, one `__dict__` per instance."""
+
+    def __init__(self, id, data):
+        self._id = id
+        self._data = data
+
+
+class PlainEdge(object):
+    def __init__(self, src, dest):
+        self._src = src
+        self._dest = dest
+
+
+def _copy(text: str) -> str:
+    # A distinct string object with the same value, as a parser creates for every occurrence
+    return (text + ".")[:-1]
+
+
+def _json_records(path: str):
+    """Scalar attributes of every object in the file, the way JsonDataSource collects nodes."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    records, stack = [], [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            records.append({k: convert_json_value(v) for k, v in item.items() if not isinstance(v, (dict, list))})
+            stack.extend(v for v in item.values() if isinstance(v, (dict, list)))
+        elif isinstance(item, list):
+            stack.extend(item)
+    return records
+
+
+def _generated_records(node_count: int):
+    random.seed(0)
+    prefix = "http://example.org/ontology/person#"
+    kinds = [f"http://example.org/ontology/Kind{i}" for i in range(20)]
+    cities = [f"City {i}" for i in range(300)]
+    for i in range(node_count):
+        yield {
+            _copy(prefix + "name"): f"person{i}",
+            _copy(prefix + "age"): random.randint(0, 90),
+            _copy(prefix + "city"): _copy(random.choice(cities)),
+            _copy(prefix + "score"): random.random(),
+            _copy("type"): _copy(random.choice(kinds)),
+        }
+
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, used
+
+
+def _compare(title: str, records, edge_pairs):
+    print(title)
+    rows = {}
+    for label, node_class, edge_class, compact in (("before", PlainNode, PlainEdge, False),
+                                                  ("after", Node, Edge, True)):
+        def build_nodes():
+            strings = {}
+            if compact:
+                return [node_class(str(i), intern_attributes(data, strings)) for i, data in enumerate(records())]
+            return [node_class(str(i), data) for i, data in enumerate(records())]
+
+        nodes, node_bytes = _measure(build_nodes)
+        edges, edge_bytes = _measure(lambda: [edge_class(nodes[src], nodes[dest]) for src, dest in edge_pairs])
+        rows[label] = (node_bytes / max(len(nodes), 1), edge_bytes / max(len(edges), 1))
+        print(f"  {label:6} {len(nodes):>9} nodes {rows[label][0]:8.1f} B/node   "
+              f"{len(edges):>9} edges {rows[label][1]:6.1f} B/edge")
+        del nodes, edges
+    before, after = rows["before"], rows["after"]
+    print(f"  saved  {1 - after[0] / before[0]:.0%} per node, {1 - after[1] / before[1]:.0%} per edge")
+
+
+def main(edge_count: int):
+    for path in JSON_FILES:
+        count = len(_json_records(path))
+        random.seed(0)
+        pairs = [(random.randrange(count), random.randrange(count)) for _ in range(count)]
+        _compare(os.path.basename(path), lambda: _json_records(path), pairs)
+
+    node_count = max(edge_count // 5, 1)
+    random.seed(1)
+    pairs = [(random.randrange(node_count), random.randrange(node_count)) for _ in range(edge_count)]
+    _compare(f"generated, {edge_count} edges", lambda: _generated_records(node_count), pairs)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,65 @@
+"""
+PyPI dependency crawl time with an increasing number of concurrent requests,
+against a local stub of the PyPI JSON API with a fixed latency per request.
+
+Also checks that every concurrency level builds the same graph, that a crawl
+where every package first answers 503 still completes through retries, and
+how many requests crawls make with a warm and with an expired metadata cache.
+
+Usage: python benchmarks/pypi_crawl_benchmark.py [package_count]
+"""
+import sys
+import tempfile
+import time
+
+from pypi_datasource import PyPIDatasource
+
+from pypi_stub import PyPIStub, generate_packages
+
+LATENCY = 0.02
+DEPTH = 3
+
+
+def _crawl(url: str, concurrency: int):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        graph = PyPIDatasource(url, cache_dir).load(start_package="package-0", depth=DEPTH, concurrency=concurrency)
+        return graph, time.perf_counter() - start
+
+
+def _shape(graph):
+    return sorted(node.id for node in graph.nodes), sorted((edge.src.id, edge.dest.id) for edge in graph.edges)
+
+
+def main(package_count: int):
+    packages = generate_packages(package_count, max_dependencies=12)
+    print(f"{package_count} packages, depth {DEPTH}, {LATENCY * 1000:.0f} ms per request")
+    with PyPIStub(packages, LATENCY) as stub:
+        baseline = None
+        for concurrency in (1, 4, 16, 32, 64):
+            requests_before = stub.requests
+            graph, elapsed = _crawl(stub.url, concurrency)
+            if baseline is None:
+                baseline = (elapsed, _shape(graph))
+            assert _shape(graph) == baseline[1]
+            print(f"  concurrency {concurrency:>3}: {elapsed:6.2f} s   {stub.requests - requests_before:>5} requests   "
+                  f"{graph.node_count} nodes   speedup {baseline[0] / elapsed:5.1f}x")
+
+    with PyPIStub(packages, LATENCY, failures=1) as stub:
+        graph, elapsed = _crawl(stub.url, 16)
+        assert _shape(graph) == baseline[1]
+        print(f"  one 503 per package, concurrency 16: {elapsed:6.2f} s   {stub.requests} requests")
+
+    with PyPIStub(packages, LATENCY) as stub, tempfile.TemporaryDirectory() as cache_dir:
+        for label, ttl in (("cold cache", 3600), ("warm cache", 3600), ("expired cache", 0)):
+            requests_before, not_modified_before = stub.requests, stub.not_modified
+            start = time.perf_counter()
+            graph = PyPIDatasource(stub.url, cache_dir, ttl).load(start_package="package-0", depth=DEPTH)
+            elapsed = time.perf_counter() - start
+            assert _shape(graph) == baseline[1]
+            print(f"  {label:>13}: {elapsed:6.2f} s   {stub.requests - requests_before:>5} requests   "
+                  f"{stub.not_modified - not_modified_before:>5} not modified")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,67 @@
+"""
+Import throughput of the PyPI metadata dump datasource, in packages per minute,
+with one worker process and with one per core.
+
+The dump is generated into a temporary file: one JSON API document per line,
+with requirement strings using version specifiers, extras and markers, some
+repeated, some malformed and some for packages missing from the dump.
+
+Usage: python benchmarks/pypi_dump_benchmark.py [package_count]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from pypi_datasource import PyPIDumpDatasource
+
+from pypi_stub import metadata
+
+MAX_DEPENDENCIES = 8
+
+
+def _requirement(rng: random.Random, name: str) -> str:
+    return rng.choice((
+        name,
+        f"{name}>={rng.randint(1, 9)}.0",
+        f"{name.upper()}[extra]>=1.0,<3",
+        f"{name.replace('-', '_')} ; python_version < \"3.8\"",
+        f"{name}==2.* ; extra == \"test\"",
+    ))
+
+
+def _write_dump(path: str, package_count: int):
+    rng = random.Random(0)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(package_count):
+            requires_dist = [_requirement(rng, f"package-{rng.randrange(package_count * 11 // 10)}")
+                             for _ in range(rng.randint(0, MAX_DEPENDENCIES))]
+            if rng.random() < 0.01:
+                requires_dist.append("not a requirement ;;")
+            # The same dependency under another spelling must not add a second edge
+            requires_dist += requires_dist[:1]
+            f.write(json.dumps(metadata(f"package-{i}", requires_dist)) + "\n")
+
+
+def main(package_count: int):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "dump.jsonl")
+        _write_dump(path, package_count)
+        print(f"{package_count} packages, {os.path.getsize(path) / 2 ** 20:.1f} MiB dump")
+        baseline = None
+        for workers in sorted({1, os.cpu_count() or 1}):
+            start = time.perf_counter()
+            graph = PyPIDumpDatasource().load(file_path=path, workers=workers)
+            elapsed = time.perf_counter() - start
+            shape = graph.node_count, graph.edge_count
+            if baseline is None:
+                baseline = shape
+            assert shape == baseline
+            print(f"  workers {workers:>3}: {elapsed:6.2f} s   {package_count / elapsed * 60:>10,.0f} packages/min   "
+                  f"{graph.node_count} nodes   {graph.edge_count} edges")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
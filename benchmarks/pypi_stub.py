@@ -0,0 +1,120 @@
+"""
+Local stand-in for the PyPI JSON API used by the PyPI benchmarks and tests: serves canned
+`/pypi/<name>/json` documents for a generated package universe, with a fixed
+latency per request to stand in for the network.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+
+def generate_packages(count: int, max_dependencies: int = 6, seed: int = 0) -> Dict[str, List[str]]:
+    """Package name -> requires_dist of a random universe; package i depends on later ones only."""
+    rng = random.Random(seed)
+    packages = {}
+    for i in range(count):
+        later = range(i + 1, count)
+        picks = rng.sample(later, min(len(later), rng.randint(0, max_dependencies)))
+        packages[f"package-{i}"] = [f"package-{j}>={rng.randint(1, 9)}.0" for j in picks]
+    return packages
+
+
+def metadata(name: str, requires_dist: List[str]) -> dict:
+    version = "1.0.0"
+    return {
+        "info": {
+            "name": name,
+            "version": version,
+            "author": "Stub",
+            "license": "MIT",
+            "summary": f"Summary of {name}",
+            "requires_dist": requires_dist,
+        },
+        "releases": {version: [{"upload_time_iso_8601": "2024-01-01T00:00:00.000000Z"}]},
+    }
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for every pooled connection of a concurrent crawl
+    request_queue_size = 256
+
+
+class PyPIStub(object):
+    """
+    HTTP server answering `/pypi/<name>/json` from a package -> requires_dist mapping.
+    Use as a context manager; `url` is the index URL to pass to the datasource.
+    Every package answers `failure_status` for its first `failures` requests, to exercise retries.
+    Responses carry an ETag and answer 304 to a matching If-None-Match.
+    """
+
+    def __init__(self, packages: Dict[str, List[str]], latency: float = 0.0, failures: int = 0,
+                 failure_status: int = 503):
+        self.packages = packages
+        self.latency = latency
+        self.failures = failures
+        self.failure_status = failure_status
+        self.requests = 0
+        self.not_modified = 0
+        self.requests_by_name: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                time.sleep(stub.latency)
+                parts = self.path.strip("/").split("/")
+                name = parts[1] if len(parts) == 3 and parts[0] == "pypi" and parts[2] == "json" else None
+                with stub._lock:
+                    stub.requests += 1
+                    attempt = stub.requests_by_name.get(name, 0)
+                    stub.requests_by_name[name] = attempt + 1
+                if name not in stub.packages:
+                    self._send(404, b"{}")
+                    return
+                if attempt < stub.failures:
+                    self._send(stub.failure_status, b"{}")
+                    return
+                body = json.dumps(metadata(name, stub.packages[name])).encode("utf-8")
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    with stub._lock:
+                        stub.not_modified += 1
+                    self._send(304, b"", etag)
+                    return
+                self._send(200, body, etag)
+
+            def _send(self, status: int, body: bytes, etag: str = None):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if etag is not None:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = _Server(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/pypi"
+
+    def __enter__(self) -> "PyPIStub":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._server.shutdown()
+        self._server.server_close()
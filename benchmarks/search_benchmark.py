@@ -0,0 +1,45 @@
+"""
+Benchmark comparing per-node Search evaluation with lookups in the
+workspace's inverted SearchIndex.
+
+Usage: python benchmarks/search_benchmark.py [node_count]
+"""
+import random
+import sys
+import timeit
+
+from api.model import Node, Search, SearchIndex
+
+
+def main(node_count: int):
+    random.seed(0)
+    cities = [f"city{i}" for i in range(500)]
+    nodes = [
+        Node(str(i), {"name": f"person{i}", "age": random.randint(0, 90), "city": random.choice(cities)})
+        for i in range(node_count)
+    ]
+    searches = [Search("city7"), Search("person42"), Search("33")]
+
+    def scan():
+        return {node.id for node in nodes if any(search(node) for search in searches)}
+
+    def indexed(index):
+        result = set()
+        for search in searches:
+            result |= search.lookup(index)
+        return result
+
+    build = min(timeit.repeat(lambda: SearchIndex(nodes), number=1, repeat=3))
+    index = SearchIndex(nodes)
+    assert scan() == indexed(index)
+
+    scan_time = min(timeit.repeat(scan, number=1, repeat=3))
+    lookup_time = min(timeit.repeat(lambda: indexed(index), number=1, repeat=3))
+    print(f"{node_count} nodes, {len(searches)} searches")
+    print(f"scan   {scan_time * 1000:10.2f} ms")
+    print(f"build  {build * 1000:10.2f} ms (once per graph version)")
+    print(f"lookup {lookup_time * 1000:10.2f} ms   speedup {scan_time / lookup_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
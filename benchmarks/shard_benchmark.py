@@ -0,0 +1,85 @@
+"""
+Load time of a directory of JSON and Turtle shards with an increasing number of
+worker processes, against parsing the same shards one after another in-process.
+
+The shards are generated into a temporary directory: objects with ids, scalar
+attributes and references to objects in other shards.
+
+Usage: python benchmarks/shard_benchmark.py [shard_count]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from datasource_json.datasource import JsonDataSource
+from datasource_rdf.datasource import RdfDataSource
+
+OBJECTS_PER_SHARD = 4000
+
+
+def _write_json_shards(directory: str, shard_count: int):
+    random.seed(0)
+    total = shard_count * OBJECTS_PER_SHARD
+    for shard in range(shard_count):
+        items = []
+        for i in range(shard * OBJECTS_PER_SHARD, (shard + 1) * OBJECTS_PER_SHARD):
+            items.append({
+                "id": f"n{i}",
+                "name": f"Object {i}",
+                "created": f"20{i % 24:02d}-0{i % 9 + 1}-1{i % 10}",
+                "score": random.random(),
+                "links": [f"n{random.randrange(total)}" for _ in range(3)],
+            })
+        with open(os.path.join(directory, f"shard{shard:04d}.json"), "w", encoding="utf-8") as f:
+            json.dump({"items": items}, f)
+
+
+def _write_turtle_shards(directory: str, shard_count: int):
+    random.seed(0)
+    total = shard_count * OBJECTS_PER_SHARD
+    for shard in range(shard_count):
+        with open(os.path.join(directory, f"shard{shard:04d}.ttl"), "w", encoding="utf-8") as f:
+            f.write("@prefix ex: <http://example.org/> .\n")
+            f.write("@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .\n")
+            for i in range(shard * OBJECTS_PER_SHARD, (shard + 1) * OBJECTS_PER_SHARD):
+                f.write(f'ex:n{i} ex:name "Object {i}" ; ex:age "{i % 90}"^^xsd:integer ; '
+                        f'ex:knows ex:n{random.randrange(total)} .\n')
+
+
+def _worker_counts():
+    """2, 4, 8, ... up to the number of cores; a single worker loads in-process."""
+    cores = max(os.cpu_count() or 1, 2)
+    counts, count = [], 2
+    while count < cores:
+        counts.append(count)
+        count *= 2
+    return counts + [cores]
+
+
+def _curve(label: str, datasource, directory: str):
+    start = time.perf_counter()
+    graph = datasource.load(file_path=directory, workers=1)
+    sequential = time.perf_counter() - start
+    print(f"{label}: {graph.node_count} nodes, in-process {sequential:6.2f} s")
+    for workers in _worker_counts():
+        start = time.perf_counter()
+        datasource.load(file_path=directory, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"  {workers:>3} workers {elapsed:6.2f} s   speedup {sequential / elapsed:4.1f}x")
+
+
+def main(shard_count: int):
+    print(f"{os.cpu_count()} cores, {shard_count} shards of {OBJECTS_PER_SHARD} objects")
+    with tempfile.TemporaryDirectory() as directory:
+        _write_json_shards(directory, shard_count)
+        _curve("json", JsonDataSource(), directory)
+    with tempfile.TemporaryDirectory() as directory:
+        _write_turtle_shards(directory, shard_count)
+        _curve("turtle", RdfDataSource(), directory)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 32)
@@ -0,0 +1,71 @@
+"""
+Startup time of the plugin service with plugins imported and constructed up front,
+against plugins described by their manifests and imported on first use.
+
+Each mode runs in a fresh interpreter, so imports done by one don't speed up the other.
+The lazy mode also reports the first use of a visualizer and a datasource, the cost it
+moves from startup to the first request, and the full Django setup of the web app.
+
+Usage: python benchmarks/startup_benchmark.py [repeats]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ("rdflib", "requests", "dateutil", "packaging", "jinja2")
+GRAPH_VISUALIZER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "graph_visualizer")
+
+
+def _run(mode: str):
+    """Starts the plugin service in this process and prints the timings as JSON."""
+    result = {}
+    start = time.perf_counter()
+    if mode == "django":
+        sys.path.insert(0, GRAPH_VISUALIZER_DIR)
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sites.settings")
+        import django
+        django.setup()
+        result["ready"] = time.perf_counter() - start
+    else:
+        from core.use_cases import PluginService
+        result["import"] = time.perf_counter() - start
+
+        plugin_service = PluginService()
+        start = time.perf_counter()
+        plugin_service.load_plugins("core.datasource", lazy=mode == "lazy")
+        plugin_service.load_plugins("core.visualizer", lazy=mode == "lazy")
+        result["ready"] = time.perf_counter() - start
+        result["heavy"] = [name for name in HEAVY_MODULES if name in sys.modules]
+
+        # Looking up a method of a lazy plugin imports and constructs it
+        start = time.perf_counter()
+        plugin_service.plugins["core.visualizer"][0].visualize
+        plugin_service.plugins["core.datasource"][0].load
+        result["first_use"] = time.perf_counter() - start
+    print(json.dumps(result))
+
+
+def main(repeats: int):
+    for mode in ("eager", "lazy", "django"):
+        runs = []
+        for _ in range(repeats):
+            output = subprocess.run([sys.executable, __file__, "--run", mode],
+                                    check=True, capture_output=True, text=True).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        line = f"  {mode:>6}:"
+        for key in ("import", "ready", "first_use"):
+            if key in runs[0]:
+                line += f"   {key} {statistics.median(run[key] for run in runs) * 1000:7.1f} ms"
+        if "heavy" in runs[0]:
+            line += f"   loaded at startup: {', '.join(runs[0]['heavy']) or 'none'}"
+        print(line)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        _run(sys.argv[2])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -1,9 +1,8 @@
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
 
-from api.components import VisualizerPlugin
+from api.components import VisualizerPlugin, load_template
 from api.model import Graph
-from .util import _convert_nodes_to_dict, _convert_edges_to_dict, _custom_tojson
+from .util import _convert_nodes_to_dict, _convert_edges_to_dict
 
 
 class BlockVisualizer(VisualizerPlugin):
@@ -14,18 +13,9 @@ class BlockVisualizer(VisualizerPlugin):
     PLUGIN_IDENTIFIER = "block_visualizer"
 
     def __init__(self) -> None:
-        """Initialize the visualizer with Jinja2 template environment."""
-        self._setup_template_environment()
-
-    def _setup_template_environment(self) -> None:
-        """Configure Jinja2 environment with custom filters and template loader."""
+        """Initialize the visualizer with its template from the shared Jinja2 environment."""
         template_path = Path(__file__).parent / "templates"
-        if not template_path.exists():
-            raise FileNotFoundError(f"Template folder not found: {template_path}")
-
-        self._environment = Environment(loader=FileSystemLoader(str(template_path)))
-        self._environment.filters['tojson'] = _custom_tojson
-        self._template = self._environment.get_template(self.TEMPLATE_NAME)
+        self._template = load_template(self.PLUGIN_IDENTIFIER, str(template_path), self.TEMPLATE_NAME)
 
     def visualize(self, data: Graph) -> str:
         """
@@ -1,14 +1,5 @@
-import json
-from datetime import datetime, date
 from typing import List, Dict, Any
 
-class DateTimeEncoder(json.JSONEncoder):
-    """Custom JSON encoder that handles datetime and date objects."""
-    def default(self, obj: Any) -> str:
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()
-        return super().default(obj)
-
 
 def _convert_nodes_to_dict(nodes) -> List[Dict[str, Any]]:
     """Convert node objects (dict or Node) to dictionary representation."""
@@ -43,7 +34,3 @@ def _convert_edges_to_dict(edges) -> List[Dict[str, str]]:
             })
     return converted
 
-
-def _custom_tojson(obj: Any, **kwargs) -> str:
-    """Custom JSON serialization filter for Jinja2 templates."""
-    return json.dumps(obj, cls=DateTimeEncoder, **kwargs)
@@ -25,6 +25,11 @@ class CommandHandler:
         return Status.ERROR,f"Node {node_id} does not exist."
 
     def add_edge(self, parent_id: str, child_id: str):
+        for node_id in (parent_id, child_id):
+            if not self.workspace.has_node(node_id):
+                return Status.ERROR,f"Node {node_id} does not exist."
+        if self.workspace.has_edge(parent_id, child_id):
+            return Status.ERROR,f"Edge {parent_id} -> {child_id} already exists."
         if self.workspace.add_edge(parent_id, child_id):
             return Status.SUCCESS,f"Edge {parent_id} -> {child_id} created."
         return Status.ERROR,f"Something with adding edge {parent_id} -> {child_id} went wrong."
@@ -32,6 +37,11 @@ class CommandHandler:
     def edit_edge(self, old_parent: str, old_child: str, new_parent: str|None, new_child: str|None):
         new_parent=new_parent or old_parent
         new_child=new_child or old_child
+        if not self.workspace.has_edge(old_parent, old_child):
+            return Status.ERROR,f"Edge {old_parent} -> {old_child} does not exist."
+        for node_id in (new_parent, new_child):
+            if not self.workspace.has_node(node_id):
+                return Status.ERROR,f"Node {node_id} does not exist."
         if self.workspace.edit_edge(old_parent,old_child,new_parent,new_child):
             return Status.SUCCESS,f"Edge {old_parent} -> {old_child} updated to {new_parent} -> {new_child}."
         return Status.ERROR,f"Something with editing old edge {old_parent} -> {old_child} went wrong."
@@ -45,11 +55,14 @@ class CommandHandler:
         self.workspace.clean_start()
         return Status.SUCCESS,"Workspace cleared (all nodes and edges deleted)."
 
-    def add_search(self, query: str):
+    def add_search(self, query: str, mode: str = "exact", limit: int | None = None):
         if not query:
             return Status.ERROR, "Search query cannot be empty"
-        self.workspace.add_search(query)
-        return Status.SUCCESS, f"Search '{query}' added."
+        try:
+            self.workspace.add_search(query, mode, limit)
+        except ValueError as e:
+            return Status.ERROR, str(e)
+        return Status.SUCCESS, f"Search '{query}' ({mode}) added."
 
     def remove_search(self, query: str):
         if self.workspace.remove_search_by_query(query):
@@ -63,6 +76,27 @@ class CommandHandler:
         except ValueError as e:
             return Status.ERROR, str(e)
 
+    def add_filter_expression(self, expression: str):
+        try:
+            self.workspace.add_filter_expression(expression)
+            return Status.SUCCESS, f"Filter added: {expression}"
+        except ValueError as e:
+            return Status.ERROR, str(e)
+
+    def remove_filter_expression(self, expression: str):
+        try:
+            if self.workspace.remove_filter_by_expression(expression):
+                return Status.SUCCESS, f"Filter {expression} removed."
+        except ValueError as e:
+            return Status.ERROR, str(e)
+        return Status.ERROR, f"Filter {expression} not found."
+
+    def explain_filter(self, expression: str):
+        try:
+            return Status.SUCCESS, self.workspace.explain_filter(expression)
+        except ValueError as e:
+            return Status.ERROR, str(e)
+
     def remove_filter(self, attribute: str, operator: str, value:str):
         if self.workspace.remove_filter_by_values(attribute, operator, value):
             return Status.SUCCESS, f"Filter {attribute} {operator} {value} removed."
@@ -150,17 +184,24 @@ class CLIHandler:
             delete-edge --parent <parent_id> --child <child_id>
                 e.g. delete-edge --parent 1 --child 2
         add search:
-            add-search --query <search query>
+            add-search --query <search query> (opt)--mode <exact|substring|prefix|fuzzy> (opt)--limit <top k>
                 e.g. add-search --query Diana
+                e.g. add-search --query dian --mode fuzzy --limit 10
         remove search:
             remove-search --query <search query>
                 e.g. remove-search --query Diana
         add filter:
             add-filter --attribute <attribute> --operator <operator> --value <value>
                 e.g. add-filter --attribute age --operator > --value 20
+            add-filter --expression <expression>
+                e.g. add-filter --expression (age > 20 AND city = "Novi Sad") OR NOT type = Person
         remove filter:
             remove-filter --attribute <attribute> --operator <operator> --value <value>
                 e.g. remove-filter --attribute age --operator > --value 20
+            remove-filter --expression <expression>
+        explain filter:
+            explain-filter --expression <expression>
+                e.g. explain-filter --expression age > 20 AND city = "Novi Sad"
         clear workspace:
             clear-start
         help:
@@ -247,7 +288,11 @@ class CLIHandler:
                 query = flags.get("query")
                 if not query:
                     raise ValueError("Missing --query")
-                return self.manager.add_search(query)
+                mode = flags.get("mode") or "exact"
+                limit = flags.get("limit")
+                if limit and not limit.isdigit():
+                    raise ValueError("--limit must be a positive integer")
+                return self.manager.add_search(query, mode.lower(), int(limit) if limit else None)
 
             elif cmd == "remove-search":
                 flags = parse_flags(parts[1:])
@@ -258,6 +303,8 @@ class CLIHandler:
 
             elif cmd == "add-filter":
                 flags = parse_flags(parts[1:])
+                if "expression" in flags:
+                    return self.manager.add_filter_expression(flags["expression"])
                 attr = flags.get("attribute")
                 op = flags.get("operator")
                 val = flags.get("value")
@@ -268,6 +315,8 @@ class CLIHandler:
 
             elif cmd == "remove-filter":
                 flags = parse_flags(parts[1:])
+                if "expression" in flags:
+                    return self.manager.remove_filter_expression(flags["expression"])
                 attr = flags.get("attribute")
                 op = flags.get("operator")
                 val = flags.get("value")
@@ -276,6 +325,13 @@ class CLIHandler:
                 val = convert_value(val)
                 return self.manager.remove_filter(attr,op,val)
 
+            elif cmd == "explain-filter":
+                flags = parse_flags(parts[1:])
+                expression = flags.get("expression")
+                if not expression:
+                    raise ValueError("Missing --expression")
+                return self.manager.explain_filter(expression)
+
             elif cmd == "help":
                 return Status.SUCCESS, self.INSTRUCTION
 
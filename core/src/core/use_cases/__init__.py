@@ -1,2 +1,6 @@
 from .plugin_recognition import  PluginService
-from .workspace_management import WorkspaceService
\ No newline at end of file
+from .workspace_management import WorkspaceService
+from .datasource_cache import DataSourceCache
+from .graph_assembly import GraphAssembler, assemble_graph, load_graph
+from .load_jobs import LoadJobManager, LoadJob, JobState
+from .lazy_plugins import LazyPlugin, plugin_class
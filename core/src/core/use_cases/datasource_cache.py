@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from api.components import DataSourcePlugin
+from api.model import Graph, save_snapshot, open_snapshot
+from api.model.snapshot import MAGIC
+
+from .graph_assembly import GraphAssembler, load_graph
+
+# Part of every key, bump it when cached graphs must not be reused by a new version
+CACHE_VERSION = 1
+CACHE_SUFFIX = ".gvsnap"
+DEFAULT_MAX_BYTES = 1 << 30
+
+_CHUNK_SIZE = 1 << 20
+
+
+class DataSourceCache(object):
+    """
+    On-disk cache of loaded graphs, shared by all datasource plugins that opt in by
+    returning their `source_files`.
+
+    Entries are keyed by the plugin identifier, the normalized load parameters and the
+    content hash of the source files, so a renamed or copied file still hits and an
+    edited one misses. Graphs are stored as memory mapped snapshots, so a hit is opened
+    without parsing. The least recently used entries are evicted above `max_bytes`.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES, hash_contents: bool = True):
+        """
+        :param directory: Directory of the cache entries, created on first use.
+        :param max_bytes: Size limit of all entries together.
+        :param hash_contents: Hash the content of source files, otherwise only their size and
+            modification time identify them.
+        """
+        if max_bytes < 0:
+            raise ValueError("Cache size limit cannot be negative.")
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._hash_contents = hash_contents
+        # path -> (stat signature, digest), so unchanged files are hashed only once
+        self._digests: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def load(self, plugin: DataSourcePlugin, on_batch: Optional[Callable[[GraphAssembler], None]] = None,
+             loader: Optional[Callable[..., Graph]] = None, **kwargs) -> Graph:
+        """
+        Loads the graph from the cache, or with the plugin and stores it in the cache.
+        Plugins that don't opt in are always loaded directly and counted neither as hit nor miss.
+        With `on_batch`, the plugin loads batch by batch and the callback gets the assembler
+        after every batch, see `load_graph`. With `loader`, the plugin loads through
+        `loader(plugin, **kwargs)` instead, for example in a worker process.
+
+        A cache hit returns a snapshot backed `CSRGraph`, whatever graph class the plugin returned.
+        """
+        key = self.key(plugin, **kwargs)
+        if key is None:
+            return self._load(plugin, on_batch, loader, kwargs)
+
+        path = self._entry_path(key)
+        graph = self._open_entry(path)
+        if graph is not None:
+            with self._lock:
+                self._hits += 1
+            return graph
+
+        with self._lock:
+            self._misses += 1
+        graph = self._load(plugin, on_batch, loader, kwargs)
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            save_snapshot(graph, path)
+        except OSError:
+            # A full or read-only disk only costs the next load
+            return graph
+        self._evict()
+        return graph
+
+    def key(self, plugin: DataSourcePlugin, **kwargs) -> Optional[str]:
+        """
+        Cache key of loading with the plugin and parameters.
+
+        :return: Hex digest of the key, or None if the plugin doesn't opt in or a source
+            file can't be read.
+        """
+        files = plugin.source_files(**kwargs)
+        if files is None:
+            return None
+        try:
+            digests = {os.path.abspath(path): self._file_digest(path) for path in files}
+        except OSError:
+            # Let the plugin report the missing file
+            return None
+
+        parameters = {}
+        for name, value in kwargs.items():
+            if isinstance(value, str) and os.path.abspath(value) in digests:
+                # Files are identified by content, not by where they are
+                value = {"file": digests[os.path.abspath(value)]}
+            parameters[name] = value
+        description = {
+            "version": CACHE_VERSION,
+            "format": MAGIC.decode("ascii"),
+            "plugin": plugin.identifier(),
+            "parameters": parameters,
+            "files": sorted(digests.values()),
+        }
+        encoded = json.dumps(description, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def statistics(self) -> Dict[str, Any]:
+        """Hit and miss counts and the current size of the cache."""
+        entries = self._entries()
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "entries": len(entries),
+            "size": sum(size for _, size, _ in entries),
+            "max_bytes": self._max_bytes,
+        }
+
+    def clear(self):
+        """Removes all entries, the hit and miss counts are kept."""
+        with self._lock:
+            for path, _, _ in self._entries():
+                self._remove(path)
+
+    @staticmethod
+    def _load(plugin: DataSourcePlugin, on_batch: Optional[Callable[[GraphAssembler], None]],
+              loader: Optional[Callable[..., Graph]], kwargs: Dict[str, Any]) -> Graph:
+        if loader is not None:
+            return loader(plugin, **kwargs)
+        if on_batch is None:
+            return plugin.load(**kwargs)
+        return load_graph(plugin, on_batch, **kwargs)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self._directory, key + CACHE_SUFFIX)
+
+    def _open_entry(self, path: str) -> Optional[Graph]:
+        try:
+            graph = open_snapshot(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # Truncated or written by an incompatible version
+            self._remove(path)
+            return None
+        try:
+            # The modification time is the recency used for eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return graph
+
+    def _file_digest(self, path: str) -> str:
+        status = os.stat(path)
+        signature = (status.st_size, status.st_mtime_ns, status.st_ino)
+        if not self._hash_contents:
+            return "{}:{}".format(status.st_size, status.st_mtime_ns)
+        cached = self._digests.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        self._digests[path] = (signature, digest.hexdigest())
+        return digest.hexdigest()
+
+    def _entries(self) -> List[Tuple[str, int, int]]:
+        """(path, size, modification time) of every entry."""
+        entries = []
+        try:
+            names = os.listdir(self._directory)
+        except OSError:
+            return entries
+        for name in names:
+            if not name.endswith(CACHE_SUFFIX):
+                continue
+            path = os.path.join(self._directory, name)
+            try:
+                status = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, status.st_size, status.st_mtime_ns))
+        return entries
+
+    def _evict(self):
+        """Removes the least recently used entries until the cache fits its size limit."""
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda entry: entry[2])
+            size = sum(entry[1] for entry in entries)
+            for path, entry_size, _ in entries:
+                if size <= self._max_bytes:
+                    break
+                if self._remove(path):
+                    size -= entry_size
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+        except OSError:
+            # Still mapped by an open graph on platforms that don't allow removing it
+            return False
+        return True
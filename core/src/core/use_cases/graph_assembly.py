@@ -0,0 +1,101 @@
+from typing import Callable, Iterable, Optional
+
+from api.components import DataSourcePlugin, LoadBatch
+from api.model import Edge, Graph, Node
+
+
+class GraphAssembler(object):
+    """
+    Builds a graph from the batches of `DataSourcePlugin.load_iter` as they arrive, so the
+    partially loaded graph and the progress of the load are available before it completes.
+    """
+
+    def __init__(self, directed: bool = True):
+        self._graph = Graph([], [], directed)
+        self._progress: Optional[float] = None
+        self._message: Optional[str] = None
+        self._batches = 0
+
+    @property
+    def graph(self) -> Graph:
+        """The graph assembled so far."""
+        return self._graph
+
+    @property
+    def progress(self) -> Optional[float]:
+        """Progress hint of the latest batch that had one, None if none had."""
+        return self._progress
+
+    @property
+    def message(self) -> Optional[str]:
+        return self._message
+
+    @property
+    def batches(self) -> int:
+        return self._batches
+
+    def add(self, batch: LoadBatch):
+        """Adds the nodes and edges of a batch to the graph."""
+        if batch.graph is not None:
+            if self._batches == 0 and self._graph.node_count == 0:
+                # A graph loaded in one piece is used as is, whatever its storage
+                self._graph = batch.graph
+            else:
+                self._add_nodes(batch.graph.nodes)
+                self._add_edges(batch.graph.edges)
+        self._add_nodes(batch.nodes)
+        self._add_edges(batch.edges)
+        self._batches += 1
+        if batch.progress is not None:
+            self._progress = min(1.0, max(0.0, batch.progress))
+        if batch.message is not None:
+            self._message = batch.message
+
+    def _add_nodes(self, nodes: Iterable[Node]):
+        graph = self._graph
+        for node in nodes:
+            if not graph.add_node(node) and node.data:
+                existing = graph.get_node(node.id)
+                if existing is not node:
+                    graph.update_node(node.id, **node.data)
+
+    def _add_edges(self, edges: Iterable[Edge]):
+        graph = self._graph
+        for edge in edges:
+            src = self._endpoint(edge.src)
+            dest = self._endpoint(edge.dest)
+            if src is not edge.src or dest is not edge.dest:
+                # Endpoints given as placeholders or copies are bound to the nodes of the graph
+                edge = Edge(src, dest)
+            graph.add_edge(edge)
+
+    def _endpoint(self, node: Node) -> Node:
+        existing = self._graph.get_node(node.id)
+        if existing is None:
+            self._graph.add_node(node)
+            return node
+        return existing
+
+
+def assemble_graph(batches: Iterable[LoadBatch], on_batch: Optional[Callable[[GraphAssembler], None]] = None,
+                   directed: bool = True) -> Graph:
+    """
+    Assembles the batches of a load into one graph.
+
+    :param batches: Batches as yielded by `DataSourcePlugin.load_iter`.
+    :param on_batch: Called with the assembler after every batch, to report progress.
+    :param directed: Whether the assembled graph is directed.
+    :return: The assembled graph.
+    """
+    assembler = GraphAssembler(directed)
+    for batch in batches:
+        assembler.add(batch)
+        if on_batch is not None:
+            on_batch(assembler)
+    return assembler.graph
+
+
+def load_graph(plugin: DataSourcePlugin, on_batch: Optional[Callable[[GraphAssembler], None]] = None,
+               **kwargs) -> Graph:
+    """Loads a graph with the plugin batch by batch, see `assemble_graph`."""
+    return assemble_graph(plugin.load_iter(**kwargs), on_batch)
@@ -0,0 +1,141 @@
+import mmap
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Optional, Tuple, Type
+
+from api.components import DataSourcePlugin
+from api.model import CSRGraph, read_snapshot, write_snapshot
+
+from .lazy_plugins import plugin_class
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, loads run without a memory limit there
+    resource = None
+
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_MAX_TASKS_PER_WORKER = 8
+
+
+def _address_space() -> Optional[int]:
+    """Current virtual memory size of this process in bytes, None if it can't be told."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * mmap.PAGESIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _load_in_worker(plugin_class: Type[DataSourcePlugin], kwargs: Dict[str, Any],
+                    memory_limit: Optional[int]) -> Tuple[str, int]:
+    """
+    Loads a graph in a worker process and writes it as a snapshot into a new shared memory
+    block, so it crosses to the web process as flat arrays instead of pickled objects.
+
+    :return: Name of the block and size of the snapshot in it.
+    """
+    limit = resource.getrlimit(resource.RLIMIT_AS) if resource is not None else None
+    baseline = _address_space()
+    if memory_limit is not None and limit is not None and baseline is not None:
+        soft, hard = limit
+        # The limit is on top of what the worker already uses, imports included
+        wanted = baseline + memory_limit
+        if hard != resource.RLIM_INFINITY:
+            wanted = min(wanted, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (wanted, hard))
+    blocks = []
+
+    def allocate(size: int) -> memoryview:
+        blocks.append(shared_memory.SharedMemory(create=True, size=max(size, 1)))
+        return blocks[-1].buf
+
+    try:
+        plugin = plugin_class()
+        if any(parameter.name == "compact" for parameter in plugin.get_parameters()):
+            # The graph comes back in CSR storage either way, building it that way saves the conversion
+            kwargs = dict(kwargs, compact=True)
+        size = write_snapshot(plugin.load(**kwargs), allocate)
+    except BaseException as e:
+        for block in blocks:
+            block.close()
+            block.unlink()
+        if isinstance(e, MemoryError) and memory_limit is not None:
+            raise MemoryError(f"Load exceeded the memory limit of {memory_limit // (1 << 20)} MiB") from None
+        raise
+    finally:
+        if limit is not None and memory_limit is not None:
+            resource.setrlimit(resource.RLIMIT_AS, limit)
+    block = blocks[0]
+    # The web process owns the block from now on and unlinks it once it has a copy; the
+    # tracker knows blocks by their internal name, which has a leading slash on POSIX
+    resource_tracker.unregister(block._name, "shared_memory")
+    block.close()
+    return block.name, size
+
+
+class IsolatedLoader(object):
+    """
+    Runs `DataSourcePlugin.load` in a pool of worker processes, so parsing neither holds
+    the GIL of the web process nor grows its heap. The worker converts the graph to CSR
+    storage and sends it back through shared memory as snapshot arrays; the web process
+    copies them into an anonymous memory map, which goes back to the operating system as
+    soon as the graph is released. Graphs come back as `CSRGraph`.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, memory_limit: Optional[int] = None,
+                 max_tasks_per_worker: int = DEFAULT_MAX_TASKS_PER_WORKER):
+        """
+        :param max_workers: Number of worker processes.
+        :param memory_limit: Bytes of address space a load may add to its worker, None for no limit.
+            Address space includes memory that is reserved but never used, so leave headroom.
+        :param max_tasks_per_worker: Loads after which a worker is replaced by a fresh
+            process, returning the memory its heap kept.
+        :raises ValueError: If max_workers or max_tasks_per_worker is lower than 1.
+        """
+        if max_workers < 1 or max_tasks_per_worker < 1:
+            raise ValueError("At least one worker and one task per worker are required.")
+        self._max_workers = max_workers
+        self._memory_limit = memory_limit
+        self._max_tasks_per_worker = max_tasks_per_worker
+        self._executor = self._create_executor()
+
+    @property
+    def memory_limit(self) -> Optional[int]:
+        return self._memory_limit
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # Forked workers would share the heap of the web process, spawned ones start clean
+        return ProcessPoolExecutor(self._max_workers, mp_context=multiprocessing.get_context("spawn"),
+                                   max_tasks_per_child=self._max_tasks_per_worker)
+
+    def load(self, plugin: DataSourcePlugin, memory_limit: Optional[int] = None, **kwargs) -> CSRGraph:
+        """
+        Loads a graph with a fresh instance of the plugin's class in a worker process.
+
+        :param plugin: Plugin whose class loads the graph, it must be constructible without arguments.
+        :param memory_limit: Overrides the limit of the loader for this load.
+        :raises MemoryError: If the load exceeded the memory limit.
+        :raises RuntimeError: If the worker process died.
+        """
+        limit = memory_limit if memory_limit is not None else self._memory_limit
+        try:
+            name, size = self._executor.submit(_load_in_worker, plugin_class(plugin), kwargs, limit).result()
+        except BrokenProcessPool:
+            self._executor = self._create_executor()
+            raise RuntimeError("The load worker process died, possibly for exceeding its memory limit.") from None
+
+        block = shared_memory.SharedMemory(name=name)
+        try:
+            mapping = mmap.mmap(-1, max(size, 1))
+            with block.buf[:size] as data:
+                mapping.write(data)
+        finally:
+            block.close()
+            block.unlink()
+        return read_snapshot(mapping)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,122 @@
+import importlib.util
+import json
+import os
+import threading
+from importlib.metadata import EntryPoint
+from typing import Any, Dict, List, Optional, Type
+
+from api.components import DataSourceParameter, Plugin
+
+# File next to the package of a plugin that describes the plugins it provides, keyed by class name
+MANIFEST_NAME = "plugins.json"
+PARAMETER_TYPES = {"str": str, "int": int, "float": float, "bool": bool}
+
+
+def read_manifest(entry_point: EntryPoint) -> Optional[Dict[str, Any]]:
+    """
+    Reads the metadata of an entry point's plugin from the manifest of its package,
+    without importing the package.
+
+    :return: Identifier, name and parameters of the plugin, None if the package has no entry for it.
+    :raises ValueError: If the manifest isn't valid JSON.
+    """
+    package = entry_point.module.split(".")[0]
+    try:
+        # Finding the spec of a top level package locates it without running its __init__
+        spec = importlib.util.find_spec(package)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    for location in spec.submodule_search_locations:
+        path = os.path.join(location, MANIFEST_NAME)
+        if os.path.isfile(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid plugin manifest {path}: {e}") from None
+            return manifest.get(entry_point.attr)
+    return None
+
+
+class LazyPlugin(Plugin):
+    """
+    Stands in for a plugin whose metadata was read from its manifest. The plugin module is
+    imported and the plugin constructed on first use of anything but its identifier, name
+    and parameters, which is then delegated to the plugin.
+    """
+
+    def __init__(self, entry_point: EntryPoint, metadata: Dict[str, Any]):
+        """
+        :param entry_point: Entry point the plugin class is loaded from.
+        :param metadata: Manifest entry of the plugin.
+        :raises ValueError: If the metadata lacks the identifier or name, or has a parameter of unknown type.
+        """
+        if "identifier" not in metadata or "name" not in metadata:
+            raise ValueError(f"Plugin manifest entry of {entry_point.value} needs an identifier and a name.")
+        parameters = []
+        for parameter in metadata.get("parameters", []):
+            if parameter.get("type") not in PARAMETER_TYPES:
+                raise ValueError(f"Unknown type of parameter {parameter.get('name')} of {entry_point.value}.")
+            parameters.append(DataSourceParameter(parameter["name"], PARAMETER_TYPES[parameter["type"]],
+                                                  parameter.get("display_name", parameter["name"])))
+        self._entry_point = entry_point
+        self._identifier = metadata["identifier"]
+        self._name = metadata["name"]
+        self._parameters = parameters
+        self._plugin_class: Optional[Type[Plugin]] = None
+        self._plugin: Optional[Plugin] = None
+        self._lock = threading.Lock()
+
+    def name(self) -> str:
+        return self._name
+
+    def identifier(self) -> str:
+        return self._identifier
+
+    def get_parameters(self) -> List[DataSourceParameter]:
+        return list(self._parameters)
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the plugin was constructed."""
+        return self._plugin is not None
+
+    @property
+    def plugin_class(self) -> Type[Plugin]:
+        """Class of the plugin, imported on first access."""
+        if self._plugin_class is None:
+            self._plugin_class = self._entry_point.load()
+        return self._plugin_class
+
+    @property
+    def plugin(self) -> Plugin:
+        """
+        The plugin, constructed on first access.
+
+        :raises ValueError: If its identifier differs from the one in the manifest.
+        """
+        if self._plugin is None:
+            with self._lock:
+                if self._plugin is None:
+                    plugin = self.plugin_class()
+                    if plugin.identifier() != self._identifier:
+                        raise ValueError(f"Plugin {self._entry_point.value} is {plugin.identifier()}, "
+                                         f"its manifest says {self._identifier}.")
+                    self._plugin = plugin
+        return self._plugin
+
+    def __getattr__(self, item: str):
+        # Only called for attributes this class lacks, the private ones never go to the plugin
+        if item.startswith("_"):
+            raise AttributeError(item)
+        return getattr(self.plugin, item)
+
+
+def plugin_class(plugin: Plugin) -> Type[Plugin]:
+    """Class of a plugin, also of one behind a `LazyPlugin`."""
+    if isinstance(plugin, LazyPlugin):
+        return plugin.plugin_class
+    return type(plugin)
+
@@ -0,0 +1,216 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from api.components import DataSourcePlugin
+from api.model import Graph, Workspace
+
+from .datasource_cache import DataSourceCache
+from .graph_assembly import GraphAssembler, load_graph
+from .plugin_recognition import PluginService
+
+DEFAULT_MAX_WORKERS = 2
+# Finished jobs kept for polling, older ones are forgotten
+MAX_FINISHED_JOBS = 100
+
+
+class JobState(Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    @property
+    def finished(self) -> bool:
+        return self in (JobState.DONE, JobState.FAILED, JobState.CANCELLED)
+
+
+class _Cancelled(Exception):
+    """Raised between batches to stop the load of a cancelled job."""
+
+
+class LoadJob(object):
+    """State of a datasource load running in the background for one workspace."""
+
+    def __init__(self, workspace: Workspace, plugin: DataSourcePlugin, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.workspace = workspace
+        self.plugin = plugin
+        self.params = params
+        self.state = JobState.PENDING
+        self.progress: Optional[float] = None
+        self.message: Optional[str] = None
+        self.error: Optional[str] = None
+        self.node_count = 0
+        self.edge_count = 0
+        self.from_cache = False
+        self.created_at = time.time()
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+        self._cancel = threading.Event()
+        self._future: Optional[Future] = None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds the job has been running, or ran for once finished."""
+        if self._started is None:
+            return 0.0
+        return (self._finished if self._finished is not None else time.monotonic()) - self._started
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "workspace_id": self.workspace.id,
+            "plugin": self.plugin.identifier(),
+            "plugin_name": self.plugin.name(),
+            "state": self.state.value,
+            "progress": self.progress,
+            "message": self.message,
+            "error": self.error,
+            "node_count": self.node_count,
+            "edge_count": self.edge_count,
+            "from_cache": self.from_cache,
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+class LoadJobManager(object):
+    """
+    Runs datasource loads on a bounded thread pool, so requests only start them and poll
+    their progress. Loads of different workspaces run concurrently; starting a load for a
+    workspace cancels the one it still has running.
+
+    A job builds its graph apart from the workspace and swaps it in with one assignment
+    when it is complete, so the workspace shows either the old or the new graph.
+    """
+
+    def __init__(self, cache: Optional[DataSourceCache] = None, max_workers: int = DEFAULT_MAX_WORKERS,
+                 plugin_service: Optional[PluginService] = None):
+        """
+        :param cache: Datasource cache loads go through, if any.
+        :param max_workers: Number of loads running at a time, others wait in submission order.
+        :param plugin_service: Plugin service whose isolated loads are used while enabled.
+        :raises ValueError: If max_workers is lower than 1.
+        """
+        if max_workers < 1:
+            raise ValueError("At least one worker is required.")
+        self._cache = cache
+        self._plugin_service = plugin_service
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="load-job")
+        self._jobs: "OrderedDict[str, LoadJob]" = OrderedDict()
+        # workspace id -> id of the latest job started for it
+        self._latest: Dict[Any, str] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, workspace: Workspace, plugin: DataSourcePlugin, **params) -> LoadJob:
+        """Starts loading a graph with the plugin into the workspace."""
+        job = LoadJob(workspace, plugin, params)
+        with self._lock:
+            previous = self._jobs.get(self._latest.get(workspace.id))
+            self._jobs[job.id] = job
+            self._latest[workspace.id] = job.id
+            self._forget_finished()
+        if previous is not None:
+            self.cancel(previous.id)
+        job._future = self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[LoadJob]:
+        return self._jobs.get(job_id)
+
+    def jobs(self, workspace_id: Any = None) -> List[LoadJob]:
+        """Known jobs in submission order, only those of a workspace if given."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job for job in jobs if workspace_id is None or job.workspace.id == workspace_id]
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancels a job. A waiting job never starts, a running one stops at its next batch
+        and its graph is discarded. A load in a worker process runs to its end first.
+
+        :return: False if the job doesn't exist or already finished.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.state.finished:
+            return False
+        job._cancel.set()
+        if job._future is not None and job._future.cancel():
+            self._finish(job, JobState.CANCELLED)
+        return True
+
+    def shutdown(self, wait: bool = True):
+        """Cancels all jobs and stops the pool."""
+        for job in self.jobs():
+            self.cancel(job.id)
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job: LoadJob):
+        job._started = time.monotonic()
+        job.state = JobState.RUNNING
+        loaded = False
+
+        def on_batch(assembler: GraphAssembler):
+            job.progress = assembler.progress
+            job.message = assembler.message
+            job.node_count = assembler.graph.node_count
+            job.edge_count = assembler.graph.edge_count
+            if job.cancel_requested:
+                raise _Cancelled()
+
+        def load(plugin: DataSourcePlugin, **params) -> Graph:
+            nonlocal loaded
+            loaded = True
+            if self._plugin_service is not None and self._plugin_service.isolated_loads:
+                # The worker reports no batches, progress is only known once it is done
+                job.message = "Loading in a worker process"
+                return self._plugin_service.load(plugin, **params)
+            return load_graph(plugin, on_batch, **params)
+
+        try:
+            if job.cancel_requested:
+                raise _Cancelled()
+            if self._cache is not None:
+                graph = self._cache.load(job.plugin, loader=load, **job.params)
+            else:
+                graph = load(job.plugin, **job.params)
+            if job.cancel_requested:
+                raise _Cancelled()
+            # Attribute statistics are collected here rather than by the first request
+            graph.statistics()
+        except _Cancelled:
+            self._finish(job, JobState.CANCELLED)
+            return
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, JobState.FAILED)
+            return
+
+        # The cache only calls the loader on a miss
+        job.from_cache = self._cache is not None and not loaded
+        job.node_count, job.edge_count, job.progress = graph.node_count, graph.edge_count, 1.0
+        with self._lock:
+            superseded = job.cancel_requested or self._latest.get(job.workspace.id) != job.id
+            if not superseded:
+                job.workspace.graph = graph
+        self._finish(job, JobState.CANCELLED if superseded else JobState.DONE)
+
+    @staticmethod
+    def _finish(job: LoadJob, state: JobState):
+        if job._started is not None:
+            job._finished = time.monotonic()
+        job.state = state
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.state.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
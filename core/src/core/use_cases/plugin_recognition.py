@@ -1,22 +1,35 @@
 from importlib.metadata import entry_points
-from typing import List
+from typing import List, Optional
 
 from api.components import DataSourcePlugin, VisualizerPlugin
+from api.model import Graph
+
+from .isolated_loading import IsolatedLoader, DEFAULT_MAX_WORKERS
+from .lazy_plugins import LazyPlugin, read_manifest
 
 
 class PluginService(object):
     def __init__(self):
         self.plugins: dict[str, List[DataSourcePlugin | VisualizerPlugin]] = {}
         self._current_visualizer: VisualizerPlugin | None = None
+        self._isolated_loader: IsolatedLoader | None = None
 
-    def load_plugins(self, group: str):
+    def load_plugins(self, group: str, lazy: bool = True):
         """
         Dynamically loads plugins based on entrypoint group.
+
+        :param group: Entry point group of the plugins.
+        :param lazy: Whether plugins with a manifest are only imported and constructed on first use,
+            see `LazyPlugin`. Plugins without one are always constructed right away.
         """
         self.plugins[group] = []
         for ep in entry_points(group=group):
-            p = ep.load()
-            plugin = p()
+            metadata = read_manifest(ep) if lazy else None
+            if metadata is not None:
+                plugin = LazyPlugin(ep, metadata)
+            else:
+                p = ep.load()
+                plugin = p()
             self.plugins[group].append(plugin)
 
     def get_current_visualizer(self) -> VisualizerPlugin | None:
@@ -27,3 +40,31 @@ class PluginService(object):
         if visualizer_group in self.plugins and visualizer not in self.plugins[visualizer_group]:
             raise ValueError("Visualizer is not loaded in the plugin service.")
         self._current_visualizer = visualizer
+
+    @property
+    def isolated_loads(self) -> bool:
+        return self._isolated_loader is not None
+
+    def enable_isolated_loads(self, max_workers: int = DEFAULT_MAX_WORKERS, memory_limit: Optional[int] = None):
+        """
+        Makes `load` run datasource plugins in a pool of worker processes, see `IsolatedLoader`.
+
+        :param max_workers: Number of worker processes.
+        :param memory_limit: Bytes of address space a single load may use in its worker, None for no limit.
+        """
+        self.disable_isolated_loads()
+        self._isolated_loader = IsolatedLoader(max_workers, memory_limit)
+
+    def disable_isolated_loads(self):
+        if self._isolated_loader is not None:
+            self._isolated_loader.shutdown()
+            self._isolated_loader = None
+
+    def load(self, plugin: DataSourcePlugin, **kwargs) -> Graph:
+        """
+        Loads a graph with a datasource plugin, in a worker process if isolated loads are
+        enabled and in this process otherwise.
+        """
+        if self._isolated_loader is not None:
+            return self._isolated_loader.load(plugin, **kwargs)
+        return plugin.load(**kwargs)
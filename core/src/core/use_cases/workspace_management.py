@@ -1,4 +1,4 @@
-from api.model import Workspace, FilterOperator
+from api.model import Workspace, FilterOperator, SearchMode
 
 INITIAL_WORKSPACE_NAME = 'workspace1'
 
@@ -32,4 +32,8 @@ class WorkspaceService(object):
 
     @staticmethod
     def get_filter_operators():
-        return [op for op in FilterOperator]
\ No newline at end of file
+        return [op for op in FilterOperator]
+
+    @staticmethod
+    def get_search_modes():
+        return [mode for mode in SearchMode]
\ No newline at end of file
@@ -1,10 +1,13 @@
 from datetime import datetime
-from typing import Union, List
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, Union, List, Optional, Tuple
+import hashlib
 import json
-import uuid
+import os
 
-from api.model import Graph, Node, Edge
-from api.components import DataSourcePlugin, DataSourceParameter
+from api.model import Graph, Node, Edge, CSRGraphBuilder, intern_attributes
+from api.components import DataSourcePlugin, DataSourceParameter, LoadBatch, expand_source_paths, parse_shards
+from .json_stream import iter_events, START_MAP, END_MAP, MAP_KEY, START_ARRAY, END_ARRAY
 
 
 def convert_json_value(value) -> Union[int, float, str, datetime]:
@@ -21,15 +24,49 @@ def convert_json_value(value) -> Union[int, float, str, datetime]:
     return str(value)
 
 
-class JsonDataSource(DataSourcePlugin):
+SHARD_EXTENSIONS = (".json",)
+# Completed objects of a streamed file per batch of `load_iter`
+BATCH_SIZE = 50000
+
+# Node ids, node data, edges, unresolved references and explicit ids of one parsed shard
+ShardBatch = Tuple[List[str], List[Dict[str, Any]], List[Tuple[str, str]], Dict[str, List[str]], List[str]]
+
+
+def content_id(scalars: Dict[str, Any]) -> str:
+    """
+    Deterministic id of an object without an "id", hashed from the canonical JSON form of
+    its scalar values. Objects with the same scalar data get the same id and are one node.
+    """
+    canonical = json.dumps(scalars, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return "_:" + hashlib.blake2b(canonical.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _scalars(item: dict) -> Dict[str, Any]:
+    return {k: v for k, v in item.items() if not isinstance(v, (dict, list))}
+
+
+class _ObjectFrame(object):
+    """A JSON object being streamed: its scalar values and the ids it references so far."""
+    __slots__ = ("key", "scalars", "children", "references")
+
     def __init__(self):
-        self._initialize_graph()
+        self.key = None
+        self.scalars = {}
+        self.children = []
+        self.references = []
 
-    def _initialize_graph(self):
-        self.nodes: dict[str, Node] = {}
-        self.edges: set[tuple[str, str]] = set()
-        self.id_index: dict[str, str] = {}
 
+class _ArrayFrame(object):
+    """A JSON array being streamed and the innermost object it is nested in, through arrays only."""
+    __slots__ = ("owner", "direct")
+
+    def __init__(self, owner: Optional[_ObjectFrame], direct: bool):
+        self.owner = owner
+        # Objects are children of the owner only if the array is one of its values
+        self.direct = direct
+
+
+class JsonDataSource(DataSourcePlugin):
     def name(self) -> str:
         return "JsonDataSource"
 
@@ -42,31 +79,209 @@ class JsonDataSource(DataSourcePlugin):
                 'file_path',
                 str,
                 'File path'
+            ),
+            DataSourceParameter(
+                'compact',
+                bool,
+                'Compact storage'
+            ),
+            DataSourceParameter(
+                'streaming',
+                bool,
+                'Streaming parser'
             )
         ]
 
+    def source_files(self, **kwargs) -> List[str]:
+        return expand_source_paths(kwargs["file_path"], SHARD_EXTENSIONS)
+
     def load(self, **kwargs) -> Graph:
-        """Load JSON data, parse nodes and edges into a Graph."""
-        self._initialize_graph()
-        file_path = kwargs["file_path"]
+        """
+        Load JSON data, parse nodes and edges into a Graph. A directory or glob pattern
+        loads every matching file as a shard; shards are parsed in parallel processes,
+        at most `workers` of them (all cores by default).
+        """
+        state = _LoadState()
+        paths = expand_source_paths(kwargs["file_path"], SHARD_EXTENSIONS)
+        streaming = kwargs.get("streaming", False)
+        if len(paths) == 1:
+            state.parse(paths[0], streaming)
+        else:
+            state.merge(parse_shards(_load_shard, paths, streaming, workers=kwargs.get("workers")))
+
+        state.strings.clear()
+        state.pending.clear()
+        if kwargs.get("compact", False):
+            return state.build_compact()
+        edge_objs = [Edge(state.nodes[src], state.nodes[tgt]) for src, tgt in state.edges]
+        return Graph(list(state.nodes.values()), edge_objs, True)
+
+    def load_iter(self, **kwargs) -> Iterator[LoadBatch]:
+        """
+        Load JSON data in batches: the nodes and edges of every shard as it is merged, of
+        every `BATCH_SIZE` objects of a streamed file, or of a parsed file in one batch.
+        Compact storage is built in one piece.
+        """
+        if kwargs.get("compact", False):
+            yield from super().load_iter(**kwargs)
+            return
+
+        state = _LoadState()
+        paths = expand_source_paths(kwargs["file_path"], SHARD_EXTENSIONS)
+        streaming = kwargs.get("streaming", False)
+        emitted = [0, 0]
+        if len(paths) > 1:
+            shards = parse_shards(_load_shard, paths, streaming, workers=kwargs.get("workers"))
+            for done, shard in enumerate(shards, 1):
+                state.merge_shard(shard)
+                yield state.batch(emitted, done / (len(paths) + 1), f"Merged shard {done} of {len(paths)}")
+            state.resolve_pending()
+        elif streaming:
+            with open(paths[0], "r", encoding="utf-8") as f:
+                size = os.fstat(f.fileno()).st_size
+                for _ in state.stream(f):
+                    # The text layer reads ahead, its buffer position is as far as the file was read
+                    yield state.batch(emitted, f.buffer.tell() / size if size else None,
+                                      f"Streamed {len(state.nodes)} objects")
+        else:
+            state.parse(paths[0], streaming)
+
+        state.strings.clear()
+        state.pending.clear()
+        yield state.batch(emitted, 1.0, f"Loaded {len(state.nodes)} nodes")
+
+
+class _LoadState(object):
+    """Nodes, edges and unresolved references parsed by one load, so a data source can run loads concurrently."""
+
+    def __init__(self):
+        self.nodes: dict[str, Node] = {}
+        # Used as an insertion ordered set, so edges added since a batch was yielded can be sliced off
+        self.edges: dict[tuple[str, str], None] = {}
+        self.id_index: dict[str, str] = {}
+        # Repeated string values share one object across nodes
+        self.strings: dict[str, str] = {}
+        # Sources of references to ids not seen yet, resolved later while streaming or across shards
+        self.pending: dict[str, list[str]] = {}
+
+    def batch(self, emitted: List[int], progress: Optional[float], message: str) -> LoadBatch:
+        """The nodes and edges added since the previous batch, `emitted` counts those already yielded."""
+        nodes = list(islice(self.nodes.values(), emitted[0], None))
+        edges = [Edge(self.nodes[src], self.nodes[tgt]) for src, tgt in islice(self.edges, emitted[1], None)]
+        emitted[0], emitted[1] = len(self.nodes), len(self.edges)
+        return LoadBatch(nodes, edges, progress=progress, message=message)
+
+    def parse(self, file_path: str, streaming: bool):
         with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+            if streaming:
+                for _ in self.stream(f):
+                    pass
+            else:
+                data = json.load(f)
+                self._collect_nodes(data)
+                self._collect_edges(data)
 
-        self._collect_nodes(data)
-        self._collect_edges(data)
+    def merge(self, batches: Iterable[ShardBatch]):
+        """
+        Merge shard batches: the first shard defining a node id wins, and references
+        left unresolved in one shard are resolved against the ids of all shards.
+        """
+        for batch in batches:
+            self.merge_shard(batch)
+        self.resolve_pending()
 
-        edge_objs = [Edge(self.nodes[src], self.nodes[tgt]) for src, tgt in self.edges]
-        return Graph(list(self.nodes.values()), edge_objs, True)
+    def merge_shard(self, batch: ShardBatch):
+        node_ids, node_data, edges, pending, explicit_ids = batch
+        for node_id, data in zip(node_ids, node_data):
+            if node_id not in self.nodes:
+                self.nodes[node_id] = Node(node_id, intern_attributes(data, self.strings))
+        for node_id in explicit_ids:
+            self.id_index.setdefault(node_id, node_id)
+        self.edges.update(dict.fromkeys(edges))
+        for reference, sources in pending.items():
+            self.pending.setdefault(reference, []).extend(sources)
+
+    def resolve_pending(self):
+        for reference, sources in self.pending.items():
+            child_id = self.id_index.get(reference)
+            if child_id:
+                self.edges.update(dict.fromkeys((src, child_id) for src in sources))
+
+    def build_compact(self) -> Graph:
+        """Build the graph in CSR storage without creating edge objects."""
+        builder = CSRGraphBuilder(True)
+        for node_id, node in self.nodes.items():
+            builder.add_node(node_id, node.data)
+        for src, tgt in self.edges:
+            builder.add_edge(src, tgt)
+        return builder.build()
+
+    def stream(self, f) -> Iterator[None]:
+        """
+        Collect nodes and edges in one pass over the parser events, keeping only the
+        objects that are still open on an explicit stack instead of the document tree.
+        Yields after every `BATCH_SIZE` completed objects, so batches can be taken in between.
+        """
+        stack = []
+        completed = 0
+        for event, value in iter_events(f):
+            top = stack[-1] if stack else None
+            if event == MAP_KEY:
+                top.key = value
+            elif event == START_MAP:
+                stack.append(_ObjectFrame())
+            elif event == START_ARRAY:
+                if isinstance(top, _ObjectFrame):
+                    stack.append(_ArrayFrame(top, True))
+                else:
+                    stack.append(_ArrayFrame(top.owner if top else None, False))
+            elif event == END_MAP:
+                node_id = self._add_streamed_node(stack.pop())
+                parent = stack[-1] if stack else None
+                if isinstance(parent, _ObjectFrame):
+                    parent.children.append(node_id)
+                elif parent is not None and parent.direct:
+                    parent.owner.children.append(node_id)
+                completed += 1
+                if completed % BATCH_SIZE == 0:
+                    yield
+            elif event == END_ARRAY:
+                stack.pop()
+            elif isinstance(top, _ObjectFrame):
+                top.scalars[top.key] = value
+            elif top is not None and top.owner is not None and isinstance(value, str):
+                top.owner.references.append(value)
+
+    def _add_streamed_node(self, frame: _ObjectFrame) -> str:
+        """Add the node of a completed object and its edges, return the node id."""
+        node_id = frame.scalars["id"] if "id" in frame.scalars else content_id(frame.scalars)
+        if node_id not in self.nodes:
+            self.nodes[node_id] = Node(node_id, intern_attributes(
+                {k: convert_json_value(v) for k, v in frame.scalars.items()}, self.strings))
+            if "id" in frame.scalars:
+                self.id_index[node_id] = node_id
+                for src in self.pending.pop(node_id, ()):
+                    self.edges[src, node_id] = None
+
+        for child_id in frame.children:
+            self.edges[node_id, child_id] = None
+        for reference in frame.references:
+            child_id = self.id_index.get(reference)
+            if child_id:
+                self.edges[node_id, child_id] = None
+            else:
+                self.pending.setdefault(reference, []).append(node_id)
+        return node_id
 
     def _collect_nodes(self, item):
         """Recursively collect nodes from dicts/lists."""
         if isinstance(item, dict):
-            node_id = item.get("id", str(uuid.uuid4()))
+            scalars = _scalars(item)
+            node_id = item["id"] if "id" in item else content_id(scalars)
             if node_id not in self.nodes:
-                new_node = Node(node_id, {
-                    k: convert_json_value(v)
-                    for k, v in item.items() if not isinstance(v, (dict, list))
-                })
+                new_node = Node(node_id, intern_attributes({
+                    k: convert_json_value(v) for k, v in scalars.items()
+                }, self.strings))
                 self.nodes[node_id] = new_node
                 if "id" in item:
                     self.id_index[item["id"]] = node_id
@@ -81,9 +296,6 @@ class JsonDataSource(DataSourcePlugin):
         """Recursively collect edges based on references and nested structures."""
         if isinstance(item, dict):
             node_id = self._resolve_node_id(item)
-            if not node_id:
-                scalar_data = {k: convert_json_value(v) for k, v in item.items() if not isinstance(v, (dict, list))}
-                node_id = self._resolve_node_id(scalar_data)
             if not node_id:
                 return
 
@@ -92,11 +304,11 @@ class JsonDataSource(DataSourcePlugin):
                     for ref in value:
                         child_id = self._resolve_node_id(ref)
                         if child_id:
-                            self.edges.add((node_id, child_id))
+                            self.edges[node_id, child_id] = None
                 elif isinstance(value, dict):
                     child_id = self._resolve_node_id(value)
                     if child_id:
-                        self.edges.add((node_id, child_id))
+                        self.edges[node_id, child_id] = None
 
             for value in item.values():
                 if isinstance(value, (dict, list)):
@@ -108,17 +320,28 @@ class JsonDataSource(DataSourcePlugin):
         elif isinstance(item, str) and parent_id:
             child_id = self.id_index.get(item)
             if child_id:
-                self.edges.add((parent_id, child_id))
+                self.edges[parent_id, child_id] = None
+            else:
+                self.pending.setdefault(item, []).append(parent_id)
 
     def _resolve_node_id(self, value):
-        """Resolve node id from a string, dict with id, or by matching scalar data."""
+        """Resolve node id from a string, dict with id, or by the content id of its scalar data."""
         if isinstance(value, str):
             return self.id_index.get(value)
         if isinstance(value, dict):
             if "id" in value:
                 return value["id"]
-            scalar_data = {k: v for k, v in value.items() if not isinstance(v, (dict, list))}
-            for nid, node in self.nodes.items():
-                if node.data == scalar_data:
-                    return nid
-        return None
\ No newline at end of file
+            node_id = content_id(_scalars(value))
+            if node_id in self.nodes:
+                return node_id
+        return None
+
+
+
+def _load_shard(file_path: str, streaming: bool) -> ShardBatch:
+    """Parse one shard in a worker process into plain lists, which are cheaper to send back than nodes."""
+    state = _LoadState()
+    state.parse(file_path, streaming)
+    nodes = state.nodes.values()
+    return ([node.id for node in nodes], [node.data for node in nodes], list(state.edges),
+            state.pending, list(state.id_index))
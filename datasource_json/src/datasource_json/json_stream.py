@@ -0,0 +1,127 @@
+import json
+import re
+from typing import Any, Iterator, TextIO, Tuple
+
+START_MAP = "start_map"
+END_MAP = "end_map"
+MAP_KEY = "map_key"
+START_ARRAY = "start_array"
+END_ARRAY = "end_array"
+VALUE = "value"
+
+CHUNK_SIZE = 1 << 16
+
+_TOKEN = re.compile(r"""
+    [ \t\r\n]*
+    (?:
+        (?P<punctuation>[{}\[\],:])
+      | (?P<string>"[^"\\]*(?:\\.[^"\\]*)*")
+      | (?P<number>-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?)
+      | (?P<literal>true|false|null)
+    )
+""", re.VERBOSE)
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+_LITERALS = {"true": True, "false": False, "null": None}
+
+# Parser states: which tokens may come next
+_EXPECT_VALUE = 0
+_EXPECT_VALUE_OR_END = 1
+_EXPECT_KEY = 2
+_EXPECT_KEY_OR_END = 3
+_EXPECT_COLON = 4
+_EXPECT_COMMA_OR_END = 5
+_EXPECT_NOTHING = 6
+
+
+def _invalid(offset: int) -> ValueError:
+    return ValueError(f"Invalid JSON at offset {offset}")
+
+
+def _tokens(f: TextIO, chunk_size: int) -> Iterator[Tuple[str, Any, int]]:
+    """(kind, text, offset) of every token, reading the file one chunk at a time."""
+    buffer = ""
+    position = 0
+    consumed = 0
+    at_end = False
+    while True:
+        match = _TOKEN.match(buffer, position)
+        # A token touching the end of the buffer may continue in the next chunk
+        if not at_end and (match is None or match.end() == len(buffer) or (
+                match.lastgroup == "number" and _NUMBER_TAIL.match(buffer, match.end()).end() == len(buffer))):
+            chunk = f.read(chunk_size)
+            consumed += position
+            buffer = buffer[position:] + chunk
+            position = 0
+            at_end = not chunk
+            continue
+        if match is None:
+            if _WHITESPACE.match(buffer, position).end() == len(buffer):
+                return
+            raise _invalid(consumed + position)
+        kind = match.lastgroup
+        yield kind, match.group(kind), consumed + match.start(kind)
+        position = match.end()
+
+
+def iter_events(f: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, Any]]:
+    """
+    Parses a JSON document incrementally, without building it in memory.
+
+    Yields `(event, value)` pairs: `start_map`, `map_key` with the key, `end_map`,
+    `start_array`, `end_array` and `value` with a decoded scalar. Memory use depends on
+    the nesting depth and the longest token, not on the size of the document.
+
+    :param f: Text file to read.
+    :param chunk_size: Number of characters read at once.
+    :raises ValueError: If the document isn't valid JSON.
+    """
+    containers = []
+    expect = _EXPECT_VALUE
+    for kind, text, offset in _tokens(f, chunk_size):
+        if kind == "punctuation":
+            if text == "{" or text == "[":
+                if expect not in (_EXPECT_VALUE, _EXPECT_VALUE_OR_END):
+                    raise _invalid(offset)
+                containers.append(text)
+                if text == "{":
+                    expect = _EXPECT_KEY_OR_END
+                    yield START_MAP, None
+                else:
+                    expect = _EXPECT_VALUE_OR_END
+                    yield START_ARRAY, None
+                continue
+            if text == "}" or text == "]":
+                opening = "{" if text == "}" else "["
+                if not containers or containers[-1] != opening or expect not in (
+                        _EXPECT_COMMA_OR_END, _EXPECT_KEY_OR_END if text == "}" else _EXPECT_VALUE_OR_END):
+                    raise _invalid(offset)
+                containers.pop()
+                yield (END_MAP if text == "}" else END_ARRAY), None
+            elif text == ",":
+                if expect != _EXPECT_COMMA_OR_END:
+                    raise _invalid(offset)
+                expect = _EXPECT_KEY if containers[-1] == "{" else _EXPECT_VALUE
+                continue
+            else:
+                if expect != _EXPECT_COLON:
+                    raise _invalid(offset)
+                expect = _EXPECT_VALUE
+                continue
+        else:
+            if kind == "string":
+                value = json.loads(text) if "\\" in text else text[1:-1]
+                if expect in (_EXPECT_KEY, _EXPECT_KEY_OR_END):
+                    expect = _EXPECT_COLON
+                    yield MAP_KEY, value
+                    continue
+            elif kind == "number":
+                value = float(text) if any(c in text for c in ".eE") else int(text)
+            else:
+                value = _LITERALS[text]
+            if expect not in (_EXPECT_VALUE, _EXPECT_VALUE_OR_END):
+                raise _invalid(offset)
+            yield VALUE, value
+        expect = _EXPECT_COMMA_OR_END if containers else _EXPECT_NOTHING
+    if expect != _EXPECT_NOTHING:
+        raise ValueError("Unexpected end of JSON document")
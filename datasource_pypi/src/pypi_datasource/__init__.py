@@ -1 +1,2 @@
 from .datasource import PyPIDatasource
+from .dump_datasource import PyPIDumpDatasource
@@ -0,0 +1,124 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .metadata_cache import MetadataCache
+from .models import Package, parse_metadata
+
+PYPI_URL = "https://pypi.org/pypi"
+DEFAULT_CONCURRENCY = 16
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_TIMEOUT = 10
+
+# Responses worth asking again for, everything else is final
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class PyPIClient(object):
+    """
+    Fetches package metadata from the PyPI JSON API over one pooled `requests.Session`,
+    with at most `concurrency` requests at a time. Failed requests are retried with
+    exponential backoff, and a package requested again while its request is still in
+    flight shares that request.
+
+    With a `MetadataCache`, fresh entries are used without a request and stale ones are
+    revalidated with If-None-Match/If-Modified-Since, so unchanged packages answer 304
+    without a body. A stale entry is also used when the index can't be reached.
+    """
+
+    def __init__(self, index_url: str = PYPI_URL, concurrency: int = DEFAULT_CONCURRENCY,
+                 retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 timeout: float = DEFAULT_TIMEOUT, cache: Optional[MetadataCache] = None):
+        """
+        :param index_url: Base URL of the JSON API, package metadata is at `<index_url>/<name>/json`.
+        :param concurrency: Number of requests and pooled connections at a time.
+        :param retries: Retries of a request after connection errors and retryable statuses.
+        :param backoff: Backoff factor in seconds, the first retry is at once and retry n waits `backoff * 2 ** (n - 1)`.
+        :param timeout: Timeout of a single request in seconds.
+        :param cache: Optional per-package metadata cache.
+        :raises ValueError: If concurrency is lower than 1.
+        """
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1.")
+        self._index_url = index_url.rstrip("/")
+        self._timeout = timeout
+        self._cache = cache
+        retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=RETRY_STATUSES,
+                      allowed_methods=frozenset({"GET"}), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency, max_retries=retry)
+        self._session = requests.Session()
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="pypi")
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, name: str) -> Future:
+        """
+        Starts fetching the metadata of a package.
+
+        :return: Future of the package and its `requires_dist`, None if the package doesn't exist.
+        """
+        with self._lock:
+            future = self._in_flight.get(name)
+            if future is not None:
+                return future
+            future = self._executor.submit(self._get, name)
+            self._in_flight[name] = future
+        future.add_done_callback(lambda _: self._finished(name))
+        return future
+
+    def fetch_all(self, names: Iterable[str]) -> List[Optional[Tuple[Package, List[str]]]]:
+        """Fetches the metadata of all packages concurrently, in the order of `names`."""
+        futures = [self.fetch(name) for name in names]
+        return [future.result() for future in futures]
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._session.close()
+
+    def __enter__(self) -> "PyPIClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _finished(self, name: str):
+        with self._lock:
+            self._in_flight.pop(name, None)
+
+    def _get(self, name: str) -> Optional[Tuple[Package, List[str]]]:
+        entry = self._cache.get(name) if self._cache is not None else None
+        if entry is not None and self._cache.is_fresh(entry):
+            return entry.metadata
+
+        headers = {}
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        try:
+            response = self._session.get(f"{self._index_url}/{name}/json", headers=headers, timeout=self._timeout)
+        except requests.RequestException:
+            if entry is None:
+                raise
+            return entry.metadata
+
+        if response.status_code == 304 and entry is not None:
+            self._cache.touch(name)
+            return entry.metadata
+        if response.status_code == 200:
+            metadata = parse_metadata(response.json())
+        elif response.status_code == 404:
+            metadata = None
+        else:
+            # Still failing after the retries, a stale answer is better than none
+            return entry.metadata if entry is not None else None
+        if self._cache is not None:
+            self._cache.put(name, metadata, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return metadata
@@ -1,24 +1,26 @@
 import os
-import pickle
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
-import requests
-from dateutil.parser import parse as parse_date
-from packaging.requirements import Requirement
+from packaging.utils import canonicalize_name
 
-from api.components import DataSourcePlugin, DataSourceParameter
-from api.model import Edge, Graph, Node
+from api.components import DataSourcePlugin, DataSourceParameter, LoadBatch
+from api.model import Edge, Graph, Node, intern_attributes
 
-from .models import Package
+from .client import PyPIClient, PYPI_URL, DEFAULT_CONCURRENCY
+from .metadata_cache import MetadataCache, DEFAULT_TTL
+from .models import dependency_names
 
 
 class PyPIDatasource(DataSourcePlugin):
-    def __init__(self):
+    def __init__(self, index_url: str = PYPI_URL, cache_dir: Optional[str] = None, ttl: float = DEFAULT_TTL):
         super().__init__()
-        self._cache_dir = os.path.abspath(
+        self._index_url = index_url
+        self._cache_dir = cache_dir or os.path.abspath(
             os.path.join(os.path.dirname(__file__), "..", "..", "cache")
         )
         os.makedirs(self._cache_dir, exist_ok=True)
+        # Package metadata is cached per package, so crawls from other start packages reuse it
+        self._metadata_cache = MetadataCache(os.path.join(self._cache_dir, "pypi_metadata.sqlite3"), ttl)
 
     def name(self) -> str:
         return "PyPI Datasource"
@@ -41,72 +43,72 @@ class PyPIDatasource(DataSourcePlugin):
         ]
 
     def load(self, **kwargs) -> Graph:
-        start_package = kwargs.get("start_package", "requests")
-        depth = kwargs.get("depth", 1)
-        cache_file = os.path.join(
-            self._cache_dir, f"pypi_graph_{start_package}_{depth}.pkl"
-        )
-
-        graph = self._load_graph_from_file(cache_file)
-        if graph:
-            return graph
-
-        nodes = {}
-        edges = []
-        to_visit = [(start_package, 0)]
-        visited = set()
-
-        while to_visit:
-            package_name, level = to_visit.pop()
-            if package_name in visited or level > depth:
-                continue
-            visited.add(package_name)
-            package, dependencies = self._fetch_metadata(package_name)
-            if not package:
-                continue
-
-            node = Node(package_name, vars(package))
-            nodes[package_name] = node
-
-            for dep in dependencies:
-                dep_name = Requirement(dep).name
-                if dep_name not in visited:
-                    to_visit.append((dep_name, level + 1))
-                edges.append(Edge(node, nodes.get(dep_name, Node(dep_name, {}))))
-
-        graph = Graph(list(nodes.values()), edges, True)
-        self._save_graph_to_file(graph, cache_file)
-        return graph
-
-    def _fetch_metadata(self, package_name: str) -> Tuple[Package | None, List[str]]:
-        url = f"https://pypi.org/pypi/{package_name}/json"
-
-        response = requests.get(url, timeout=10)
-        if response.status_code != 200:
-            return None, []
-
-        data = response.json()
-        info = data.get("info", {})
-        releases = data.get("releases", {})
-        latest_version = info.get("version")
-        release_files = releases.get(latest_version, [])
-
-        release_date = None
-        if release_files:
-            release_date_str = release_files[0].get("upload_time_iso_8601")
-            if release_date_str:
-                release_date = parse_date(release_date_str)
-
-        requires_dist = info.get("requires_dist") or []
-        return Package(info, release_date=release_date), requires_dist
-
-    # Graph persistence for not making too many requests again
-    def _save_graph_to_file(self, graph, filename):
-        with open(filename, "wb") as f:
-            pickle.dump(graph, f)
-
-    def _load_graph_from_file(self, filename):
-        if os.path.exists(filename):
-            with open(filename, "rb") as f:
-                return pickle.load(f)
-        return None
+        """
+        Crawls the dependencies of `start_package` breadth first, `depth` levels deep. The
+        packages of a level are fetched concurrently, at most `concurrency` at a time.
+        Node ids are normalized package names.
+        """
+        nodes: Dict[str, Node] = {}
+        dependencies: Dict[str, List[str]] = {}
+        with self._client(kwargs) as client:
+            for level_nodes, level_dependencies in self._crawl(client, *self._start(kwargs)):
+                nodes.update((node.id, node) for node in level_nodes)
+                dependencies.update(level_dependencies)
+
+        # Dependencies below the last level, or missing from the index, are nodes without data
+        placeholders: Dict[str, Node] = {}
+        edges = [
+            Edge(nodes[package_name], nodes.get(dep_name) or placeholders.setdefault(dep_name, Node(dep_name, {})))
+            for package_name, dep_names in dependencies.items() for dep_name in dep_names
+        ]
+        return Graph(list(nodes.values()), edges, True)
+
+    def load_iter(self, **kwargs) -> Iterator[LoadBatch]:
+        """
+        Crawls like `load`, yielding the packages of every level with their dependency edges
+        as soon as the level is fetched. Dependencies of the next level are placeholders until then.
+        """
+        start_package, depth = self._start(kwargs)
+        with self._client(kwargs) as client:
+            for level, (level_nodes, level_dependencies) in enumerate(self._crawl(client, start_package, depth)):
+                edges = [
+                    Edge(Node(package_name, {}), Node(dep_name, {}))
+                    for package_name, dep_names in level_dependencies.items() for dep_name in dep_names
+                ]
+                yield LoadBatch(level_nodes, edges, progress=(level + 1) / (depth + 1),
+                                message=f"Fetched {len(level_nodes)} packages of level {level}")
+        # The crawl ends early once no level adds new packages
+        yield LoadBatch(progress=1.0)
+
+    @staticmethod
+    def _start(kwargs) -> Tuple[str, int]:
+        return canonicalize_name(kwargs.get("start_package", "requests")), kwargs.get("depth", 1)
+
+    def _client(self, kwargs) -> PyPIClient:
+        return PyPIClient(self._index_url, kwargs.get("concurrency", DEFAULT_CONCURRENCY), cache=self._metadata_cache)
+
+    @staticmethod
+    def _crawl(client: PyPIClient, start_package: str, depth: int) -> Iterator[Tuple[List[Node], Dict[str, List[str]]]]:
+        """Yields the packages found on every level and the normalized names of their dependencies."""
+        strings = {}
+        frontier = [start_package]
+        seen = {start_package}
+
+        for _ in range(depth + 1):
+            if not frontier:
+                break
+            nodes = []
+            dependencies = {}
+            next_frontier = []
+            for package_name, metadata in zip(frontier, client.fetch_all(frontier)):
+                if metadata is None:
+                    continue
+                package, requires_dist = metadata
+                nodes.append(Node(package_name, intern_attributes(vars(package), strings)))
+                dependencies[package_name] = dependency_names(requires_dist)
+                for dep_name in dependencies[package_name]:
+                    if dep_name not in seen:
+                        seen.add(dep_name)
+                        next_frontier.append(dep_name)
+            yield nodes, dependencies
+            frontier = next_frontier
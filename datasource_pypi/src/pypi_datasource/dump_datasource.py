@@ -0,0 +1,124 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Dict, Iterable, List, Tuple
+
+from packaging.utils import canonicalize_name
+
+from api.components import DataSourcePlugin, DataSourceParameter
+from api.model import CSRGraphBuilder, Edge, Graph, Node, intern_attributes
+
+from .models import dependency_names, parse_metadata
+
+# Byte ranges smaller than this aren't worth a process of their own
+MIN_CHUNK_SIZE = 1 << 20
+
+# Normalized name, package fields and normalized dependency names of one dump line
+PackageRecord = Tuple[str, Dict[str, Any], List[str]]
+
+
+def _chunks(file_path: str, count: int) -> List[Tuple[int, int]]:
+    size = os.path.getsize(file_path)
+    count = max(1, min(count, size // MIN_CHUNK_SIZE))
+    bounds = [size * i // count for i in range(count + 1)]
+    return list(zip(bounds, bounds[1:]))
+
+
+def _parse_chunk(file_path: str, chunk: Tuple[int, int]) -> List[PackageRecord]:
+    """Parse the lines starting in a byte range of the dump, in a worker process."""
+    start, end = chunk
+    records = []
+    with open(file_path, "rb") as f:
+        if start > 0:
+            # The line that contains the byte before the range belongs to the previous chunk
+            f.seek(start - 1)
+            f.readline()
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            document = json.loads(line)
+            # Lines are JSON API documents, or just their "info"
+            if "info" not in document:
+                document = {"info": document}
+            package, requires_dist = parse_metadata(document)
+            if not package.name:
+                continue
+            records.append((canonicalize_name(package.name), vars(package), dependency_names(requires_dist)))
+    return records
+
+
+class PyPIDumpDatasource(DataSourcePlugin):
+    """
+    Builds the dependency graph of a whole package ecosystem from a local JSON-lines dump
+    of PyPI metadata, one package per line, without network access.
+    """
+
+    def name(self) -> str:
+        return "PyPI metadata dump"
+
+    def identifier(self) -> str:
+        return "pypi_dump_datasource"
+
+    def get_parameters(self) -> List[DataSourceParameter]:
+        return [
+            DataSourceParameter(
+                'file_path',
+                str,
+                'Dump file path',
+            ),
+            DataSourceParameter(
+                'compact',
+                bool,
+                'Compact storage',
+            )
+        ]
+
+    def source_files(self, **kwargs) -> List[str]:
+        return [kwargs["file_path"]]
+
+    def load(self, **kwargs) -> Graph:
+        """
+        Parses byte ranges of the dump in parallel processes, at most `workers` of them (all
+        cores by default), and adds every package with an edge to each distinct dependency.
+        The first line of a package wins; dependencies missing from the dump are nodes without data.
+        """
+        file_path = kwargs["file_path"]
+        chunks = _chunks(file_path, kwargs.get("workers") or os.cpu_count() or 1)
+        if len(chunks) == 1:
+            records = [_parse_chunk(file_path, chunks[0])]
+            return self._build(records, kwargs.get("compact", False))
+        with ProcessPoolExecutor(max_workers=kwargs.get("workers")) as executor:
+            return self._build(executor.map(_parse_chunk, repeat(file_path), chunks), kwargs.get("compact", False))
+
+    @staticmethod
+    def _build(chunks: Iterable[List[PackageRecord]], compact: bool) -> Graph:
+        strings = {}
+        if compact:
+            builder = CSRGraphBuilder(True)
+            dependencies = []
+            for records in chunks:
+                for name, fields, dep_names in records:
+                    if builder.add_node(name, intern_attributes(fields, strings)):
+                        dependencies.append((name, dep_names))
+            for name, dep_names in dependencies:
+                for dep_name in dep_names:
+                    builder.add_edge(name, dep_name)
+            return builder.build()
+
+        nodes: Dict[str, Node] = {}
+        dependencies = []
+        for records in chunks:
+            for name, fields, dep_names in records:
+                if name not in nodes:
+                    nodes[name] = Node(name, intern_attributes(fields, strings))
+                    dependencies.append((name, dep_names))
+        placeholders: Dict[str, Node] = {}
+        edges = [
+            Edge(nodes[name], nodes.get(dep_name) or placeholders.setdefault(dep_name, Node(dep_name, {})))
+            for name, dep_names in dependencies for dep_name in dep_names
+        ]
+        return Graph(list(nodes.values()), edges, True)
@@ -0,0 +1,110 @@
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from .models import Package
+
+DEFAULT_TTL = 24 * 60 * 60
+# Bump when the table layout changes, older caches are dropped
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS packages (
+    name TEXT PRIMARY KEY,
+    found INTEGER NOT NULL,
+    fields TEXT,
+    release_date TEXT,
+    requires_dist TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL
+)
+"""
+
+
+class CacheEntry(object):
+    """Cached metadata of one package, with the validators of the response it came from."""
+    __slots__ = ("metadata", "etag", "last_modified", "fetched_at")
+
+    def __init__(self, metadata: Optional[Tuple[Package, List[str]]], etag: Optional[str],
+                 last_modified: Optional[str], fetched_at: float):
+        # None for packages the index doesn't have
+        self.metadata = metadata
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+
+class MetadataCache(object):
+    """
+    Parsed PyPI package metadata in a SQLite database, one row per package, shared by
+    all crawls. Entries are fresh for `ttl` seconds; stale entries keep the ETag and
+    Last-Modified of their response so they can be revalidated with a conditional request.
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL):
+        """
+        :param path: Path of the database file, created if it doesn't exist.
+        :param ttl: Seconds an entry is used without asking the index again.
+        """
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        # Crawls look packages up from their request threads, the lock serializes them
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        if self._connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self._connection.execute("DROP TABLE IF EXISTS packages")
+            self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._connection.execute(_SCHEMA)
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl
+
+    def get(self, name: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT found, fields, release_date, requires_dist, etag, last_modified, fetched_at "
+                "FROM packages WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            return None
+        found, fields, release_date, requires_dist, etag, last_modified, fetched_at = row
+        metadata = None
+        if found:
+            release_date = datetime.fromisoformat(release_date) if release_date else None
+            metadata = Package(json.loads(fields), release_date=release_date), json.loads(requires_dist)
+        return CacheEntry(metadata, etag, last_modified, fetched_at)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return time.time() - entry.fetched_at < self._ttl
+
+    def put(self, name: str, metadata: Optional[Tuple[Package, List[str]]],
+            etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Stores the metadata of a package, None if the index doesn't have it."""
+        fields = release_date = requires_dist = None
+        if metadata is not None:
+            package, dependencies = metadata
+            fields = {key: value for key, value in vars(package).items() if key != "release_date"}
+            release_date = package.release_date.isoformat() if getattr(package, "release_date", None) else None
+            fields, requires_dist = json.dumps(fields, default=str), json.dumps(dependencies)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO packages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (name, metadata is not None, fields, release_date, requires_dist, etag, last_modified, time.time())
+            )
+
+    def touch(self, name: str):
+        """Marks an entry fresh again after the index confirmed it is unchanged."""
+        with self._lock:
+            self._connection.execute("UPDATE packages SET fetched_at = ? WHERE name = ?", (time.time(), name))
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM packages")
+
+    def close(self):
+        self._connection.close()
@@ -1,4 +1,10 @@
-from typing import Dict
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from dateutil.parser import parse as parse_date
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
 
 
 class Package:
@@ -11,3 +17,43 @@ class Package:
 
         for key, value in kwargs.items():
             setattr(self, key, value)
+
+
+def parse_metadata(data: Dict) -> Tuple[Package, List[str]]:
+    """The package and its `requires_dist` from a PyPI JSON API document."""
+    info = data.get("info", {})
+    releases = data.get("releases", {})
+    latest_version = info.get("version")
+    release_files = releases.get(latest_version, [])
+
+    release_date = None
+    if release_files:
+        release_date_str = release_files[0].get("upload_time_iso_8601")
+        if release_date_str:
+            try:
+                # The API uses ISO 8601, which is much faster to parse without dateutil
+                release_date = datetime.fromisoformat(release_date_str)
+            except ValueError:
+                release_date = parse_date(release_date_str)
+
+    requires_dist = info.get("requires_dist") or []
+    return Package(info, release_date=release_date), requires_dist
+
+
+@lru_cache(maxsize=1 << 18)
+def requirement_name(requirement: str) -> Optional[str]:
+    """
+    Normalized name of the package a requirement string is for, None if it's malformed.
+    The same requirement strings recur across many packages, so results are memoized.
+    """
+    try:
+        return canonicalize_name(Requirement(requirement).name)
+    except InvalidRequirement:
+        return None
+
+
+def dependency_names(requires_dist: List[str]) -> List[str]:
+    """Normalized names of the required packages, each once, skipping malformed requirements."""
+    names = dict.fromkeys(requirement_name(requirement) for requirement in requires_dist)
+    names.pop(None, None)
+    return list(names)
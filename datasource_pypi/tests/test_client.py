@@ -0,0 +1,119 @@
+import time
+
+import pytest
+import requests
+
+from pypi_datasource.client import PyPIClient
+from pypi_datasource.metadata_cache import MetadataCache
+from pypi_stub import PyPIStub
+
+PACKAGES = {"alpha": ["beta>=1.0"], "beta": []}
+
+
+@pytest.fixture
+def stale_cache(tmp_path):
+    # Entries are stale as soon as they are stored, so every fetch asks the index
+    cache = MetadataCache(str(tmp_path / "metadata.sqlite3"), ttl=0)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.parametrize("status", [503, 429])
+def test_retries_with_backoff(status):
+    with PyPIStub(PACKAGES, failures=3, failure_status=status) as stub:
+        with PyPIClient(stub.url, retries=3, backoff=0.05) as client:
+            start = time.perf_counter()
+            package, requires_dist = client.fetch("alpha").result()
+            elapsed = time.perf_counter() - start
+    assert package.name == "alpha"
+    assert requires_dist == ["beta>=1.0"]
+    assert stub.requests == 4
+    # urllib3 retries the first time at once, then waits 0.1 and 0.2 seconds
+    assert elapsed >= 0.3
+
+
+def test_gives_up_after_retries():
+    with PyPIStub(PACKAGES, failures=5) as stub:
+        with PyPIClient(stub.url, retries=2, backoff=0) as client:
+            assert client.fetch("alpha").result() is None
+    assert stub.requests == 3
+
+
+def test_missing_package_is_none():
+    with PyPIStub(PACKAGES) as stub:
+        with PyPIClient(stub.url) as client:
+            assert client.fetch("gamma").result() is None
+    assert stub.requests == 1
+
+
+def test_shares_request_in_flight():
+    with PyPIStub(PACKAGES, latency=0.2) as stub:
+        with PyPIClient(stub.url) as client:
+            first = client.fetch("alpha")
+            second = client.fetch("alpha")
+            assert first is second
+            assert first.result() is not None
+            # Once finished, a new fetch makes a new request
+            client.fetch("alpha").result()
+    assert stub.requests_by_name["alpha"] == 2
+
+
+def test_fetch_all_keeps_order():
+    with PyPIStub(PACKAGES, latency=0.05) as stub:
+        with PyPIClient(stub.url) as client:
+            results = client.fetch_all(["beta", "gamma", "alpha", "beta"])
+    assert [result[0].name if result else None for result in results] == ["beta", None, "alpha", "beta"]
+    assert stub.requests_by_name["beta"] == 1
+
+
+def test_revalidates_stale_entry(stale_cache):
+    with PyPIStub(PACKAGES) as stub:
+        with PyPIClient(stub.url, cache=stale_cache) as client:
+            fetched = client.fetch("alpha").result()
+            fetched_at = stale_cache.get("alpha").fetched_at
+            revalidated = client.fetch("alpha").result()
+    assert stub.requests == 2
+    assert stub.not_modified == 1
+    assert vars(revalidated[0]) == vars(fetched[0])
+    assert revalidated[1] == fetched[1]
+    assert stale_cache.get("alpha").fetched_at > fetched_at
+
+
+def test_uses_fresh_entry_without_request(tmp_path):
+    cache = MetadataCache(str(tmp_path / "metadata.sqlite3"))
+    with PyPIStub(PACKAGES) as stub:
+        with PyPIClient(stub.url, cache=cache) as client:
+            client.fetch("alpha").result()
+            assert client.fetch("alpha").result()[0].name == "alpha"
+    cache.close()
+    assert stub.requests == 1
+
+
+def test_stale_entry_when_index_fails(stale_cache):
+    with PyPIStub(PACKAGES) as stub:
+        with PyPIClient(stub.url, cache=stale_cache) as client:
+            client.fetch("alpha").result()
+    with PyPIStub(PACKAGES, failures=10) as stub:
+        with PyPIClient(stub.url, retries=1, backoff=0, cache=stale_cache) as client:
+            package, requires_dist = client.fetch("alpha").result()
+    assert stub.requests == 2
+    assert package.name == "alpha"
+    assert requires_dist == ["beta>=1.0"]
+
+
+def test_stale_entry_when_index_unreachable(stale_cache):
+    with PyPIStub(PACKAGES) as stub:
+        with PyPIClient(stub.url, cache=stale_cache) as client:
+            client.fetch("alpha").result()
+    # The stub is shut down, its port refuses connections
+    with PyPIClient(stub.url, retries=1, backoff=0, cache=stale_cache) as client:
+        package, requires_dist = client.fetch("alpha").result()
+        assert package.name == "alpha"
+        with pytest.raises(requests.ConnectionError):
+            # Without a cached entry the error is raised
+            client.fetch("beta").result()
+
+
+def test_rejects_concurrency_below_one():
+    with pytest.raises(ValueError):
+        PyPIClient(concurrency=0)
@@ -0,0 +1,71 @@
+import pytest
+
+from pypi_datasource.datasource import PyPIDatasource
+from pypi_stub import PyPIStub
+
+
+@pytest.fixture
+def load(tmp_path):
+    """Loads a graph from a stub index serving `packages`, returns it with the stub."""
+    def load(packages, **kwargs):
+        with PyPIStub(packages) as stub:
+            source = PyPIDatasource(index_url=stub.url, cache_dir=str(tmp_path))
+            return source.load(**kwargs), stub
+    return load
+
+
+def edge_keys(graph):
+    return sorted((edge.src.id, edge.dest.id) for edge in graph.edges)
+
+
+def test_depth_bounds_crawl(load):
+    packages = {"a": ["b"], "b": ["c"], "c": ["d"], "d": []}
+    graph, stub = load(packages, start_package="a", depth=1)
+    assert sorted(stub.requests_by_name) == ["a", "b"]
+    assert edge_keys(graph) == [("a", "b"), ("b", "c")]
+    nodes = {node.id: node for node in graph.nodes}
+    # Dependencies below the last level are nodes without data
+    assert sorted(nodes) == ["a", "b", "c"]
+    assert nodes["b"].data["name"] == "b"
+    assert dict(nodes["c"].data) == {}
+
+
+def test_depth_zero_fetches_start_package_only(load):
+    graph, stub = load({"a": ["b"], "b": []}, start_package="a", depth=0)
+    assert stub.requests == 1
+    assert edge_keys(graph) == [("a", "b")]
+
+
+def test_each_package_fetched_once(load):
+    packages = {"a": ["b", "c"], "b": ["c", "a"], "c": ["b"]}
+    graph, stub = load(packages, start_package="a", depth=5)
+    assert stub.requests_by_name == {"a": 1, "b": 1, "c": 1}
+    assert edge_keys(graph) == [("a", "b"), ("a", "c"), ("b", "a"), ("b", "c"), ("c", "b")]
+
+
+def test_names_are_normalized(load):
+    packages = {"foo-bar": ["Baz_Qux>=1.0", "baz.qux ; python_version >= '3'"], "baz-qux": []}
+    graph, stub = load(packages, start_package="Foo_Bar", depth=1)
+    assert sorted(stub.requests_by_name) == ["baz-qux", "foo-bar"]
+    assert sorted(node.id for node in graph.nodes) == ["baz-qux", "foo-bar"]
+    # Spellings of one package are one dependency
+    assert edge_keys(graph) == [("foo-bar", "baz-qux")]
+
+
+def test_malformed_requirements_are_skipped(load):
+    packages = {"a": ["b>=1.0", "not a requirement!", "c[extra] (>=2", "c ; extra == 'test'"], "b": [], "c": []}
+    graph, stub = load(packages, start_package="a", depth=1)
+    assert edge_keys(graph) == [("a", "b"), ("a", "c")]
+
+
+def test_missing_dependency_is_placeholder(load):
+    graph, stub = load({"a": ["missing"]}, start_package="a", depth=2)
+    assert stub.requests_by_name == {"a": 1, "missing": 1}
+    assert edge_keys(graph) == [("a", "missing")]
+    assert dict(next(node for node in graph.nodes if node.id == "missing").data) == {}
+
+
+def test_missing_start_package_is_empty(load):
+    graph, stub = load({}, start_package="a", depth=1)
+    assert len(graph.nodes) == 0
+    assert stub.requests == 1
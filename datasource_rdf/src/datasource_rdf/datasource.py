@@ -1,20 +1,60 @@
-from api.model import Graph, Node, Edge
-from api.components.data_source_plugin import DataSourcePlugin, DataSourceParameter
+import os
+import sys
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import islice
+
+from api.model import Graph, Node, Edge, CSRGraphBuilder, intern_attributes
+from api.components.data_source_plugin import (DataSourcePlugin, DataSourceParameter, LoadBatch, expand_source_paths,
+                                              parse_shards)
 from rdflib import Graph as RdfGraph, RDF, Literal, XSD
-from typing import List
+from rdflib.util import guess_format
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .ntriples import iter_statements
+
+SHARD_EXTENSIONS = ('.ttl', '.turtle', '.nt', '.nq')
+# Read line by line instead of through an rdflib store
+STREAMING_FORMATS = ('nt', 'nquads')
+# Statements of a file per batch of `load_iter`
+BATCH_SIZE = 100000
+
+_INTEGER_TYPES = frozenset(str(dt) for dt in (XSD.integer, XSD.int, XSD.long, XSD.short))
+_FLOAT_TYPES = frozenset(str(dt) for dt in (XSD.float, XSD.double, XSD.decimal))
+_RDF_TYPE = str(RDF.type)
+
+# (subject, predicate, object, literal datatype or None if the object is a node)
+Statement = Tuple[str, str, str, Optional[str]]
+# Node data by id and edge id pairs of one parsed shard
+ShardBatch = Tuple[Dict[str, dict], List[Tuple[str, str]]]
 
-def _convert_literal(literal: Literal):
-    """Convert RDF literal into int, float, date, or string"""
-    dt = literal.datatype
 
-    if dt in (XSD.integer, XSD.int, XSD.long, XSD.short):
-        return int(literal)
-    elif dt in (XSD.float, XSD.double, XSD.decimal):
-        return float(literal)
-    elif dt in (XSD.date, XSD.dateTime):
-        return literal.toPython()
-    else:
-        return str(literal)
+@lru_cache(maxsize=None)
+def _literal_converter(datatype: str) -> Callable[[str], Any]:
+    """Conversion for literals of a datatype, resolved once per datatype IRI."""
+    if datatype in _INTEGER_TYPES:
+        return int
+    if datatype in _FLOAT_TYPES:
+        return float
+    if datatype == str(XSD.date):
+        return date.fromisoformat
+    if datatype == str(XSD.dateTime):
+        return datetime.fromisoformat
+    return str
+
+
+def _convert_literal(text: str, datatype: str):
+    """Convert RDF literal text into int, float, date, or string"""
+    try:
+        return _literal_converter(datatype)(text)
+    except ValueError:
+        # Ill-typed literals keep their text
+        return text
+
+
+def rdf_format(file_path: str) -> str:
+    """rdflib format name guessed from the file extension, Turtle if it's not known."""
+    return guess_format(file_path) or 'turtle'
 
 
 class RdfDataSource(DataSourcePlugin):
@@ -30,32 +70,169 @@ class RdfDataSource(DataSourcePlugin):
                 'file_path',
                 str,
                 'File path'
+            ),
+            DataSourceParameter(
+                'compact',
+                bool,
+                'Compact storage'
             )
         ]
 
+    def source_files(self, **kwargs) -> List[str]:
+        return expand_source_paths(kwargs['file_path'], SHARD_EXTENSIONS)
+
     def load(self, **kwargs) -> Graph:
-        file_path = kwargs['file_path']
-        rdf_graph = RdfGraph()
-        rdf_graph.parse(file_path, format='turtle')
+        """
+        Loads an RDF file, in the format given by its extension. N-Triples and N-Quads are
+        streamed line by line, other formats are parsed by rdflib. A directory or glob pattern
+        loads every matching file as a shard; shards are parsed in parallel processes,
+        at most `workers` of them.
+        """
+        paths = expand_source_paths(kwargs['file_path'], SHARD_EXTENSIONS)
+        workers = kwargs.get('workers')
+
+        # Predicate URIs become interned attribute keys, repeated string values are pooled
+        strings = {}
+        if kwargs.get('compact', False):
+            builder = CSRGraphBuilder(True)
+            self._collect_paths(paths, workers, builder.node_data, builder.add_edge, strings)
+            return builder.build()
 
         nodes = {}
         edges = []
 
+        def node_data(node_id):
+            if node_id not in nodes:
+                nodes[node_id] = Node(node_id, {})
+            return nodes[node_id].data
+
+        def add_edge(src_id, dest_id):
+            edges.append(Edge(nodes[src_id], nodes[dest_id]))
+
+        self._collect_paths(paths, workers, node_data, add_edge, strings)
+        return Graph(nodes.values(), edges, True)
+
+    def load_iter(self, **kwargs) -> Iterator[LoadBatch]:
+        """
+        Loads an RDF file in batches: the statements of every shard, or every `BATCH_SIZE`
+        statements of a single file. A subject described in several batches gets the
+        attributes of all of them. Compact storage is built in one piece.
+        """
+        if kwargs.get('compact', False):
+            yield from super().load_iter(**kwargs)
+            return
+
+        paths = expand_source_paths(kwargs['file_path'], SHARD_EXTENSIONS)
+        strings = {}
+        if len(paths) > 1:
+            shards = parse_shards(_load_shard, paths, workers=kwargs.get('workers'))
+            for done, (shard_nodes, shard_edges) in enumerate(shards, 1):
+                nodes = {node_id: intern_attributes(data, strings) for node_id, data in shard_nodes.items()}
+                yield _batch(nodes, shard_edges, done / len(paths), f"Parsed shard {done} of {len(paths)}")
+            return
+
+        reader = _StatementReader(paths[0])
+        statements = iter(reader)
+        while True:
+            nodes = {}
+            edges = []
+            self._collect(islice(statements, BATCH_SIZE), lambda node_id: nodes.setdefault(node_id, {}),
+                          lambda src_id, dest_id: edges.append((src_id, dest_id)), strings)
+            if not nodes:
+                break
+            yield _batch(nodes, edges, reader.progress, f"Read {reader.count} statements")
+        yield LoadBatch(progress=1.0, message=f"Read {reader.count} statements")
+
+    def _collect_paths(self, paths, workers, node_data, add_edge, strings):
+        if len(paths) == 1:
+            self._collect(_statements(paths[0]), node_data, add_edge, strings)
+        else:
+            self._merge(parse_shards(_load_shard, paths, workers=workers), node_data, add_edge, strings)
+
+    @staticmethod
+    def _merge(shards, node_data, add_edge, strings):
+        """Merge the nodes and edges parsed from shards, in path order."""
+        for shard_nodes, shard_edges in shards:
+            # Subjects described in several shards get the attributes of all of them
+            for node_id, data in shard_nodes.items():
+                node_data(node_id).update(intern_attributes(data, strings))
+            for src_id, dest_id in shard_edges:
+                add_edge(src_id, dest_id)
+
+    @staticmethod
+    def _collect(statements: Iterator[Statement], node_data, add_edge, strings):
+        for s, p, o, datatype in statements:
+            data = node_data(s)
+            if datatype is not None:
+                value = _convert_literal(o, datatype)
+                if isinstance(value, str):
+                    value = strings.setdefault(value, value)
+                data[sys.intern(p)] = value
+            elif p == _RDF_TYPE:
+                data['type'] = strings.setdefault(o, o)
+            else:
+                node_data(o)
+                add_edge(s, o)
+
+
+class _StatementReader(object):
+    """Statements of an RDF file, with how much of the file was read so far."""
+
+    def __init__(self, file_path: str):
+        self._file_path = file_path
+        self._file = None
+        self._total = None
+        self.count = 0
+
+    @property
+    def progress(self) -> Optional[float]:
+        """Fraction of the file read, None until a file parsed by rdflib is parsed."""
+        if self._total is not None:
+            return self.count / self._total if self._total else 1.0
+        if self._file is None or self._file.closed:
+            return None
+        size = os.fstat(self._file.fileno()).st_size
+        # The text layer reads ahead, its buffer position is as far as the file was read
+        return min(1.0, self._file.buffer.tell() / size) if size else 1.0
+
+    def __iter__(self) -> Iterator[Statement]:
+        for statement in self._read():
+            self.count += 1
+            yield statement
+
+    def _read(self) -> Iterator[Statement]:
+        file_format = rdf_format(self._file_path)
+        if file_format in STREAMING_FORMATS:
+            with open(self._file_path, 'r', encoding='utf-8') as self._file:
+                yield from iter_statements(self._file)
+            return
+
+        rdf_graph = RdfGraph()
+        rdf_graph.parse(self._file_path, format=file_format)
+        self._total = len(rdf_graph)
         for s, p, o in rdf_graph:
-            s = str(s)
-            if s not in nodes:
-                nodes[s] = Node(s, {})
-            if o.__class__.__name__ == 'Literal':
-                value = _convert_literal(o)
-                nodes[s].data[str(p)] = value
-            elif p == RDF.type:
-                nodes[s].data['type'] = str(o)
+            if isinstance(o, Literal):
+                yield str(s), str(p), str(o), str(o.datatype or '')
             else:
-                o = str(o)
-                if s not in nodes:
-                    nodes[s] = Node(s, {})
-                if o not in nodes:
-                    nodes[o] = Node(o, {})
-                edges.append(Edge(nodes[s], nodes[o]))
+                yield str(s), str(p), str(o), None
 
-        return Graph(nodes.values(), edges, True)
+
+def _statements(file_path: str) -> Iterator[Statement]:
+    return _StatementReader(file_path)._read()
+
+
+def _batch(nodes: Dict[str, dict], edges: List[Tuple[str, str]], progress: Optional[float],
+           message: str) -> LoadBatch:
+    """Batch of the attributes found per node id and the edges between them."""
+    batch_nodes = {node_id: Node(node_id, data) for node_id, data in nodes.items()}
+    batch_edges = [Edge(batch_nodes[src_id], batch_nodes[dest_id]) for src_id, dest_id in edges]
+    return LoadBatch(list(batch_nodes.values()), batch_edges, progress=progress, message=message)
+
+
+def _load_shard(file_path: str) -> ShardBatch:
+    """Parse one shard in a worker process into node data by id and edge id pairs."""
+    nodes = {}
+    edges = []
+    RdfDataSource._collect(_statements(file_path), lambda node_id: nodes.setdefault(node_id, {}),
+                           lambda src_id, dest_id: edges.append((src_id, dest_id)), {})
+    return nodes, edges
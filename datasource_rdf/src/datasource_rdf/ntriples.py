@@ -0,0 +1,58 @@
+import re
+from typing import Iterator, Optional, TextIO, Tuple
+
+_NODE = r"<[^>]*>|_:\S+"
+_STATEMENT = re.compile(rf"""
+    [ \t]*(?P<subject>{_NODE})
+    [ \t]*<(?P<predicate>[^>]*)>
+    [ \t]*(?:
+        (?P<object>{_NODE})
+      | "(?P<literal>[^"\\]*(?:\\.[^"\\]*)*)"(?:\^\^<(?P<datatype>[^>]*)>|@(?P<language>[a-zA-Z]+(?:-[a-zA-Z0-9]+)*))?
+    )
+    (?:[ \t]+(?:{_NODE}))?
+    [ \t]*\.[ \t\r]*(?:\#.*)?$
+""", re.VERBOSE)
+_ESCAPE = re.compile(r"\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))")
+_ESCAPED_CHARACTERS = {"t": "\t", "b": "\b", "n": "\n", "r": "\r", "f": "\f", '"': '"', "'": "'", "\\": "\\"}
+
+
+def _unescape(text: str) -> str:
+    if "\\" not in text:
+        return text
+
+    def replace(match):
+        code = match.group(1) or match.group(2)
+        if code:
+            return chr(int(code, 16))
+        return _ESCAPED_CHARACTERS.get(match.group(3), match.group(0))
+
+    return _ESCAPE.sub(replace, text)
+
+
+def _node(term: str) -> str:
+    # IRIs without the angle brackets, blank nodes keep their "_:" label
+    return _unescape(term[1:-1]) if term[0] == "<" else term
+
+
+def iter_statements(f: TextIO) -> Iterator[Tuple[str, str, str, Optional[str]]]:
+    """
+    Reads N-Triples or N-Quads one line at a time. The graph label of quads is ignored.
+
+    Yields `(subject, predicate, object, datatype)`: datatype is None if the object is an
+    IRI or blank node, otherwise the object is the literal's text and datatype its
+    datatype IRI, or an empty string for plain and language tagged literals.
+
+    :raises ValueError: On a line that isn't a statement, a comment or blank.
+    """
+    for number, line in enumerate(f, 1):
+        match = _STATEMENT.match(line)
+        if match is None:
+            stripped = line.strip()
+            if not stripped or stripped[0] == "#":
+                continue
+            raise ValueError(f"Invalid N-Triples statement on line {number}")
+        subject, predicate, node, literal, datatype, _ = match.groups()
+        if node is not None:
+            yield _node(subject), _unescape(predicate), _node(node), None
+        else:
+            yield _node(subject), _unescape(predicate), _unescape(literal), _unescape(datatype or "")
@@ -0,0 +1 @@
+from .datasource import SnapshotDataSource
\ No newline at end of file
@@ -0,0 +1,26 @@
+from typing import List
+
+from api.model import Graph, open_snapshot
+from api.components import DataSourcePlugin, DataSourceParameter
+
+
+class SnapshotDataSource(DataSourcePlugin):
+    """Opens graph snapshots saved from a workspace, memory mapped instead of parsed."""
+
+    def name(self) -> str:
+        return "Graph snapshot"
+
+    def identifier(self) -> str:
+        return "datasource_snapshot"
+
+    def get_parameters(self) -> List[DataSourceParameter]:
+        return [
+            DataSourceParameter(
+                'file_path',
+                str,
+                'Snapshot file path'
+            )
+        ]
+
+    def load(self, **kwargs) -> Graph:
+        return open_snapshot(kwargs["file_path"])
@@ -1,6 +1,10 @@
 from django.apps import AppConfig
+from django.conf import settings
+from api.components import configure_templates
 from core.use_cases import PluginService
 from core.use_cases import WorkspaceService
+from core.use_cases import DataSourceCache
+from core.use_cases import LoadJobManager
 
 datasource_group = 'core.datasource'
 visualizer_group = 'core.visualizer'
@@ -12,8 +16,17 @@ class GraphVisualizerConfig(AppConfig):
 
     plugin_service = PluginService()
     workspace_service = WorkspaceService()
+    datasource_cache: DataSourceCache = None
+    load_jobs: LoadJobManager = None
 
     def ready(self):
+        configure_templates(str(settings.TEMPLATE_BYTECODE_CACHE_DIR))
+        self.datasource_cache = DataSourceCache(str(settings.DATASOURCE_CACHE_DIR), settings.DATASOURCE_CACHE_MAX_BYTES)
+        if settings.ISOLATED_LOADS:
+            self.plugin_service.enable_isolated_loads(settings.ISOLATED_LOAD_WORKERS,
+                                                      settings.ISOLATED_LOAD_MEMORY_LIMIT)
+        self.load_jobs = LoadJobManager(self.datasource_cache, settings.LOAD_JOB_WORKERS, self.plugin_service)
+        # Plugins are described by their manifests here, and imported once they are used
         self.plugin_service.load_plugins(datasource_group)
         self.plugin_service.load_plugins(visualizer_group)
         if visualizer_group in self.plugin_service.plugins and self.plugin_service.plugins[visualizer_group] and len(self.plugin_service.plugins[visualizer_group]) != 0:
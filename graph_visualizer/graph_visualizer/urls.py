@@ -7,9 +7,15 @@ urlpatterns = [
     path("plugin/<str:plugin_identifier>/params/", views.get_plugin_params, name="get_plugin_params"),
     path('plugin/visualizer/set', views.set_current_visualizer, name='set_current_visualizer'),
     path("load-data/", views.load_data, name="load_data"),
+    path("load-jobs/", views.load_job_list, name="load_job_list"),
+    path("load-jobs/<str:job_id>/", views.load_job_status, name="load_job_status"),
+    path("load-jobs/<str:job_id>/cancel/", views.cancel_load_job, name="cancel_load_job"),
+    path("datasource/cache/", views.datasource_cache_statistics, name="datasource_cache_statistics"),
     path("workspace/add/", views.add_workspace, name="add_workspace"),
     path("workspace/set/", views.set_workspace, name="set_workspace"),
     path("workspace/edit/", views.edit_workspace, name="edit_workspace"),
+    path("workspace/snapshot/save/", views.save_snapshot, name="save_snapshot"),
+    path("workspace/snapshot/open/", views.open_snapshot, name="open_snapshot"),
     path('search/', views.add_search, name='add_search'),
     path('remove-search/', views.remove_search, name='remove_search'),
     path('filter/', views.add_filter, name='add_filter'),
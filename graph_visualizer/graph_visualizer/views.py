@@ -1,5 +1,7 @@
+import os
 from idlelib import window
 from django.apps import apps
+from django.conf import settings
 from django.contrib import messages
 from django.http import JsonResponse
 from django.shortcuts import redirect
@@ -7,10 +9,31 @@ from django.shortcuts import render
 
 from core.cli_manager.cli_manager import CLIHandler
 from core.cli_manager.status import Status
-from core.use_cases import WorkspaceService, PluginService
+from core.use_cases import WorkspaceService, PluginService, DataSourceCache, LoadJobManager
 from .apps import datasource_group, visualizer_group
 from .util import serialize_to_json
 
+# Ids of the load jobs started by a session, only these are listed, polled and cancelled for it
+SESSION_LOAD_JOBS = "load_jobs"
+SESSION_LOAD_JOBS_LIMIT = 100
+
+
+def _remember_load_job(request, job_id: str):
+    job_ids = request.session.get(SESSION_LOAD_JOBS, [])
+    request.session[SESSION_LOAD_JOBS] = (job_ids + [job_id])[-SESSION_LOAD_JOBS_LIMIT:]
+
+
+def _session_load_jobs(request, workspace_id=None):
+    load_jobs: LoadJobManager = apps.get_app_config('graph_visualizer').load_jobs
+    job_ids = set(request.session.get(SESSION_LOAD_JOBS, []))
+    return [job for job in load_jobs.jobs(workspace_id) if job.id in job_ids]
+
+
+def _session_load_job(request, job_id: str):
+    if job_id not in request.session.get(SESSION_LOAD_JOBS, []):
+        return None
+    return apps.get_app_config('graph_visualizer').load_jobs.get(job_id)
+
 
 def index(request):
     plugin_service: PluginService = apps.get_app_config('graph_visualizer').plugin_service
@@ -50,9 +73,11 @@ def index(request):
         'visualizer_plugin': visualizer_plugin,
         'graph_json': graph_json,
         'filter_operators': WorkspaceService.get_filter_operators(),
+        'search_modes': WorkspaceService.get_search_modes(),
         'active_searches': [search.to_dict() for search in workspace.searches],
         'active_filters': [f.to_dict() for f in workspace.filters],
         'cli_history': workspace.cli_history,
+        'load_jobs': [job.to_dict() for job in _session_load_jobs(request, workspace.id) if not job.state.finished],
     })
 
 def set_current_visualizer(request):
@@ -141,15 +166,43 @@ def load_data(request):
     workspace_service: WorkspaceService = apps.get_app_config('graph_visualizer').workspace_service
     current_workspace = workspace_service.get_current_workspace()
 
-    try:
-        graph = selected_plugin.load(**params)
-        current_workspace.graph = graph
-        messages.success(request, f"Data loaded successfully using {selected_plugin.name()}")
-    except Exception as e:
-        messages.error(request, f"Failed to load data: {str(e)}")
+    # The load runs in the background, the page polls the job and shows the graph once it is done
+    load_jobs: LoadJobManager = apps.get_app_config('graph_visualizer').load_jobs
+    job = load_jobs.submit(current_workspace, selected_plugin, **params)
+    _remember_load_job(request, job.id)
+    if request.headers.get("Accept") == "application/json":
+        return JsonResponse(job.to_dict(), status=202)
+    messages.info(request, f"Loading data using {selected_plugin.name()}")
 
     return redirect("index")
 
+def load_job_list(request):
+    workspace_id = request.GET.get("workspace")
+    jobs = _session_load_jobs(request, int(workspace_id) if workspace_id and workspace_id.isdigit() else None)
+    return JsonResponse([job.to_dict() for job in jobs], safe=False)
+
+def load_job_status(request, job_id):
+    job = _session_load_job(request, job_id)
+    if job is None:
+        return JsonResponse({"error": "Job not found"}, status=404)
+    return JsonResponse(job.to_dict())
+
+def cancel_load_job(request, job_id):
+    if request.method != "POST":
+        return JsonResponse({"error": "Invalid request method"}, status=405)
+
+    load_jobs: LoadJobManager = apps.get_app_config('graph_visualizer').load_jobs
+    job = _session_load_job(request, job_id)
+    if job is None:
+        return JsonResponse({"error": "Job not found"}, status=404)
+    if not load_jobs.cancel(job_id):
+        return JsonResponse({"error": "Job already finished", **job.to_dict()}, status=409)
+    return JsonResponse(job.to_dict())
+
+def datasource_cache_statistics(request):
+    datasource_cache: DataSourceCache = apps.get_app_config('graph_visualizer').datasource_cache
+    return JsonResponse(datasource_cache.statistics())
+
 def add_workspace(request):
     if request.method != "POST":
         messages.error(request, "Invalid request")
@@ -186,6 +239,58 @@ def edit_workspace(request):
 
     return redirect("index")
 
+def _snapshot_path(name: str) -> str:
+    """
+    Path of a snapshot in the snapshot folder, names from requests never reach other files.
+
+    :raises ValueError: If the name leads out of the folder.
+    """
+    directory = os.path.realpath(settings.SNAPSHOT_DIR)
+    path = os.path.realpath(os.path.join(directory, name))
+    if path == directory or os.path.commonpath([directory, path]) != directory:
+        raise ValueError(f"'{name}' is not a file in the snapshot folder")
+    return path
+
+def save_snapshot(request):
+    if request.method != "POST":
+        messages.error(request, "Invalid request")
+        return redirect("index")
+
+    path = request.POST.get("snapshot_path", "").strip()
+    if not path:
+        messages.error(request, "Snapshot path cannot be empty")
+        return redirect("index")
+
+    workspace_service: WorkspaceService = apps.get_app_config('graph_visualizer').workspace_service
+    try:
+        snapshot_path = _snapshot_path(path)
+        os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+        workspace_service.get_current_workspace().save_snapshot(snapshot_path)
+        messages.success(request, f"Snapshot saved to '{path}'")
+    except (OSError, ValueError) as e:
+        messages.error(request, f"Failed to save snapshot: {str(e)}")
+
+    return redirect("index")
+
+def open_snapshot(request):
+    if request.method != "POST":
+        messages.error(request, "Invalid request")
+        return redirect("index")
+
+    path = request.POST.get("snapshot_path", "").strip()
+    if not path:
+        messages.error(request, "Snapshot path cannot be empty")
+        return redirect("index")
+
+    workspace_service: WorkspaceService = apps.get_app_config('graph_visualizer').workspace_service
+    try:
+        workspace_service.get_current_workspace().open_snapshot(_snapshot_path(path))
+        messages.success(request, f"Snapshot '{path}' opened")
+    except (OSError, ValueError) as e:
+        messages.error(request, f"Failed to open snapshot: {str(e)}")
+
+    return redirect("index")
+
 def set_workspace(request):
     if request.method != "POST":
         messages.error(request, "Invalid request")
@@ -212,10 +317,16 @@ def add_search(request):
         messages.error(request, "Search query cannot be empty")
         return redirect("index")
 
+    mode = request.POST.get("mode") or "exact"
+    limit = request.POST.get("limit", "").strip()
+
     workspace_service: WorkspaceService = apps.get_app_config('graph_visualizer').workspace_service
     current_workspace = workspace_service.get_current_workspace()
-    current_workspace.add_search(query)
-    messages.success(request, f"Search '{query}' added successfully")
+    try:
+        current_workspace.add_search(query, mode, int(limit) if limit else None)
+        messages.success(request, f"Search '{query}' added successfully")
+    except ValueError as e:
+        messages.error(request, e)
 
     return redirect("index")
 
@@ -241,16 +352,26 @@ def add_filter(request):
         messages.error(request, "Invalid request")
         return redirect("index")
 
-    attribute = request.POST.get("attribute").strip()
+    workspace_service: WorkspaceService = apps.get_app_config('graph_visualizer').workspace_service
+    current_workspace = workspace_service.get_current_workspace()
+
+    expression = request.POST.get("expression", "").strip()
+    if expression:
+        try:
+            current_workspace.add_filter_expression(expression)
+            messages.success(request, f"Filter '{expression}' added successfully")
+        except ValueError as e:
+            messages.error(request, e)
+        return redirect("index")
+
+    attribute = request.POST.get("attribute", "").strip()
     operator = request.POST.get("operator")
-    value = request.POST.get("value").strip()
+    value = request.POST.get("value", "").strip()
 
     if not attribute or not operator or not value:
         messages.error(request, "All filter fields are required")
         return redirect("index")
 
-    workspace_service: WorkspaceService = apps.get_app_config('graph_visualizer').workspace_service
-    current_workspace = workspace_service.get_current_workspace()
     try:
         current_workspace.add_filter(attribute, operator, value)
         messages.success(request, f"Filter on '{attribute} {operator} {value}' added successfully")
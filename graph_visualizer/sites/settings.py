@@ -130,3 +130,28 @@ STATICFILES_DIRS = [
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Graphs loaded by file based datasources are cached here as snapshots,
+# least recently used ones are removed above the size limit
+
+DATASOURCE_CACHE_DIR = BASE_DIR / 'cache' / 'datasources'
+
+DATASOURCE_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+
+# Datasource loads running in the background at a time
+LOAD_JOB_WORKERS = 2
+
+# Run datasource loads in worker processes, so parsing doesn't hold the GIL or grow the
+# heap of the web process. Loaded graphs then use compact storage.
+ISOLATED_LOADS = False
+
+ISOLATED_LOAD_WORKERS = 2
+
+# Address space a single isolated load may add to its worker process, None for no limit
+ISOLATED_LOAD_MEMORY_LIMIT = 4 * 1024 * 1024 * 1024
+
+# Snapshots are saved to and opened from this folder, requests name files inside it
+SNAPSHOT_DIR = BASE_DIR / 'snapshots'
+
+# Compiled templates of visualizer plugins, kept between restarts
+TEMPLATE_BYTECODE_CACHE_DIR = BASE_DIR / 'cache' / 'templates'
@@ -1,10 +1,9 @@
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
 
-from api.components import VisualizerPlugin
+from api.components import VisualizerPlugin, load_template
 from api.model.graph import Graph
 
-from .util import convert_nodes_to_dict, convert_edges_to_dict, custom_tojson
+from .util import convert_nodes_to_dict, convert_edges_to_dict
 
 
 class SimpleVisualizer(VisualizerPlugin):
@@ -15,16 +14,9 @@ class SimpleVisualizer(VisualizerPlugin):
     PLUGIN_IDENTIFIER = "simple_visualizer"
 
     def __init__(self) -> None:
-        """Initialize the visualizer with Jinja2 template environment."""
-        self._setup_template_environment()
-
-    def _setup_template_environment(self) -> None:
-        """Configure Jinja2 environment with custom filters and template loader."""
+        """Initialize the visualizer with its template from the shared Jinja2 environment."""
         template_path = Path(__file__).parent / "templates"
-
-        self._environment = Environment(loader=FileSystemLoader(str(template_path)))
-        self._environment.filters['tojson'] = custom_tojson
-        self._template = self._environment.get_template(self.TEMPLATE_NAME)
+        self._template = load_template(self.PLUGIN_IDENTIFIER, str(template_path), self.TEMPLATE_NAME)
 
     def visualize(self, data: Graph) -> str:
         """Generate HTML visualization of the graph data."""